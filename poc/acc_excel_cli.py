@@ -3,20 +3,35 @@
 ACC Excel Generator CLI
 Command-line interface for generating ACC-compatible Excel files
 Usage: python3 acc_excel_cli.py <input_json> <output_excel> <project_name>
+           [--shard-by rows|category|location] [--shard-rows N] [--workers N]
+With a shard option the register is split into several workbooks next to
+<output_excel>, written in parallel, plus <output_excel stem>_manifest.json
 """
 import sys
 import json
 from pathlib import Path
-from acc_excel_generator import ACCExcelGenerator
+from acc_excel_generator import ACCExcelGenerator, SHARD_ROWS
+
+USAGE = ("Usage: python3 acc_excel_cli.py <input_json> <output_excel> <project_name> "
+         "[--shard-by rows|category|location] [--shard-rows N] [--workers N]")
+
+def _options(args):
+    """--name value pairs after the positional arguments"""
+    names = {'--shard-by', '--shard-rows', '--workers'}
+    if len(args) % 2 or any(name not in names for name in args[::2]):
+        print(USAGE, file=sys.stderr)
+        sys.exit(1)
+    return {name[2:].replace('-', '_'): value for name, value in zip(args[::2], args[1::2])}
 
 def main():
     if len(sys.argv) < 4:
-        print("Usage: python3 acc_excel_cli.py <input_json> <output_excel> <project_name>", file=sys.stderr)
+        print(USAGE, file=sys.stderr)
         sys.exit(1)
     
     input_json = sys.argv[1]
     output_excel = sys.argv[2]
     project_name = sys.argv[3]
+    options = _options(sys.argv[4:])
     
     try:
         # Validate input file exists
@@ -24,9 +39,17 @@ def main():
             print(f"Error: Input file not found: {input_json}", file=sys.stderr)
             sys.exit(1)
         
-        # Generate Excel
+        # Generate Excel - one workbook, or shards plus a manifest
         generator = ACCExcelGenerator(input_json)
-        excel_path = generator.generate_excel(Path(output_excel))
+        if options:
+            excel_path = generator.generate_sharded(
+                Path(output_excel),
+                shard_by=options.get('shard_by', 'rows'),
+                rows_per_shard=int(options.get('shard_rows', SHARD_ROWS)),
+                workers=int(options['workers']) if 'workers' in options else None,
+            )
+        else:
+            excel_path = generator.generate_excel(Path(output_excel))
         
         print(f"SUCCESS: Generated {excel_path}")
         sys.exit(0)
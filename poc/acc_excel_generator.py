@@ -2,56 +2,266 @@
 ACC Excel Generator
 Converts extracted assets to ACC-compatible Excel import format
 """
-import pandas as pd
-from pathlib import Path
+import hashlib
 import json
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional
+from asset_stream import iter_assets
+
+# ACC's import template headers - the tab and trailing space are part of the names
+ACC_COLUMNS = ['Name', 'Category\t ', 'Description', 'Location ', 'Status', 'Barcode', 'System Names']
+
+# Sharded export: rows per workbook, and how many shard spool files stay open at once
+SHARD_ROWS = 100_000
+SHARD_MODES = ('rows', 'category', 'location')
+MAX_OPEN_SPOOLS = 128
+
+
+def write_workbook(output_path: Path, headers: List[str], rows: Iterable[List[Any]],
+                   sheet_name: str = 'Assets', styled_header: bool = True) -> int:
+    """
+    Stream rows into an .xlsx with openpyxl's write-only mode (rows are
+    flushed to disk as they are appended) and return the number written
+    styled_header gives the header row the bold/bordered/centred style
+    pandas' to_excel uses
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+    
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    if styled_header:
+        thin = Side(style='thin')
+        header = []
+        for title in headers:
+            cell = WriteOnlyCell(sheet, value=title)
+            cell.font = Font(bold=True)
+            cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+            cell.alignment = Alignment(horizontal='center', vertical='top')
+            header.append(cell)
+        sheet.append(header)
+    else:
+        sheet.append(headers)
+    
+    count = 0
+    for row in rows:
+        sheet.append(row)
+        count += 1
+    
+    output_path = Path(output_path)
+    output_path.parent.mkdir(exist_ok=True, parents=True)
+    workbook.save(output_path)
+    return count
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_shard(spool_path: str, output_path: str, headers: List[str]) -> Dict[str, Any]:
+    """
+    Worker process: write one shard workbook from its spool of JSON rows
+    rows_sha256 covers the row data itself, so it is stable across runs
+    (the .xlsx checksum also changes with the zip timestamps)
+    """
+    rows_digest = hashlib.sha256()
+    
+    def rows():
+        with open(spool_path, encoding='utf-8') as f:
+            for line in f:
+                rows_digest.update(line.encode('utf-8'))
+                yield json.loads(line)
+    
+    count = write_workbook(Path(output_path), headers, rows())
+    os.remove(spool_path)
+    return {
+        'rows': count,
+        'rows_sha256': rows_digest.hexdigest(),
+        'sha256': file_sha256(Path(output_path)),
+        'bytes': os.path.getsize(output_path),
+    }
+
+
+def _shard_key(asset: Dict[str, Any], shard_by: str) -> Optional[str]:
+    """Top-level category ('Electrical > Cable' -> 'Electrical') or location of an asset"""
+    if shard_by == 'category':
+        return str(asset.get('category') or 'Unknown').split('>')[0].strip() or 'Unknown'
+    if shard_by == 'location':
+        return str(asset.get('location') or 'Unknown').strip() or 'Unknown'
+    return None
+
+
+def _slug(key: str) -> str:
+    return re.sub(r'[^A-Za-z0-9]+', '-', key).strip('-')[:40] or 'unknown'
+
 
 class ACCExcelGenerator:
-    def __init__(self, assets_json_path: str):
+    def __init__(self, assets_json_path: str,
+                 records: Optional[Callable[[], Iterable[Dict[str, Any]]]] = None):
+        # Assets are streamed from the file (JSON array or JSONL) by each
+        # output rather than held in memory; `records` replaces the file with
+        # any other source (e.g. an expanding project template) - it is called
+        # once per output for a fresh iterable
         self.assets_json_path = Path(assets_json_path)
-        with open(self.assets_json_path) as f:
-            self.assets = json.load(f)
+        self.records = records
+    
+    def iter_assets(self) -> Iterator[Dict[str, Any]]:
+        if self.records is not None:
+            return iter(self.records())
+        return iter_assets(self.assets_json_path)
     
     def generate_excel(self, output_path: Path):
         """Generate ACC-compatible Excel file"""
         print(f"\n{'='*80}")
         print(f"GENERATING ACC EXCEL IMPORT FILE")
         print(f"{'='*80}")
-        print(f"\nInput: {len(self.assets)} assets")
+        print(f"\nInput: {self.assets_json_path.name}")
         
-        # Convert assets to ACC format
-        acc_rows = []
-        for asset in self.assets:
-            acc_row = self._convert_to_acc_format(asset)
-            if acc_row:
-                acc_rows.append(acc_row)
+        # Convert assets to ACC format, one row at a time, in ACC column order
+        rows = (self._acc_row(asset) for asset in self.iter_assets())
+        count = write_workbook(Path(output_path), ACC_COLUMNS, rows)
         
-        print(f"Converted: {len(acc_rows)} rows")
-        
-        # Create DataFrame
-        df = pd.DataFrame(acc_rows)
+        print(f"Converted: {count} rows")
+        print(f"\n✓ Saved ACC import file to: {output_path}")
+        print(f"{'='*80}")
         
-        # Ensure correct column order
-        columns = ['Name', 'Category\t ', 'Description', 'Location ', 'Status', 'Barcode', 'System Names']
+        return output_path
+    
+    def generate_sharded(self, output_path: Path, shard_by: str = 'rows', rows_per_shard: int = SHARD_ROWS,
+                         workers: Optional[int] = None) -> Path:
+        """
+        Split the register into several ACC workbooks written in parallel
+        worker processes, plus a manifest of the shards
+        shard_by='rows' cuts the register into consecutive blocks of
+        rows_per_shard; 'category' / 'location' give each top-level category
+        or location its own workbook(s), still capped at rows_per_shard
+        Rows are converted in one streamed pass and spooled per shard; each
+        shard is handed to the pool as soon as it is complete
+        Shards are named <stem>_NNN[_key].xlsx next to output_path and the
+        manifest is <stem>_manifest.json - it lists each shard's source row
+        ranges (1-based positions in the input), row count and checksums
+        Returns the manifest path
+        """
+        if shard_by not in SHARD_MODES:
+            raise ValueError(f"shard_by must be one of {', '.join(SHARD_MODES)}")
+        output_path = Path(output_path)
+        output_dir = output_path.parent
+        output_dir.mkdir(exist_ok=True, parents=True)
+        workers = workers or os.cpu_count() or 1
         
-        # Add missing columns if needed
-        for col in columns:
-            if col not in df.columns:
-                df[col] = ''
+        print(f"\n{'='*80}")
+        print(f"GENERATING SHARDED ACC EXCEL IMPORT FILES")
+        print(f"{'='*80}")
+        print(f"\nInput: {self.assets_json_path.name}")
+        print(f"Shard by: {shard_by} | Max rows per shard: {rows_per_shard} | Workers: {workers}")
         
-        # Reorder columns
-        df = df[columns]
+        spool_dir = Path(tempfile.mkdtemp(prefix=f".{output_path.stem}_spool_", dir=output_dir))
+        shards = []
+        current = {}  # shard key -> shard still receiving rows
+        spools = {}   # shard index -> open spool file
+        futures = {}
+        total = 0
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                def spool(shard):
+                    handle = spools.get(shard['index'])
+                    if handle is None:
+                        if len(spools) >= MAX_OPEN_SPOOLS:
+                            spools.pop(next(iter(spools))).close()
+                        handle = spools[shard['index']] = open(shard['spool'], 'a', encoding='utf-8')
+                    return handle
+                
+                def finish(shard):
+                    handle = spools.pop(shard['index'], None)
+                    if handle is not None:
+                        handle.close()
+                    futures[shard['index']] = pool.submit(_write_shard, shard['spool'],
+                                                          str(output_dir / shard['file']), ACC_COLUMNS)
+                
+                for position, asset in enumerate(self.iter_assets(), start=1):
+                    key = _shard_key(asset, shard_by)
+                    shard = current.get(key)
+                    if shard is None or shard['rows'] >= rows_per_shard:
+                        if shard is not None:
+                            finish(shard)
+                        index = len(shards)
+                        suffix = f"_{_slug(key)}" if key is not None else ''
+                        shard = {
+                            'index': index,
+                            'key': key,
+                            'file': f"{output_path.stem}_{index + 1:03d}{suffix}.xlsx",
+                            'rows': 0,
+                            'source_rows': [],
+                            'spool': str(spool_dir / f"{index}.jsonl"),
+                        }
+                        shards.append(shard)
+                        current[key] = shard
+                    
+                    spool(shard).write(json.dumps(self._acc_row(asset)) + '\n')
+                    shard['rows'] += 1
+                    ranges = shard['source_rows']
+                    if ranges and ranges[-1][1] == position - 1:
+                        ranges[-1][1] = position
+                    else:
+                        ranges.append([position, position])
+                    total += 1
+                
+                for shard in current.values():
+                    finish(shard)
+                for shard in shards:
+                    result = futures[shard['index']].result()
+                    if result['rows'] != shard['rows']:
+                        raise RuntimeError(f"Shard {shard['file']} wrote {result['rows']} of {shard['rows']} rows")
+                    shard.update(result)
+                    print(f"  ✓ {shard['file']}: {shard['rows']} rows", flush=True)
+        finally:
+            for handle in spools.values():
+                handle.close()
+            shutil.rmtree(spool_dir, ignore_errors=True)
         
-        # Save to Excel
-        output_path.parent.mkdir(exist_ok=True, parents=True)
-        df.to_excel(output_path, index=False, sheet_name='Assets')
+        manifest = {
+            'source': str(self.assets_json_path),
+            'generated': datetime.now().isoformat(),
+            'shard_by': shard_by,
+            'rows_per_shard': rows_per_shard,
+            'columns': ACC_COLUMNS,
+            'total_rows': total,
+            'shards': [{
+                'file': shard['file'],
+                'key': shard['key'],
+                'rows': shard['rows'],
+                'sheet_rows': [2, shard['rows'] + 1],  # Below the header row
+                'source_rows': shard['source_rows'],
+                'sha256': shard['sha256'],
+                'rows_sha256': shard['rows_sha256'],
+                'bytes': shard['bytes'],
+            } for shard in shards],
+        }
+        manifest_path = output_dir / f"{output_path.stem}_manifest.json"
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
         
-        print(f"\n✓ Saved ACC import file to: {output_path}")
+        print(f"\nConverted: {total} rows into {len(shards)} workbooks")
+        print(f"✓ Saved shard manifest to: {manifest_path}")
         print(f"{'='*80}")
         
-        return output_path
+        return manifest_path
+    
+    def _acc_row(self, asset: Dict[str, Any]) -> List[Any]:
+        # Missing values are written as empty strings, as pandas' na_rep did
+        acc_row = self._convert_to_acc_format(asset)
+        return ['' if acc_row.get(column) is None else acc_row[column] for column in ACC_COLUMNS]
     
     def _convert_to_acc_format(self, asset: Dict[str, Any]) -> Dict[str, str]:
         """Convert a single asset to ACC format"""
@@ -93,30 +303,22 @@ class ACCExcelGenerator:
         """Generate summary report"""
         summary_path = output_path.parent / f"{output_path.stem}_summary.md"
         
+        # Category and location counts from the register's columns
+        from asset_register import AssetRegister  # pandas/numpy only when summarising
+        register = AssetRegister.from_records(self.iter_assets())
+        
         with open(summary_path, 'w') as f:
             f.write("# ACC Import File Summary\n\n")
             f.write(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
             f.write(f"**Source:** {self.assets_json_path.name}\n\n")
-            f.write(f"**Total Assets:** {len(self.assets)}\n\n")
-            
-            # Count by category
-            categories = {}
-            for asset in self.assets:
-                cat = asset.get('category', 'Unknown').split('>')[0].strip()
-                categories[cat] = categories.get(cat, 0) + 1
+            f.write(f"**Total Assets:** {len(register)}\n\n")
             
             f.write("## Assets by Category\n\n")
-            for cat, count in sorted(categories.items(), key=lambda x: -x[1]):
+            for cat, count in register.counts('top_category'):
                 f.write(f"- **{cat}:** {count} assets\n")
             
-            # Count by location
-            locations = {}
-            for asset in self.assets:
-                loc = asset.get('location', 'Unknown')
-                locations[loc] = locations.get(loc, 0) + 1
-            
             f.write("\n## Assets by Location\n\n")
-            for loc, count in sorted(locations.items(), key=lambda x: -x[1])[:10]:
+            for loc, count in register.counts('location', limit=10):
                 f.write(f"- **{loc}:** {count} assets\n")
             
             f.write("\n## Import Instructions\n\n")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+ACC Tools
+Single entry point for the POC pipeline - each subcommand imports its
+script (and that script's heavy dependencies) only when it runs
+Usage: python3 acc_tools.py <command> [args...]
+       python3 acc_tools.py self-check
+"""
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+# command: (module, description, heavy modules its import may load)
+COMMANDS = {
+    'inventory': ('review_documents', "Categorise the design documents and write the inventory", ()),
+    'review': ('comprehensive_document_reviewer', "Classify every PDF for asset relevance", ('openai',)),
+    'extract': ('comprehensive_asset_extractor', "Extract assets from the asset-relevant PDFs", ('openai',)),
+    'dc-cables': ('dc_cable_extractor', "Extract DC cables from the LV calculation report", ('openai',)),
+    'mv-cables': ('extract_complete_dataset', "Extract MV cables from the MV calculation report", ()),
+    'unify': ('unified_extractor', "Combine all extraction sources into one asset register", ()),
+    'register': ('asset_register', "Summarise a register and its hierarchy: register <assets_json> [asset_name]",
+                 ('pandas', 'numpy')),
+    'cables': ('cable_graph', "Query cable connectivity: cables <assets_json> feeding|path|unmatched ...", ('numpy',)),
+    'dedup': ('asset_dedup', "Merge duplicate assets across sources: dedup <output> <input>... [--memory-mb N]", ()),
+    'expand': ('project_template', "Expand a project template: expand <template> <output.xlsx|.jsonl> <asset_set>...", ()),
+    'export': ('acc_excel_cli', "Write an ACC import workbook: export <input_json> <output_excel> <project_name>", ()),
+}
+
+HEAVY_MODULES = ('pdfplumber', 'openai', 'pandas', 'numpy', 'openpyxl')
+
+# Import-time budget per subcommand module (seconds, fresh interpreter)
+IMPORT_BUDGET = 1.0
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+error = None
+try:
+    import {module}
+except Exception as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+print(json.dumps({{'seconds': time.perf_counter() - started, 'error': error,
+                  'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def usage():
+    print("Usage: python3 acc_tools.py <command> [args...]")
+    print("\nCommands:")
+    for name, (module, description, _) in COMMANDS.items():
+        print(f"  {name:<11} {description}")
+    print(f"  {'self-check':<11} Import every command in a fresh interpreter and check time and heavy imports")
+
+
+def run_command(name: str, args):
+    """Run a script's main() with the remaining arguments as its argv"""
+    module_name = COMMANDS[name][0]
+    module = importlib.import_module(module_name)
+    sys.argv = [f"{module_name}.py"] + list(args)
+    module.main()
+
+
+def _probe(module: str) -> dict:
+    here = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                            capture_output=True, text=True, cwd=here)
+    try:
+        return json.loads(result.stdout.strip().splitlines()[-1])
+    except (IndexError, json.JSONDecodeError):
+        return {'seconds': 0.0, 'error': result.stderr.strip() or f"exit code {result.returncode}", 'heavy': []}
+
+
+def self_check() -> bool:
+    """
+    Import regressions show up here: a command module that fails to import,
+    takes longer than IMPORT_BUDGET, or loads a heavy dependency it isn't
+    expected to (the CLI itself must load none)
+    """
+    ok = True
+    print(f"{'='*80}")
+    print("ACC TOOLS SELF-CHECK")
+    print(f"{'='*80}")
+
+    probes = [('(cli)', 'acc_tools', ())] + [(name, module, allowed) for name, (module, _, allowed) in COMMANDS.items()]
+    for name, module, allowed in probes:
+        result = _probe(module)
+        unexpected = [m for m in result['heavy'] if m not in allowed]
+        problems = []
+        if result['error']:
+            problems.append(result['error'])
+        if unexpected:
+            problems.append(f"imports {', '.join(unexpected)} at load")
+        if result['seconds'] > IMPORT_BUDGET:
+            problems.append(f"import took {result['seconds']:.2f}s (budget {IMPORT_BUDGET:.1f}s)")
+        ok = ok and not problems
+        status = '✓' if not problems else '✗'
+        print(f"  {status} {name:<11} {module:<34} {result['seconds']*1000:>7.0f} ms  {'; '.join(problems)}")
+
+    print(f"{'='*80}")
+    print("All commands import cleanly" if ok else "Self-check FAILED")
+    return ok
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] in ('-h', '--help', 'help'):
+        usage()
+        sys.exit(0 if len(sys.argv) >= 2 else 1)
+
+    command = sys.argv[1]
+    if command == 'self-check':
+        sys.exit(0 if self_check() else 1)
+    if command not in COMMANDS:
+        print(f"Error: Unknown command: {command}\n", file=sys.stderr)
+        usage()
+        sys.exit(1)
+
+    started = time.perf_counter()
+    run_command(command, sys.argv[2:])
+    print(f"\n[{command} finished in {time.perf_counter() - started:.1f}s]")
+
+
+if __name__ == "__main__":
+    main()
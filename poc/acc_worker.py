@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+ACC Worker
+Long-lived worker the webapp keeps running instead of spawning a Python
+process per job - modules (pandas, openai, pdfplumber) are imported once
+and the response cache / page store stay open between jobs
+Speaks JSON-RPC 2.0 over stdin/stdout, one JSON object per line
+Methods:
+  ping                                                -> {"pid", "jobs"}
+  export  {input_json, output_excel, project_name}    -> {"path"}
+  review  {pdf_list, output_dir, job_id, ...options}  -> {"relevant_documents", "output"}
+  extract {assets_file, output_dir, job_id, ...}      -> {"assets", "output"}
+Review/extract report progress as "progress" notifications (params are the
+progress_events records); exports run alongside them
+Usage: python3 acc_worker.py [max_concurrent_jobs]
+"""
+import importlib
+import json
+import os
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+MAX_JOBS = 4
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+JOB_FAILED = -32000
+
+# Imported in the background at startup so the first job doesn't pay for it
+PRELOAD_MODULES = ['acc_excel_generator', 'comprehensive_document_reviewer', 'comprehensive_asset_extractor']
+
+# Options passed straight through to review_all_documents / extract_all_assets
+RUN_OPTIONS = ('start_idx', 'batch_size', 'incremental', 'resume', 'retry_failed')
+
+# Parse watchdog budgets passed through to the stage's DocumentParser
+PARSER_OPTIONS = ('page_timeout', 'doc_timeout')
+
+
+class RPCError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class Worker:
+    """
+    Reads requests on the main thread and runs each on a thread pool
+    Review and extract share the reviewer/extractor module globals (output
+    directory) and the corpus manifest, so they run one at a time; exports
+    don't touch either and run concurrently with everything
+    """
+    def __init__(self, protocol_out, max_jobs: int = MAX_JOBS):
+        self.out = protocol_out
+        self.jobs = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix='acc-job')
+        self.active = 0
+        self._write_lock = threading.Lock()
+        self._count_lock = threading.Lock()
+        self._pipeline_lock = threading.Lock()
+        self._default_output_dirs: Dict[str, Path] = {}
+        self.methods: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            'ping': self.ping,
+            'export': self.export,
+            'review': self.review,
+            'extract': self.extract,
+        }
+
+    def send(self, message: Dict[str, Any]):
+        line = json.dumps(message, default=str) + '\n'
+        with self._write_lock:
+            self.out.write(line)
+            self.out.flush()
+
+    def notify(self, method: str, params: Dict[str, Any]):
+        self.send({'jsonrpc': '2.0', 'method': method, 'params': params})
+
+    def serve(self, lines):
+        for line in lines:
+            if line.strip():
+                self.dispatch(line)
+        self.jobs.shutdown(wait=True)
+
+    def dispatch(self, line: str):
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            self.send({'jsonrpc': '2.0', 'id': None, 'error': {'code': PARSE_ERROR, 'message': str(e)}})
+            return
+        request_id = request.get('id') if isinstance(request, dict) else None
+        method = request.get('method') if isinstance(request, dict) else None
+        params = request.get('params', {}) if isinstance(request, dict) else None
+        if not isinstance(method, str) or not isinstance(params, dict):
+            self._reply_error(request_id, INVALID_REQUEST, "Expected {method, params: {...}}")
+            return
+        handler = self.methods.get(method)
+        if handler is None:
+            self._reply_error(request_id, METHOD_NOT_FOUND, f"Unknown method: {method}")
+            return
+        if method == 'ping':
+            self._run(request_id, handler, params)  # Answered inline even when the pool is busy
+        else:
+            self.jobs.submit(self._run, request_id, handler, params)
+
+    def _run(self, request_id, handler, params: Dict[str, Any]):
+        with self._count_lock:
+            self.active += 1
+        try:
+            result = handler(params)
+        except RPCError as e:
+            self._reply_error(request_id, e.code, str(e))
+        except Exception as e:
+            traceback.print_exc()
+            self._reply_error(request_id, JOB_FAILED, f"{type(e).__name__}: {e}")
+        else:
+            if request_id is not None:
+                self.send({'jsonrpc': '2.0', 'id': request_id, 'result': result})
+        finally:
+            with self._count_lock:
+                self.active -= 1
+
+    def _reply_error(self, request_id, code: int, message: str):
+        if request_id is not None:
+            self.send({'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}})
+
+    def ping(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {'pid': os.getpid(), 'jobs': self.active - 1}
+
+    def export(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        input_json = _required(params, 'input_json')
+        output_excel = _required(params, 'output_excel')
+        if not Path(input_json).exists():
+            raise RPCError(INVALID_PARAMS, f"Input file not found: {input_json}")
+        generator_module = importlib.import_module('acc_excel_generator')
+        generator = generator_module.ACCExcelGenerator(input_json)
+        excel_path = generator.generate_excel(Path(output_excel))
+        return {'path': str(excel_path)}
+
+    def review(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        pdf_list = _required(params, 'pdf_list')
+        reviewer_module = importlib.import_module('comprehensive_document_reviewer')
+        with self._pipeline_lock:
+            output_dir = self._use_output_dir(reviewer_module, params)
+            reviewer = reviewer_module.ComprehensiveDocumentReviewer(
+                pdf_list, workers=params.get('workers', os.cpu_count() or 1),
+                progress_sink=self._progress, **_parser_options(params))
+            _set_job(reviewer, params)
+            docs = reviewer.review_all_documents(**_run_options(params))
+        return {'relevant_documents': len(docs), 'output': str(output_dir / "asset_relevant_documents.json")}
+
+    def extract(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        extractor_module = importlib.import_module('comprehensive_asset_extractor')
+        with self._pipeline_lock:
+            output_dir = self._use_output_dir(extractor_module, params)
+            assets_file = params.get('assets_file') or str(output_dir / "asset_relevant_documents.json")
+            extractor = extractor_module.ComprehensiveAssetExtractor(
+                assets_file, workers=params.get('workers', os.cpu_count() or 1),
+                progress_sink=self._progress, **_parser_options(params))
+            _set_job(extractor, params)
+            assets = extractor.extract_all_assets(**_run_options(params))
+        return {'assets': len(assets), 'output': str(output_dir / "extracted_assets.json")}
+
+    def _use_output_dir(self, module, params: Dict[str, Any]) -> Path:
+        """Point the stage's outputs at the job's directory (default: the module's own)"""
+        default = self._default_output_dirs.setdefault(module.__name__, module.OUTPUT_DIR)
+        module.OUTPUT_DIR = Path(params.get('output_dir') or default)
+        return module.OUTPUT_DIR
+
+    def _progress(self, record: Dict[str, Any]):
+        self.notify('progress', record)
+
+
+def _required(params: Dict[str, Any], name: str) -> Any:
+    if name not in params:
+        raise RPCError(INVALID_PARAMS, f"Missing parameter: {name}")
+    return params[name]
+
+
+def _run_options(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: params[name] for name in RUN_OPTIONS if name in params}
+
+
+def _parser_options(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Jobs run on pool threads, where the SIGALRM parse watchdog can't be
+    armed - with a page or document budget in force, PDFs are always parsed
+    in worker processes (at least one) so a runaway page can't hang the worker
+    """
+    parser_module = importlib.import_module('parallel_parser')
+    options = {name: params[name] for name in PARSER_OPTIONS if name in params}
+    if options.get('page_timeout', parser_module.PAGE_TIMEOUT) or options.get('doc_timeout', parser_module.DOC_TIMEOUT):
+        options['isolate'] = True
+    return options
+
+
+def _set_job(stage, params: Dict[str, Any]):
+    """Ledger records and progress events carry the webapp's job id"""
+    if params.get('job_id') is not None:
+        stage.ledger.job = str(params['job_id'])
+
+
+def preload():
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"Preload of {name} failed: {e}", file=sys.stderr, flush=True)
+
+
+def main():
+    max_jobs = int(sys.argv[1]) if len(sys.argv) > 1 else MAX_JOBS
+
+    # The protocol owns the original stdout; everything else printed by the
+    # pipeline (including parser subprocesses, which inherit fd 1) goes to stderr
+    protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), 'w', buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+
+    threading.Thread(target=preload, name='acc-preload', daemon=True).start()
+    worker = Worker(protocol_out, max_jobs=max_jobs)
+    worker.notify('ready', {'pid': os.getpid(), 'max_jobs': max_jobs})
+    worker.serve(sys.stdin)
+
+
+if __name__ == "__main__":
+    main()
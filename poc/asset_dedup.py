@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Asset De-duplication
+Resolves the same asset reported by several sources (labelling spec, SLD,
+GA drawing, calc report, spec-generated registers) into one record
+
+Tags are normalised ('INV-01.1', 'INV 01-1' and 'Inverter 1 Block 1' all
+become 'INV-1-1'; 'Inverter 1' located in Block 1 does too) and, with a
+coarse asset class, form each record's blocking key - only records sharing
+a key and not placed in different locations are merged, so the work is
+linear in the number of records instead of pairwise. Merged records keep
+the first sighting's fields, fill gaps from later ones, and record which
+source documents reported each specification
+
+Inputs larger than the memory budget are hash-partitioned on the blocking
+key into spool files, each partition is resolved on its own, and the
+results are merged back in input order
+Usage: python3 asset_dedup.py <output.json|.jsonl> <input> [input ...] [--memory-mb N]
+"""
+import heapq
+import json
+import math
+import os
+import re
+import shutil
+import sys
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from asset_stream import iter_assets
+
+USAGE = "Usage: python3 asset_dedup.py <output.json|.jsonl> <input> [input ...] [--memory-mb N]"
+
+DEFAULT_MEMORY_MB = 256
+
+# In-memory size of a resolved record relative to its JSON line
+MEMORY_FACTOR = 6
+
+# Partition fan-out per level (also bounds open spool files) and how many
+# times a skewed partition may be split again with a new hash salt
+MAX_PARTITIONS = 128
+MAX_SPLIT_DEPTH = 3
+
+# Equipment names -> tag prefix, longest phrase first
+KIND_ALIASES = (
+    ('AUXILIARY TRANSFORMER', 'AUXTRF'),
+    ('RING MAIN UNIT', 'RMU'),
+    ('POWER STATION', 'BL'),
+    ('WEATHER STATION', 'WS'),
+    ('STRING COMBINER', 'CB'),
+    ('COMBINER BOX', 'CB'),
+    ('TRANSFORMER', 'TRF'),
+    ('INVERTER', 'INV'),
+    ('SUBSTATION', 'SUB'),
+    ('PCU', 'BL'),
+)
+KIND_PREFIXES = {'AUXTRF', 'RMU', 'BL', 'WS', 'CB', 'TRF', 'INV', 'SUB'}
+# Equipment there is one of per block, so its number is the block's
+PER_BLOCK_PREFIXES = {'AUXTRF', 'RMU', 'TRF'}
+_ALIAS_PATTERNS = [(re.compile(rf'\b{phrase}S?\b'), prefix) for phrase, prefix in KIND_ALIASES]
+_TOKEN = re.compile(r'[A-Z]+|\d+')
+_BLOCK_LOCATION = re.compile(r'\b(?:BLOCK|BL)[-_ ]?0*(\d+)\b')
+
+# Ratings and sizes ('33kV', '95mm2', '2750 kVA', '1500V') don't identify an asset on
+# their own; single-letter units only count on a free-standing number ('RMU-01A' is a tag)
+_UNIT_VALUE = re.compile(
+    r'\d+(?:[.,]\d+)?\s*(?:KVAR|KVA|KWP|KW|KV|MVA|MWP|MW|VDC|VAC|HZ|SQMM|MM2|MM²|MM)(?![A-Z0-9])'
+    r'|(?<![\w.\-])\d+(?:[.,]\d+)?(?:V|A|M|%)(?![A-Z0-9])'
+)
+
+STRUCTURE_WORDS = ('foundation', 'pile', 'structure', 'tracker', 'fence', 'building', 'road', 'footing')
+
+# Values that count as "not reported" when filling fields and specifications
+_EMPTY = (None, '', '...', [])
+
+
+def _canonical(text: Any) -> Optional[Tuple[str, bool]]:
+    """(tag, whether the tag already names its block) - see canonical_tag"""
+    if text is None:
+        return None
+    text = str(text).upper()
+    if not any(token.isdigit() for token in _TOKEN.findall(_UNIT_VALUE.sub(' ', text))):
+        return None
+    for pattern, prefix in _ALIAS_PATTERNS:
+        text = pattern.sub(prefix, text)
+    tokens = [str(int(token)) if token.isdigit() else token for token in _TOKEN.findall(text)]
+
+    block = next((tokens[i + 1] for i, token in enumerate(tokens[:-1])
+                  if token == 'BLOCK' and tokens[i + 1].isdigit()), None)
+    if block is not None:
+        for i, token in enumerate(tokens):
+            if token in KIND_PREFIXES:
+                number = tokens[i + 1] if i + 1 < len(tokens) and tokens[i + 1].isdigit() else None
+                return '-'.join([token, block] + ([number] if number else [])), True
+    # 'INV-01.1' (block.number), 'BL-08' (the block itself) and 'Block 3 ...' are block-qualified
+    blocked = block is not None or tokens[0] == 'BL' or sum(token.isdigit() for token in tokens) > 1
+    return '-'.join(tokens), blocked
+
+
+def canonical_tag(text: Any) -> Optional[str]:
+    """
+    Normalised tag of an asset identifier or name, or None if it carries no
+    number other than ratings and sizes (a bare 'Inverter' or '33kV Cable'
+    identifies nothing)
+    Equipment words become tag prefixes, numbers lose zero padding, and a
+    'Block n' anywhere in the text becomes the first number after the prefix
+    """
+    canonical = _canonical(text)
+    return canonical[0] if canonical else None
+
+
+def location_key(location: Any) -> Optional[str]:
+    """Normalised location - 'BLOCK-n' for anything naming a block ('Block 07', 'BL-07'), else its words"""
+    if location in _EMPTY:
+        return None
+    text = str(location).upper()
+    match = _BLOCK_LOCATION.search(text)
+    if match:
+        return f"BLOCK-{int(match.group(1))}"
+    words = _TOKEN.findall(text)
+    return ' '.join(str(int(word)) if word.isdigit() else word for word in words) or None
+
+
+def record_location(record: Dict[str, Any]) -> Optional[str]:
+    """location_key of a record's location, or of its block_number specification"""
+    location = location_key(record.get('location'))
+    if location is None:
+        specs = record.get('specifications')
+        if isinstance(specs, dict) and str(specs.get('block_number', '')).strip().isdigit():
+            location = f"BLOCK-{int(specs['block_number'])}"
+    return location
+
+
+def located_tag(text: Any, location: Optional[str] = None) -> Optional[str]:
+    """
+    canonical_tag qualified by a location_key when the tag doesn't name its
+    block itself - 'Combiner Box 3' in Block 7 is 'CB-7-3', never Block 9's
+    'CB-3'; outside a block the location is appended ('CB-3@SUBSTATION')
+    """
+    canonical = _canonical(text)
+    if canonical is None:
+        return None
+    tag, blocked = canonical
+    if blocked or location is None:
+        return tag
+    if location.startswith('BLOCK-'):
+        if tag.split('-')[0] in PER_BLOCK_PREFIXES and tag.split('-')[1:] == [location[6:]]:
+            return tag  # One per block, numbered after it ('TRF01', 'RMU-01' in Block 1)
+        return _canonical(f"{text} BLOCK {location[6:]}")[0]
+    return f"{tag}@{location}"
+
+
+def asset_class(record: Dict[str, Any]) -> str:
+    """'cable', 'structure' or 'equipment' - keeps a cable and a box with the same tag apart"""
+    text = ' '.join(str(record.get(field) or '') for field in ('type', 'category', 'name')).lower()
+    if 'cable' in text:
+        return 'cable'
+    if any(word in text for word in STRUCTURE_WORDS):
+        return 'structure'
+    return 'equipment'
+
+
+def blocking_key(record: Dict[str, Any]) -> Optional[str]:
+    """
+    '<class>|<tag>' from the asset id or, failing that, the name - located
+    by the record's block/location when the tag doesn't name its block;
+    None if neither is a tag
+    """
+    location = record_location(record)
+    for field in ('asset_id', 'name'):
+        tag = located_tag(record.get(field), location)
+        if tag:
+            return f"{asset_class(record)}|{tag}"
+    return None
+
+
+def record_source(record: Dict[str, Any]) -> str:
+    """Document (or generator) a record came from"""
+    for field in ('source_document', 'extraction_source', 'data_source'):
+        if record.get(field):
+            return str(record[field])
+    metadata = record.get('extraction_metadata')
+    if isinstance(metadata, dict) and metadata.get('source_document'):
+        return str(metadata['source_document'])
+    if isinstance(metadata, str):
+        # models.py metadata serialised with default=str
+        match = re.search(r"source_document='([^']*)'", metadata)
+        if match:
+            return match.group(1)
+    return 'unknown'
+
+
+def _start_entity(record: Dict[str, Any], key: str) -> Dict[str, Any]:
+    source = record_source(record)
+    merged = dict(record)
+    specs = record.get('specifications')
+    merged['specifications'] = dict(specs) if isinstance(specs, dict) else specs
+    merged['canonical_tag'] = key.split('|', 1)[1]
+    merged['sources'] = [source]
+    merged['specification_sources'] = {
+        spec: {source: value} for spec, value in (specs.items() if isinstance(specs, dict) else ())
+        if value not in _EMPTY
+    }
+    merged['merged_records'] = 1
+    return merged
+
+
+def _absorb(merged: Dict[str, Any], record: Dict[str, Any]):
+    """Fill what the entity is missing from a duplicate and note where each spec came from"""
+    source = record_source(record)
+    for field, value in record.items():
+        if field == 'specifications':
+            continue
+        if value not in _EMPTY and merged.get(field) in _EMPTY:
+            merged[field] = value
+    if isinstance(merged.get('confidence'), (int, float)) and isinstance(record.get('confidence'), (int, float)):
+        merged['confidence'] = max(merged['confidence'], record['confidence'])
+
+    specs = record.get('specifications')
+    if isinstance(specs, dict):
+        if not isinstance(merged.get('specifications'), dict):
+            merged['specifications'] = {}
+        for spec, value in specs.items():
+            if value in _EMPTY:
+                continue
+            if merged['specifications'].get(spec) in _EMPTY:
+                merged['specifications'][spec] = value
+            merged['specification_sources'].setdefault(spec, {}).setdefault(source, value)
+
+    if source not in merged['sources']:
+        merged['sources'].append(source)
+    merged['merged_records'] += 1
+
+
+def _resolve(entries: Iterable[Tuple[int, Optional[str], Dict[str, Any]]]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    (seq, key, record) in input order -> (first seq, entity) in first-seen
+    order; records without a key pass through unmerged, and a record whose
+    location conflicts with every entity under its key starts another one
+    """
+    entities: Dict[Any, List[Any]] = {}
+    slots: Dict[str, List[Any]] = {}
+    for seq, key, record in entries:
+        if key is None:
+            entities[seq] = [seq, record]
+            continue
+        location = record_location(record)
+        for slot in slots.get(key, ()):
+            entity = entities[slot][1]
+            entity_location = record_location(entity)
+            if location is None or entity_location is None or location == entity_location:
+                _absorb(entity, record)
+                break
+        else:
+            slot = (key, len(slots.setdefault(key, [])))
+            slots[key].append(slot)
+            entities[slot] = [seq, _start_entity(record, key)]
+    for seq, entity in entities.values():
+        yield seq, entity
+
+
+def deduplicate(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """In-memory de-duplication of a record stream that fits the budget"""
+    entries = ((seq, blocking_key(record), record) for seq, record in enumerate(records))
+    for _, entity in _resolve(entries):
+        yield entity
+
+
+def _partition_of(key: str, salt: int, partitions: int) -> int:
+    return zlib.crc32(f"{salt}:{key}".encode('utf-8')) % partitions
+
+
+def _read_lines(path: Path) -> Iterator[Any]:
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            yield json.loads(line)
+
+
+class AssetDeduplicator:
+    def __init__(self, memory_mb: int = DEFAULT_MEMORY_MB, work_dir: Optional[str] = None):
+        self.budget = memory_mb * 1024 * 1024
+        self.work_dir = work_dir
+        self.stats = {'records': 0, 'entities': 0, 'merged': 0, 'unkeyed': 0, 'partitions': 0}
+
+    def _partitions_for(self, size: int) -> int:
+        return min(MAX_PARTITIONS, math.ceil(size * MEMORY_FACTOR / self.budget))
+
+    def run(self, input_paths: List[Path], output_path: Path) -> Dict[str, int]:
+        """De-duplicate the records of every input (in order) into output_path"""
+        input_paths = [Path(path) for path in input_paths]
+        partitions = self._partitions_for(sum(os.path.getsize(path) for path in input_paths))
+        records = (record for path in input_paths for record in iter_assets(path))
+
+        if partitions <= 1:
+            self._write(output_path, self._count(deduplicate(self._counted(records))))
+            return self.stats
+
+        work = Path(tempfile.mkdtemp(prefix='asset_dedup_', dir=self.work_dir))
+        try:
+            spools, passthrough = self._spool(records, work, partitions)
+            resolved = [self._resolve_partition(path, size, work, depth=1) for path, size in spools]
+            streams = [_read_lines(path) for path in resolved + [passthrough]]
+            merged = heapq.merge(*streams, key=lambda line: line[0])
+            self._write(output_path, self._count(entity for _, entity in merged))
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+        return self.stats
+
+    def _counted(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for record in records:
+            self.stats['records'] += 1
+            yield record
+
+    def _count(self, entities: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for entity in entities:
+            self.stats['entities'] += 1
+            if 'merged_records' in entity:
+                self.stats['merged'] += entity['merged_records'] - 1
+            else:
+                self.stats['unkeyed'] += 1
+            yield entity
+
+    def _spool(self, records: Iterable[Dict[str, Any]], work: Path, partitions: int):
+        """Route keyed records to partition spools and the rest to a pass-through file"""
+        self.stats['partitions'] += partitions
+        paths = [work / f"part_{i:03d}.jsonl" for i in range(partitions)]
+        sizes = [0] * partitions
+        passthrough = work / "unkeyed.jsonl"
+        files = [open(path, 'w', encoding='utf-8') for path in paths]
+        try:
+            with open(passthrough, 'w', encoding='utf-8') as unkeyed:
+                for seq, record in enumerate(self._counted(records)):
+                    key = blocking_key(record)
+                    if key is None:
+                        unkeyed.write(json.dumps([seq, record]) + "\n")
+                        continue
+                    line = json.dumps([seq, key, record]) + "\n"
+                    index = _partition_of(key, 0, partitions)
+                    files[index].write(line)
+                    sizes[index] += len(line)
+        finally:
+            for f in files:
+                f.close()
+        return list(zip(paths, sizes)), passthrough
+
+    def _resolve_partition(self, path: Path, size: int, work: Path, depth: int) -> Path:
+        """
+        Resolve one spool into '<spool>.out' lines of [first seq, entity],
+        splitting it again with a new salt while it is over budget
+        """
+        output = path.with_suffix('.out')
+        parts = self._partitions_for(size)
+        if parts > 1 and depth <= MAX_SPLIT_DEPTH:
+            self.stats['partitions'] += parts
+            sub_paths = [path.with_name(f"{path.stem}_{i:03d}.jsonl") for i in range(parts)]
+            sub_sizes = [0] * parts
+            files = [open(sub_path, 'w', encoding='utf-8') for sub_path in sub_paths]
+            try:
+                with open(path, encoding='utf-8') as f:
+                    for line in f:
+                        key = json.loads(line)[1]
+                        index = _partition_of(key, depth, parts)
+                        files[index].write(line)
+                        sub_sizes[index] += len(line)
+            finally:
+                for f in files:
+                    f.close()
+            path.unlink()
+            resolved = [self._resolve_partition(sub_path, sub_size, work, depth + 1)
+                        for sub_path, sub_size in zip(sub_paths, sub_sizes)]
+            with open(output, 'w', encoding='utf-8') as out:
+                for line in heapq.merge(*(_read_lines(p) for p in resolved), key=lambda line: line[0]):
+                    out.write(json.dumps(line) + "\n")
+            for resolved_path in resolved:
+                resolved_path.unlink()
+            return output
+
+        with open(output, 'w', encoding='utf-8') as out:
+            for seq, entity in _resolve(_read_lines(path)):
+                out.write(json.dumps([seq, entity]) + "\n")
+        path.unlink()
+        return output
+
+    @staticmethod
+    def _write(output_path: Path, entities: Iterable[Dict[str, Any]]):
+        """JSONL, or a JSON array with one record per line (readable by asset_stream)"""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(exist_ok=True, parents=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            if output_path.suffix == '.jsonl':
+                for entity in entities:
+                    f.write(json.dumps(entity, ensure_ascii=False) + "\n")
+                return
+            f.write("[")
+            for i, entity in enumerate(entities):
+                f.write(("\n" if i == 0 else ",\n") + json.dumps(entity, ensure_ascii=False))
+            f.write("\n]\n")
+
+
+def main():
+    args = sys.argv[1:]
+    memory_mb = DEFAULT_MEMORY_MB
+    if '--memory-mb' in args:
+        i = args.index('--memory-mb')
+        try:
+            memory_mb = int(args[i + 1])
+        except (IndexError, ValueError):
+            print(USAGE, file=sys.stderr)
+            sys.exit(1)
+        del args[i:i + 2]
+    if len(args) < 2 or memory_mb < 1:
+        print(USAGE, file=sys.stderr)
+        sys.exit(1)
+
+    output_path = Path(args[0])
+    input_paths = [Path(path) for path in args[1:]]
+    for path in input_paths:
+        if not path.exists():
+            print(f"Error: Input file not found: {path}", file=sys.stderr)
+            sys.exit(1)
+
+    print(f"{'='*80}")
+    print("ASSET DE-DUPLICATION")
+    print(f"{'='*80}")
+    for path in input_paths:
+        print(f"Input: {path}")
+    print(f"Memory budget: {memory_mb} MB")
+
+    stats = AssetDeduplicator(memory_mb).run(input_paths, output_path)
+
+    print(f"\nRecords read:       {stats['records']}")
+    print(f"Assets written:     {stats['entities']}")
+    print(f"Duplicates merged:  {stats['merged']}")
+    print(f"Without a tag:      {stats['unkeyed']} (passed through)")
+    if stats['partitions']:
+        print(f"Partitions:         {stats['partitions']}")
+    print(f"\n✓ Saved de-duplicated assets to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Asset Register
+Columnar view of an asset list (extractor dicts, model dataclasses or an
+asset JSON/JSONL file) for summaries - one row per asset in pandas
+categorical columns plus a side table of specifications, so counts,
+histograms and filters run vectorized instead of looping over records
+Indexed by name, location, parent and category prefix for lookups and
+parent_asset hierarchy traversal
+Usage: python3 asset_register.py <assets_json> [asset_name]
+"""
+import json
+import re
+import sys
+from dataclasses import is_dataclass
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from asset_stream import iter_assets
+
+# Text columns stored as pandas categoricals (categories in first-seen order)
+CATEGORICAL_COLUMNS = ('name', 'category', 'type', 'location', 'parent', 'completeness', 'source')
+
+# Confidence bands used by the extraction summaries
+CONFIDENCE_BANDS = ("High (>0.9)", "Medium (0.7-0.9)", "Low (<0.7)")
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, str) and value.startswith('DataCompleteness.'):
+        return value.split('.', 1)[1]  # enum written with default=str
+    return value
+
+
+def _metadata_field(metadata: Any, field: str) -> Any:
+    """A field of extraction metadata - an object, a dict, or its repr as written with default=str"""
+    if metadata is None:
+        return None
+    if isinstance(metadata, dict):
+        return metadata.get(field)
+    if isinstance(metadata, str):
+        match = re.search(rf"{field}=('([^']*)'|[0-9.]+)", metadata)
+        if not match:
+            return None
+        return match.group(2) if match.group(2) is not None else float(match.group(1))
+    return getattr(metadata, field, None)
+
+
+def record_fields(record: Any) -> Dict[str, Any]:
+    """
+    Register fields of one asset - an extractor dict (unified/LLM/ACC
+    output) or a models.py dataclass (confidence and source then come from
+    its extraction metadata)
+    """
+    if is_dataclass(record):
+        metadata = getattr(record, 'extraction_metadata', None)
+        return {
+            'name': record.name,
+            'category': record.category,
+            'type': getattr(record, 'type', None),
+            'location': getattr(record, 'location', None),
+            'parent': getattr(record, 'parent_asset', None),
+            'confidence': _metadata_field(metadata, 'confidence'),
+            'completeness': _plain(getattr(record, 'data_completeness', None)),
+            'source': _metadata_field(metadata, 'source_document'),
+            'specifications': getattr(record, 'specifications', None) or {},
+        }
+    metadata = record.get('extraction_metadata')
+    return {
+        'name': record.get('name'),
+        'category': record.get('category'),
+        'type': record.get('type'),
+        'location': record.get('location'),
+        'parent': record.get('parent_asset'),
+        'confidence': (record['confidence'] if record.get('confidence') is not None
+                       else _metadata_field(metadata, 'confidence')),
+        'completeness': _plain(record.get('data_completeness')),
+        'source': (record.get('source_document') or record.get('extraction_source')
+                   or record.get('data_source') or _metadata_field(metadata, 'source_document')),
+        'specifications': record.get('specifications') or {},
+    }
+
+
+def _categorical(values: List[Any]) -> pd.Categorical:
+    """Categorical whose categories keep first-seen order (None -> missing)"""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+    return pd.Categorical.from_codes(codes, categories=pd.Index(uniques, dtype=object))
+
+
+class _RowIndex:
+    """
+    Rows of a categorical column grouped by category code (CSR layout):
+    the rows holding code c are rows[starts[c]:starts[c + 1]], ascending
+    """
+    def __init__(self, column: pd.Series):
+        codes = column.cat.codes.to_numpy()
+        present = codes >= 0
+        order = np.argsort(codes, kind='stable')
+        self.rows = order[len(codes) - int(present.sum()):]
+        counts = np.bincount(codes[present], minlength=len(column.cat.categories))
+        self.starts = np.concatenate(([0], np.cumsum(counts)))
+
+    def rows_of(self, code: int) -> np.ndarray:
+        if code < 0:
+            return self.rows[:0]
+        return self.rows[self.starts[code]:self.starts[code + 1]]
+
+
+def _code(column: pd.Series, value: Any) -> int:
+    """Category code of a value (hash lookup), -1 if no row holds it"""
+    try:
+        return column.cat.categories.get_loc(value)
+    except KeyError:
+        return -1
+
+
+def _category_prefixes(category: Any) -> List[str]:
+    """'A > B > C' -> ['A', 'A > B', 'A > B > C']"""
+    parts = [part.strip() for part in str(category).split('>')]
+    return [' > '.join(parts[:i]) for i in range(1, len(parts) + 1)]
+
+
+class AssetRegister:
+    """
+    frame: one row per asset - CATEGORICAL_COLUMNS, 'top_category' (the
+    category before the first '>') and float 'confidence' (NaN if missing)
+    specs: side table of (row, spec, value) for every specification entry,
+    in row order
+    Hash indexes on name, location, parent and category prefix (and the
+    row -> specs offsets) are built on first use; after that lookups cost
+    one hash probe plus the rows returned and their specifications
+    """
+    def __init__(self, frame: pd.DataFrame, specs: pd.DataFrame):
+        self.frame = frame
+        self.specs = specs
+        self._indexes: Dict[str, Any] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[Any]) -> 'AssetRegister':
+        columns: Dict[str, List[Any]] = {name: [] for name in CATEGORICAL_COLUMNS}
+        confidence: List[Any] = []
+        spec_rows: List[int] = []
+        spec_keys: List[str] = []
+        spec_values: List[Any] = []
+        for row, record in enumerate(records):
+            fields = record_fields(record)
+            for name in CATEGORICAL_COLUMNS:
+                columns[name].append(fields[name])
+            confidence.append(fields['confidence'])
+            specifications = fields['specifications']
+            if isinstance(specifications, Mapping):
+                for key, value in specifications.items():
+                    spec_rows.append(row)
+                    spec_keys.append(key)
+                    spec_values.append(value)
+
+        frame = pd.DataFrame({name: _categorical(values) for name, values in columns.items()})
+        frame['top_category'] = cls._top_level(frame['category'])
+        frame['confidence'] = pd.to_numeric(pd.Series(confidence, dtype=object), errors='coerce').astype(float)
+        specs = pd.DataFrame({
+            'row': np.asarray(spec_rows, dtype=np.int64),
+            'spec': _categorical(spec_keys),
+            'value': pd.Series(spec_values, dtype=object),
+        })
+        return cls(frame, specs)
+
+    @classmethod
+    def from_file(cls, path) -> 'AssetRegister':
+        """
+        Register of an asset JSON array / JSONL file, read record by record,
+        or of a dataset object with an 'assets' list (extract_complete_dataset,
+        run_all_extractors)
+        """
+        with open(path, encoding='utf-8') as f:
+            first = f.read(64).lstrip()[:1]
+        if first == '{' and not str(path).endswith('.jsonl'):
+            with open(path, encoding='utf-8') as f:
+                return cls.from_records(json.load(f).get('assets', []))
+        return cls.from_records(iter_assets(path))
+
+    @staticmethod
+    def _top_level(category: pd.Series) -> pd.Categorical:
+        # Split the (few) distinct categories, not every row
+        categories = category.cat.categories
+        top = pd.Series(categories, dtype=object).map(lambda c: str(c).split('>')[0].strip())
+        top_codes, top_uniques = pd.factorize(top)
+        codes = category.cat.codes.to_numpy()
+        mapped = np.where(codes >= 0, top_codes[np.maximum(codes, 0)], -1) if len(top_codes) else codes
+        return pd.Categorical.from_codes(mapped, categories=pd.Index(top_uniques, dtype=object))
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def filter(self, mask=None, **equals) -> 'AssetRegister':
+        """Rows matching a boolean mask and/or column == value conditions"""
+        keep = np.ones(len(self.frame), dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+        for column, value in equals.items():
+            keep &= (self.frame[column] == value).to_numpy()
+        return self.take(np.flatnonzero(keep))
+
+    def take(self, rows) -> 'AssetRegister':
+        """Register of the given rows (ascending), specifications included"""
+        rows = np.asarray(rows, dtype=np.int64)
+        frame = self.frame.iloc[rows].reset_index(drop=True)
+        spec_starts = self._spec_starts()
+        starts = spec_starts[rows]
+        lengths = spec_starts[rows + 1] - starts
+        # Spec positions of every taken row, gathered range by range
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - offsets, lengths) + np.arange(int(lengths.sum()))
+        specs = self.specs.iloc[positions].reset_index(drop=True)
+        specs['row'] = np.repeat(np.arange(len(rows)), lengths)
+        return AssetRegister(frame, specs)
+
+    def counts(self, column: str, order: str = 'count', missing: str = 'Unknown',
+               limit: Optional[int] = None) -> List[Tuple[Any, int]]:
+        """
+        (value, count) pairs for a categorical column; missing values count
+        under `missing`
+        order: 'count' (descending, ties in first-seen order), 'key'
+        (sorted by value) or 'first' (first-seen order)
+        """
+        col = self.frame[column]
+        codes = col.cat.codes.to_numpy()
+        if not len(codes):
+            return []
+        uniq, first, count = np.unique(codes, return_index=True, return_counts=True)
+        categories = col.cat.categories
+        merged: Dict[Any, List[int]] = {}
+        for code, first_row, n in zip(uniq.tolist(), first.tolist(), count.tolist()):
+            label = missing if code < 0 else categories[code]
+            if label in merged:
+                merged[label][0] += n
+                merged[label][1] = min(merged[label][1], first_row)
+            else:
+                merged[label] = [n, first_row]
+
+        if order == 'key':
+            items = sorted(merged.items(), key=lambda item: str(item[0]))
+        elif order == 'first':
+            items = sorted(merged.items(), key=lambda item: item[1][1])
+        else:
+            items = sorted(merged.items(), key=lambda item: (-item[1][0], item[1][1]))
+        pairs = [(label, n) for label, (n, _) in items]
+        return pairs[:limit] if limit is not None else pairs
+
+    def confidence_bands(self) -> List[Tuple[str, int]]:
+        """High (>0.9) / Medium (0.7-0.9) / Low (<0.7) counts - missing confidence counts as 0"""
+        confidence = self.frame['confidence'].fillna(0.0).to_numpy()
+        band = np.select([confidence > 0.9, confidence >= 0.7], [0, 1], default=2)
+        counts = np.bincount(band, minlength=len(CONFIDENCE_BANDS))
+        return list(zip(CONFIDENCE_BANDS, counts.tolist()))
+
+    def histogram(self, column: str = 'confidence', bins=10) -> Tuple[np.ndarray, np.ndarray]:
+        """np.histogram of a numeric column, ignoring missing values"""
+        values = self.frame[column].dropna().to_numpy()
+        return np.histogram(values, bins=bins)
+
+    def specifications(self, row: int) -> Dict[str, Any]:
+        spec_starts = self._spec_starts()
+        part = self.specs.iloc[spec_starts[row]:spec_starts[row + 1]]
+        return dict(zip(part['spec'].astype(object), part['value']))
+
+    def spec_values(self, spec: str) -> pd.Series:
+        """One specification across the register, indexed by row"""
+        part = self.specs[self.specs['spec'] == spec]
+        return pd.Series(part['value'].to_numpy(), index=part['row'].to_numpy(), name=spec)
+
+    # Indexed lookups and hierarchy (parent_asset names another asset's name)
+
+    def _index(self, column: str) -> _RowIndex:
+        if column not in self._indexes:
+            self._indexes[column] = _RowIndex(self.frame[column])
+        return self._indexes[column]
+
+    def _spec_starts(self) -> np.ndarray:
+        """CSR offsets of the specs table: row r's specifications are specs[starts[r]:starts[r + 1]]"""
+        if 'spec_starts' not in self._indexes:
+            self._indexes['spec_starts'] = np.searchsorted(
+                self.specs['row'].to_numpy(), np.arange(len(self.frame) + 1))
+        return self._indexes['spec_starts']
+
+    def _prefix_index(self) -> Dict[str, List[int]]:
+        """Category prefix -> codes of the categories under it"""
+        if 'category_prefix' not in self._indexes:
+            prefixes: Dict[str, List[int]] = {}
+            for code, category in enumerate(self.frame['category'].cat.categories):
+                for prefix in _category_prefixes(category):
+                    prefixes.setdefault(prefix.lower(), []).append(code)
+            self._indexes['category_prefix'] = prefixes
+        return self._indexes['category_prefix']
+
+    def _parent_of_name(self) -> np.ndarray:
+        """For each name category, its code in the parent column (-1 if nothing hangs under it)"""
+        if 'parent_of_name' not in self._indexes:
+            self._indexes['parent_of_name'] = self.frame['parent'].cat.categories.get_indexer(
+                self.frame['name'].cat.categories)
+        return self._indexes['parent_of_name']
+
+    def rows(self, name: str) -> np.ndarray:
+        """Rows of the asset(s) with this name"""
+        return self._index('name').rows_of(_code(self.frame['name'], name))
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Register fields of one row, specifications included (None for missing)"""
+        values = self.frame.iloc[row]
+        fields = {column: (None if pd.isna(values[column]) else values[column]) for column in self.frame.columns}
+        fields['specifications'] = self.specifications(row)
+        return fields
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Fields of the (first) asset with this name"""
+        rows = self.rows(name)
+        return self.record(int(rows[0])) if len(rows) else None
+
+    def in_location(self, location: str) -> 'AssetRegister':
+        return self.take(self._index('location').rows_of(_code(self.frame['location'], location)))
+
+    def in_category(self, prefix: str) -> 'AssetRegister':
+        """Assets whose category is, or is under, prefix ('Electrical > Transformers')"""
+        key = ' > '.join(part.strip() for part in prefix.split('>')).lower()
+        index = self._index('category')
+        parts = [index.rows_of(code) for code in self._prefix_index().get(key, ())]
+        return self.take(np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64))
+
+    def children(self, name: str) -> 'AssetRegister':
+        """Assets whose parent_asset is name"""
+        return self.take(self._index('parent').rows_of(_code(self.frame['parent'], name)))
+
+    def subtree(self, name: str, include_root: bool = True) -> 'AssetRegister':
+        """
+        Every asset below name (children, their children, ...), one index
+        probe per distinct node; a parent cycle is walked once
+        """
+        parent_index = self._index('parent')
+        parent_of_name = self._parent_of_name()
+        name_codes = self.frame['name'].cat.codes.to_numpy()
+        visited = np.zeros(len(self.frame), dtype=bool)
+
+        frontier = self.rows(name)
+        if not len(frontier):
+            frontier = self._index('parent').rows_of(_code(self.frame['parent'], name))
+            include_root = True  # name is only ever a parent (dangling) - its children are the subtree
+        visited[frontier] = True
+        found = [frontier] if include_root else []
+        while len(frontier):
+            named = name_codes[frontier]
+            codes = parent_of_name[named[named >= 0]]  # Unnamed rows have no children (-1 would wrap)
+            codes = np.unique(codes[codes >= 0])
+            if not len(codes):
+                break
+            children = np.concatenate([parent_index.rows_of(code) for code in codes])
+            children = children[~visited[children]]
+            visited[children] = True
+            found.append(children)
+            frontier = children
+        rows = np.sort(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+        return self.take(rows)
+
+    def ancestors(self, name: str) -> List[str]:
+        """Parent, grandparent, ... of name - stops at a root, a dangling parent or a cycle"""
+        chain: List[str] = []
+        seen = {name}
+        rows = self.rows(name)
+        while len(rows):
+            parent = self.frame['parent'].iat[int(rows[0])]
+            if pd.isna(parent) or parent in seen:
+                break
+            chain.append(parent)
+            seen.add(parent)
+            rows = self.rows(parent)
+        return chain
+
+    def dangling_parents(self) -> 'AssetRegister':
+        """Assets whose parent_asset names no asset in the register"""
+        parent = self.frame['parent']
+        name = self.frame['name']
+        # Categories survive take()/filter(), so check the name has rows, not just a category
+        name_codes = name.cat.codes.to_numpy()
+        has_rows = np.zeros(len(name.cat.categories) + 1, dtype=bool)
+        has_rows[name_codes[name_codes >= 0]] = True
+        resolved = has_rows[name.cat.categories.get_indexer(parent.cat.categories)]  # -1 hits the False pad
+        codes = parent.cat.codes.to_numpy()
+        if not len(resolved):
+            return self.take(np.empty(0, dtype=np.int64))
+        return self.take(np.flatnonzero((codes >= 0) & ~resolved[np.maximum(codes, 0)]))
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 asset_register.py <assets_json> [asset_name]", file=sys.stderr)
+        sys.exit(1)
+
+    register = AssetRegister.from_file(sys.argv[1])
+    print(f"{'='*80}")
+    print(f"ASSET REGISTER: {sys.argv[1]}")
+    print(f"{'='*80}")
+    print(f"Total assets: {len(register)}")
+    for category, count in register.counts('top_category'):
+        print(f"  {category}: {count}")
+
+    dangling = register.dangling_parents()
+    print(f"\nDangling parent references: {len(dangling)}")
+    for parent, count in dangling.counts('parent', limit=10):
+        print(f"  {parent}: {count} assets")
+
+    if len(sys.argv) > 2:
+        name = sys.argv[2]
+        asset = register.get(name)
+        print(f"\n### {name} ###")
+        if asset is None:
+            print("  Not in the register")
+        else:
+            print(f"  Category: {asset['category']}")
+            print(f"  Location: {asset['location']}")
+            print(f"  Ancestors: {' > '.join(reversed(register.ancestors(name))) or '(root)'}")
+        subtree = register.subtree(name, include_root=False)
+        print(f"  Descendants: {len(subtree)}")
+        for category, count in subtree.counts('category'):
+            print(f"    {category}: {count}")
+
+
+if __name__ == "__main__":
+    main()
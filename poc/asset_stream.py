@@ -0,0 +1,90 @@
+"""
+Asset Stream
+Reads asset records one at a time from a JSON array file or a JSONL file
+so exports and summaries never hold a whole register in memory
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+CHUNK_SIZE = 1024 * 1024
+_WHITESPACE = ' \t\r\n'
+_NUMBER_CHARS = set('0123456789.eE+-')
+
+
+def iter_assets(path, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records of a JSON array ('[{...}, {...}]') or, for .jsonl
+    files, one record per non-blank line
+    Arrays are decoded incrementally from fixed-size chunks, so memory is
+    bounded by the largest single record rather than the file
+    """
+    path = Path(path)
+    with open(path, encoding='utf-8') as f:
+        if path.suffix == '.jsonl':
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        yield from _iter_array(f, chunk_size, path)
+
+
+def _iter_array(f, chunk_size: int, path: Path) -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    buffer = f.read(chunk_size)
+    pos = 0
+    eof = not buffer
+    started = False
+    expect_value = True
+    after_comma = False
+
+    def refill() -> bool:
+        nonlocal buffer, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        if pos >= len(buffer):
+            if refill():
+                continue
+            raise ValueError(f"{path}: truncated JSON array" if started else f"{path}: empty file")
+
+        char = buffer[pos]
+        if not started:
+            if char != '[':
+                raise ValueError(f"{path}: expected a JSON array of assets")
+            started = True
+            pos += 1
+            continue
+        if char == ']':
+            if after_comma:
+                raise ValueError(f"{path}: trailing ',' before ']'")
+            return
+        if char == ',' and not expect_value:
+            expect_value = True
+            after_comma = True
+            pos += 1
+            continue
+        if not expect_value:
+            raise ValueError(f"{path}: expected ',' or ']' between records")
+
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if refill():
+                continue  # Record spans the chunk boundary
+            raise
+        if (not eof and isinstance(record, (int, float)) and all(c in _NUMBER_CHARS for c in buffer[end:])
+                and refill()):
+            continue  # The number may continue in the next chunk ('-4.' then '5e3')
+        pos = end
+        expect_value = False
+        after_comma = False
+        yield record
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Model Memory Benchmark
+Builds a register of DC string cables with the pre-slots models (plain
+dataclasses, one ExtractionMetadata per asset) and with models.py, and
+reports traced bytes per asset for each
+Usage: python3 benchmark_models.py [asset_count]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from models import DataCompleteness, EquipmentAsset, ExtractionMetadata
+
+
+# Baseline: the models as they were before slots, interning and shared metadata
+@dataclass
+class LegacyExtractionMetadata:
+    source_document: str
+    extraction_method: str
+    confidence: float
+    source_page: Optional[int] = None
+    extracted_at: datetime = field(default_factory=datetime.now)
+
+@dataclass
+class LegacyAsset:
+    name: str
+    category: str
+    status: str = "Specified"
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    description: Optional[str] = None
+    data_completeness: DataCompleteness = DataCompleteness.INSUFFICIENT
+    extraction_metadata: Optional[LegacyExtractionMetadata] = None
+
+@dataclass
+class LegacyEquipmentAsset(LegacyAsset):
+    manufacturer: Optional[str] = None
+    model: Optional[str] = None
+    specifications: Dict[str, Any] = field(default_factory=dict)
+
+
+def _cable_rows(count: int):
+    """
+    DC string cable rows as a table parse yields them - every formatted cell
+    is a fresh string, so repeated locations and sizes are separate objects
+    """
+    for i in range(count):
+        block, combiner, string = i // 2000 + 1, i // 20 % 100 + 1, i % 20 + 1
+        yield {
+            'name': f"DC-CABLE-B{block:02d}-CB{combiner:02d}-S{string:02d}",
+            'category': "Electrical > Cables > DC Cables",
+            'description': f"DC string cable {string} to combiner box {combiner} in Block {block}",
+            'page': i // 40 + 1,
+            'specifications': {
+                'cable_type': "DC Cable",
+                'conductor_size': f"{(4, 6, 10)[string % 3]}mm²",
+                'length_m': float(50 + i % 150),
+                'from_location': f"String {string:02d}",
+                'to_location': f"CB-{block:02d}.{combiner:02d}",
+            },
+        }
+
+
+def build_legacy(count: int):
+    return [
+        LegacyEquipmentAsset(
+            name=row['name'],
+            category=row['category'],
+            description=row['description'],
+            specifications=row['specifications'],
+            data_completeness=DataCompleteness.FULL,
+            extraction_metadata=LegacyExtractionMetadata(
+                source_document="GOO-ISE-EL-CAL-0002-C1_Low Voltage (DC) Calculation.pdf",
+                source_page=row['page'],
+                extraction_method="pdf_table_extractor",
+                confidence=0.9
+            )
+        )
+        for row in _cable_rows(count)
+    ]
+
+
+def build_compact(count: int):
+    metadata = {}
+    assets = []
+    for row in _cable_rows(count):
+        page = row['page']
+        if page not in metadata:
+            metadata[page] = ExtractionMetadata(
+                source_document="GOO-ISE-EL-CAL-0002-C1_Low Voltage (DC) Calculation.pdf",
+                source_page=page,
+                extraction_method="pdf_table_extractor",
+                confidence=0.9
+            )
+        assets.append(EquipmentAsset(
+            name=row['name'],
+            category=row['category'],
+            description=row['description'],
+            specifications=row['specifications'],
+            data_completeness=DataCompleteness.FULL,
+            extraction_metadata=metadata[page]
+        ))
+    return assets
+
+
+def measure(builder, count: int):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    assets = builder(count)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del assets
+    return current, peak, elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    print("="*80)
+    print(f"MODEL MEMORY BENCHMARK - {count:,} DC string cables")
+    print("="*80)
+
+    results = {}
+    for label, builder in (('before', build_legacy), ('after', build_compact)):
+        current, peak, elapsed = measure(builder, count)
+        results[label] = current
+        print(f"  {label:<7} {current / count:>8.0f} bytes/asset  "
+              f"{current / 2**20:>8.1f} MB held  {peak / 2**20:>8.1f} MB peak  {elapsed:>6.2f}s build")
+
+    print("="*80)
+    print(f"Per-asset memory reduced {results['before'] / results['after']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Cable Graph
+Connectivity network of the register: every cable's from/to endpoints
+(connectivity.from/to, or from_location/to_location / from/to in its
+specifications) become edges between interned endpoint nodes, matched to
+equipment by normalised tag (asset_dedup.canonical_tag) so 'INV-03.2' and
+'Inverter 2 Block 3' are one node; a tag that doesn't name its block takes
+the block of the record it came from, so 'Combiner Box 3' in Block 7 and in
+Block 9 stay two nodes
+
+Built in one pass over the records into flat int32 edge arrays, then CSR
+in/out adjacency (numpy), so millions of cables cost a few bytes each
+plus their names
+Usage: python3 cable_graph.py <assets_json> feeding <node> [--upstream]
+       python3 cable_graph.py <assets_json> path <from_node> <to_node>
+       python3 cable_graph.py <assets_json> unmatched
+"""
+import sys
+from array import array
+from collections import deque
+from dataclasses import is_dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from asset_dedup import asset_class, located_tag, record_location
+from asset_stream import iter_assets
+
+USAGE = """Usage: python3 cable_graph.py <assets_json> feeding <node> [--upstream]
+       python3 cable_graph.py <assets_json> path <from_node> <to_node>
+       python3 cable_graph.py <assets_json> unmatched"""
+
+# Edge cable index of a containment link (child -> parent_asset), not a cable
+WITHIN = -1
+
+
+def _fields(record: Any) -> Dict[str, Any]:
+    if is_dataclass(record):
+        from models import asset_to_dict
+        return asset_to_dict(record)
+    return record
+
+
+def cable_endpoints(record: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """(from, to) of a cable record, or None if it doesn't name both ends"""
+    connectivity = record.get('connectivity')
+    if isinstance(connectivity, Mapping) and connectivity.get('from') and connectivity.get('to'):
+        return str(connectivity['from']), str(connectivity['to'])
+    specs = record.get('specifications')
+    if isinstance(specs, Mapping):
+        for from_field, to_field in (('from_location', 'to_location'), ('from', 'to')):
+            if specs.get(from_field) and specs.get(to_field) and specs[from_field] != '...':
+                return str(specs[from_field]), str(specs[to_field])
+    return None
+
+
+def record_block(record: Dict[str, Any]) -> Optional[str]:
+    """'BLOCK-n' a record sits in, or None - other locations are free text and don't qualify node keys"""
+    location = record_location(record)
+    return location if location and location.startswith('BLOCK-') else None
+
+
+def node_key(text: str, block: Optional[str] = None) -> str:
+    """
+    Normalised tag (completed with block when it doesn't name one), or the
+    upper-cased text for endpoints without a tag number ('Substation', '33kV Switchboard')
+    """
+    return located_tag(text, block) or ' '.join(str(text).upper().split())
+
+
+class CableGraph:
+    def __init__(self):
+        self.node_names: List[str] = []       # display name per node id
+        self._node_ids: Dict[str, int] = {}   # normalised key -> node id
+        self._raw_ids: Dict[Tuple[str, Optional[str]], int] = {}  # repeated (spelling, block) -> node id
+        self.is_equipment = bytearray()
+        self.cable_names: List[str] = []
+        self._src = array('i')
+        self._dst = array('i')
+        self._cable = array('i')
+        self.skipped = 0                      # cable-like records without both endpoints
+
+    def node(self, text: str, block: Optional[str] = None, create: bool = False) -> Optional[int]:
+        """Node id of an endpoint or equipment name in block (None if unknown and not created)"""
+        node_id = self._raw_ids.get((text, block))
+        if node_id is not None:
+            return node_id
+        key = node_key(text, block)
+        node_id = self._node_ids.get(key)
+        if node_id is not None:
+            # Seen again - remember the spelling so it skips normalising next
+            # time (one-off endpoints such as combiner ids never get an entry)
+            self._raw_ids[(text, block)] = node_id
+            return node_id
+        if not create:
+            return None
+        node_id = self._node_ids[key] = len(self.node_names)
+        self.node_names.append(text)
+        self.is_equipment.append(0)
+        return node_id
+
+    def _edge(self, src: int, dst: int, cable: int):
+        self._src.append(src)
+        self._dst.append(dst)
+        self._cable.append(cable)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Any]) -> 'CableGraph':
+        """
+        One pass: cables become edges, equipment marks (and names) its node,
+        parent_asset adds a containment link used by path(); names are
+        placed in the record's block
+        """
+        graph = cls()
+        for record in records:
+            record = _fields(record)
+            name = record.get('name')
+            block = record_block(record)
+            endpoints = cable_endpoints(record)
+            if endpoints:
+                cable = len(graph.cable_names)
+                graph.cable_names.append(str(name or f"cable #{cable}"))
+                graph._edge(graph.node(endpoints[0], block, create=True),
+                            graph.node(endpoints[1], block, create=True), cable)
+                continue
+            if asset_class(record) == 'cable':
+                graph.skipped += 1
+                continue
+            if not name:
+                continue
+            node_id = graph.node(str(name), block, create=True)
+            if not graph.is_equipment[node_id]:
+                graph.is_equipment[node_id] = 1
+                graph.node_names[node_id] = str(name)
+            parent = record.get('parent_asset')
+            if parent:
+                graph._edge(node_id, graph.node(str(parent), block, create=True), WITHIN)
+        graph._build()
+        return graph
+
+    @classmethod
+    def from_file(cls, path) -> 'CableGraph':
+        return cls.from_records(iter_assets(path))
+
+    def _build(self):
+        """CSR adjacency: out-edges of n are out_edges[out_starts[n]:out_starts[n + 1]] (edge ids)"""
+        nodes = len(self.node_names)
+        self.src = np.frombuffer(self._src, dtype=np.int32) if len(self._src) else np.empty(0, dtype=np.int32)
+        self.dst = np.frombuffer(self._dst, dtype=np.int32) if len(self._dst) else np.empty(0, dtype=np.int32)
+        self.cable = np.frombuffer(self._cable, dtype=np.int32) if len(self._cable) else np.empty(0, dtype=np.int32)
+        self.out_edges = np.argsort(self.src, kind='stable').astype(np.int32)
+        self.out_starts = np.concatenate(([0], np.cumsum(np.bincount(self.src, minlength=nodes))))
+        self.in_edges = np.argsort(self.dst, kind='stable').astype(np.int32)
+        self.in_starts = np.concatenate(([0], np.cumsum(np.bincount(self.dst, minlength=nodes))))
+
+    def _out(self, node_id: int) -> np.ndarray:
+        return self.out_edges[self.out_starts[node_id]:self.out_starts[node_id + 1]]
+
+    def _in(self, node_id: int) -> np.ndarray:
+        return self.in_edges[self.in_starts[node_id]:self.in_starts[node_id + 1]]
+
+    @property
+    def cable_count(self) -> int:
+        return len(self.cable_names)
+
+    def feeding(self, name: str, upstream: bool = False) -> List[str]:
+        """
+        Cables whose 'to' end is name; upstream=True follows them back
+        (cables feeding those cables' sources, and so on)
+        """
+        start = self.node(name)
+        if start is None:
+            return []
+        seen = {start}
+        queue = deque([start])
+        cables: List[str] = []
+        while queue:
+            edges = self._in(queue.popleft())
+            for edge in edges[self.cable[edges] != WITHIN].tolist():
+                cables.append(self.cable_names[self.cable[edge]])
+                src = int(self.src[edge])
+                if upstream and src not in seen:
+                    seen.add(src)
+                    queue.append(src)
+        return cables
+
+    def path(self, start_name: str, end_name: str) -> Optional[List[Tuple[Optional[str], str]]]:
+        """
+        Shortest hop path between two nodes, cables traversed in either
+        direction and containment (child -> parent_asset) links included:
+        [(None, start), (cable or None if a containment link, node), ...]
+        None if the nodes are not connected
+        """
+        start, end = self.node(start_name), self.node(end_name)
+        if start is None or end is None:
+            return None
+        previous: Dict[int, Tuple[int, int]] = {start: (-1, -1)}
+        queue = deque([start])
+        while queue and end not in previous:
+            node_id = queue.popleft()
+            for edges, far in ((self._out(node_id), self.dst), (self._in(node_id), self.src)):
+                for edge in edges.tolist():
+                    neighbour = int(far[edge])
+                    if neighbour not in previous:
+                        previous[neighbour] = (node_id, edge)
+                        queue.append(neighbour)
+        if end not in previous:
+            return None
+
+        steps: List[Tuple[Optional[str], str]] = []
+        node_id = end
+        while node_id != start:
+            parent, edge = previous[node_id]
+            cable = int(self.cable[edge])
+            steps.append((None if cable == WITHIN else self.cable_names[cable], self.node_names[node_id]))
+            node_id = parent
+        steps.append((None, self.node_names[start]))
+        return steps[::-1]
+
+    def unmatched_endpoints(self) -> List[Tuple[str, int]]:
+        """Cable endpoints that match no equipment asset, with how many cables end there (most first)"""
+        if not self.cable_count:
+            return []
+        cabled = self.cable != WITHIN
+        counts = (np.bincount(self.src[cabled], minlength=len(self.node_names))
+                  + np.bincount(self.dst[cabled], minlength=len(self.node_names)))
+        equipment = np.frombuffer(bytes(self.is_equipment), dtype=np.uint8).astype(bool)
+        nodes = np.flatnonzero((counts > 0) & ~equipment)
+        nodes = nodes[np.argsort(-counts[nodes], kind='stable')]
+        return [(self.node_names[n], int(counts[n])) for n in nodes.tolist()]
+
+
+def main():
+    args = sys.argv[1:]
+    commands = {'feeding': (3, 4), 'path': (4, 4), 'unmatched': (2, 2)}  # argument counts
+    if len(args) < 2 or args[1] not in commands or not commands[args[1]][0] <= len(args) <= commands[args[1]][1]:
+        print(USAGE, file=sys.stderr)
+        sys.exit(1)
+
+    graph = CableGraph.from_file(args[0])
+    print(f"{'='*80}")
+    print(f"CABLE GRAPH: {args[0]}")
+    print(f"{'='*80}")
+    print(f"Cables: {graph.cable_count}  Nodes: {len(graph.node_names)}  "
+          f"Equipment: {sum(graph.is_equipment)}  Cables without endpoints: {graph.skipped}")
+
+    command = args[1]
+    if command == 'feeding':
+        upstream = len(args) > 3 and args[3] == '--upstream'
+        cables = graph.feeding(args[2], upstream=upstream)
+        print(f"\n{len(cables)} cables {'upstream of' if upstream else 'feeding'} {args[2]}:")
+        for cable in cables[:50]:
+            print(f"  {cable}")
+        if len(cables) > 50:
+            print(f"  ... {len(cables) - 50} more")
+    elif command == 'path':
+        steps = graph.path(args[2], args[3])
+        if steps is None:
+            print(f"\nNo connection between {args[2]} and {args[3]}")
+        else:
+            print(f"\nPath from {args[2]} to {args[3]} ({len(steps) - 1} hops):")
+            print(f"  {steps[0][1]}")
+            for cable, node in steps[1:]:
+                print(f"  -> {node} via {cable or '(within parent)'}")
+    else:
+        unmatched = graph.unmatched_endpoints()
+        print(f"\n{len(unmatched)} endpoints match no equipment asset:")
+        for node, count in unmatched[:50]:
+            print(f"  {node}: {count} cables")
+        if len(unmatched) > 50:
+            print(f"  ... {len(unmatched) - 50} more")
+
+
+if __name__ == "__main__":
+    main()
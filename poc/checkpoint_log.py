@@ -0,0 +1,73 @@
+"""
+Checkpoint Log
+Append-only JSONL record of every processed document so a crashed or
+interrupted run can resume where it stopped, or replay only failures
+One line per document: {"log": <log entry>, ...stage payload}
+A completed run ends with a {"finished": true} line
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+class CheckpointLog:
+    def __init__(self, checkpoint_path: Path, resume: bool = False, retry_failed: bool = False):
+        """
+        resume=True continues an interrupted run (a finished one starts over);
+        retry_failed=True reopens the last run, finished or not, to replay its
+        errors; neither starts a fresh checkpoint
+        """
+        self.checkpoint_path = Path(checkpoint_path)
+        self.checkpoint_path.parent.mkdir(exist_ok=True, parents=True)
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.finished = False
+
+        if resume or retry_failed:
+            self._load()
+            if self.finished and not retry_failed:
+                self.records = {}
+        keep = bool(self.records)
+        self._file = open(self.checkpoint_path, 'a' if keep else 'w')
+
+    def _load(self):
+        """Latest record per document path - a torn last line from a crash is ignored"""
+        if not self.checkpoint_path.exists():
+            return
+        with open(self.checkpoint_path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get('finished'):
+                    self.finished = True
+                    continue
+                self.finished = False
+                self.records[record['log']['path']] = record
+
+    def completed(self, path: str) -> Optional[Dict[str, Any]]:
+        """Record of a document that finished without error in a previous attempt"""
+        record = self.records.get(str(path))
+        if record and 'error' not in record['log']:
+            return record
+        return None
+
+    def failed(self, path: str) -> bool:
+        record = self.records.get(str(path))
+        return bool(record) and 'error' in record['log']
+
+    def append(self, record: Dict[str, Any]):
+        """Write one document's record and push it to disk before moving on"""
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.records[record['log']['path']] = record
+
+    def mark_finished(self):
+        self._file.write(json.dumps({'finished': True}) + '\n')
+        self._file.flush()
+        self.finished = True
+
+    def close(self):
+        self._file.close()
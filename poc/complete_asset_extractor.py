@@ -3,10 +3,14 @@ Complete Asset Extractor for Goonumbla Solar Farm
 Extracts all major asset types from multiple document sources
 """
 from pathlib import Path
-from models import EquipmentAsset, ExtractionMetadata
+from models import EquipmentAsset, ExtractionMetadata, asset_to_dict
+from project_template import load_template, expand
 import json
 from datetime import datetime
 
+# Site hierarchy and naming patterns (templates/goonumbla.json)
+PROJECT_TEMPLATE = "goonumbla"
+
 class CompleteAssetExtractor:
     def __init__(self, base_path: str):
         self.base_path = Path(base_path)
@@ -78,146 +82,19 @@ class CompleteAssetExtractor:
         Generate equipment assets based on the equipment labeling specification
         This creates placeholder assets with correct naming and quantities
         """
-        equipment = []
-        
-        # Power Stations (16 blocks)
-        for block in range(1, 17):
-            equipment.append(EquipmentAsset(
-                name=f"BL-{block:02d}",
-                category="Solar > Power Stations",
-                description=f"Power Station (Skid Solution) for Block {block}",
-                specifications={"block_number": block},
-                extraction_metadata=ExtractionMetadata(
-                    source_document="GOO-ISE-GE-RPT-0001-C2",
-                    extraction_method="equipment_labeling_spec",
-                    confidence=0.9
-                )
-            ))
-        
-        # Inverters (31 total: 2 per block except block 04 which has 1)
-        for block in range(1, 17):
-            inv_count = 1 if block == 4 else 2
-            for inv in range(1, inv_count + 1):
-                equipment.append(EquipmentAsset(
-                    name=f"INV-{block:02d}.{inv}",
-                    category="Electrical > Inverters",
-                    description=f"Inverter {inv} in Block {block}",
-                    specifications={"block_number": block, "inverter_number": inv},
-                    extraction_metadata=ExtractionMetadata(
-                        source_document="GOO-ISE-GE-RPT-0001-C2",
-                        extraction_method="equipment_labeling_spec",
-                        confidence=0.9
-                    )
-                ))
-        
-        # LV/MV Transformers (1 per block)
-        for block in range(1, 17):
-            equipment.append(EquipmentAsset(
-                name=f"TRF{block:02d}",
-                category="Electrical > Transformers > LV/MV Transformers",
-                description=f"LV/MV Transformer for Block {block}",
-                specifications={"block_number": block},
-                extraction_metadata=ExtractionMetadata(
-                    source_document="GOO-ISE-GE-RPT-0001-C2",
-                    extraction_method="equipment_labeling_spec",
-                    confidence=0.9
-                )
-            ))
-        
-        # LV/LV Auxiliary Transformers (1 per block)
-        for block in range(1, 17):
-            equipment.append(EquipmentAsset(
-                name=f"AUXTRF{block:02d}",
-                category="Electrical > Transformers > LV/LV Auxiliary Transformers",
-                description=f"LV/LV Auxiliary Transformer for Block {block}",
-                specifications={"block_number": block},
-                extraction_metadata=ExtractionMetadata(
-                    source_document="GOO-ISE-GE-RPT-0001-C2",
-                    extraction_method="equipment_labeling_spec",
-                    confidence=0.9
-                )
-            ))
-        
-        # RMUs (Ring Main Units - 1 per block)
-        for block in range(1, 17):
-            equipment.append(EquipmentAsset(
-                name=f"RMU-{block:02d}",
-                category="Electrical > Switchgear > Ring Main Units",
-                description=f"Ring Main Unit for Block {block}",
-                specifications={"block_number": block},
-                extraction_metadata=ExtractionMetadata(
-                    source_document="GOO-ISE-GE-RPT-0001-C2",
-                    extraction_method="equipment_labeling_spec",
-                    confidence=0.9
-                )
-            ))
-        
-        # Switchgears in RMU (3 per RMU)
-        for block in range(1, 17):
-            for sw in range(1, 4):
-                equipment.append(EquipmentAsset(
-                    name=f"RMU-{block:02d}/{sw}",
-                    category="Electrical > Switchgear",
-                    description=f"Switchgear {sw} in RMU-{block:02d}",
-                    specifications={"block_number": block, "switchgear_position": sw},
-                    extraction_metadata=ExtractionMetadata(
-                        source_document="GOO-ISE-GE-RPT-0001-C2",
-                        extraction_method="equipment_labeling_spec",
-                        confidence=0.9
-                    )
-                ))
-        
-        # Substation
-        equipment.append(EquipmentAsset(
-            name="SUB-01",
-            category="Electrical > Substations > 33/66kV Substation",
-            description="Main 33/66kV Substation",
-            extraction_metadata=ExtractionMetadata(
-                source_document="GOO-ISE-GE-RPT-0001-C2",
-                extraction_method="equipment_labeling_spec",
-                confidence=0.9
-            )
-        ))
-        
-        # Substation Feeders (5 feeders)
-        for feeder in range(1, 6):
-            equipment.append(EquipmentAsset(
-                name=f"SUBF-{feeder:02d}",
-                category="Electrical > Feeders > 33kV Substation Feeders",
-                description=f"33kV Substation Feeder {feeder}",
-                specifications={"feeder_number": feeder},
-                extraction_metadata=ExtractionMetadata(
-                    source_document="GOO-ISE-GE-RPT-0001-C2",
-                    extraction_method="equipment_labeling_spec",
-                    confidence=0.9
-                )
-            ))
-        
-        # Auxiliary Substation Transformer
-        equipment.append(EquipmentAsset(
-            name="AUXSUBTRF",
-            category="Electrical > Transformers > MV/LV Auxiliary Transformers",
-            description="MV/LV Auxiliary Transformer at Substation",
-            extraction_metadata=ExtractionMetadata(
-                source_document="GOO-ISE-GE-RPT-0001-C2",
-                extraction_method="equipment_labeling_spec",
-                confidence=0.9
-            )
-        ))
-        
-        # Weather Station
-        equipment.append(EquipmentAsset(
-            name="WS-01",
-            category="SCADA > Meteorological Stations",
-            description="Autonomous Weather Station",
-            extraction_metadata=ExtractionMetadata(
-                source_document="GOO-ISE-GE-RPT-0001-C2",
-                extraction_method="equipment_labeling_spec",
-                confidence=0.9
-            )
-        ))
+        # One metadata instance shared by every generated asset
+        metadata = ExtractionMetadata(
+            source_document="GOO-ISE-GE-RPT-0001-C2",
+            extraction_method="equipment_labeling_spec",
+            confidence=0.9
+        )
         
-        return equipment
+        # Power stations, inverters (block 04 has one), transformers, RMUs and
+        # their switchgear, substation equipment - see templates/goonumbla.json
+        return [
+            EquipmentAsset(**record, extraction_metadata=metadata)
+            for record in expand(load_template(PROJECT_TEMPLATE), 'labeling_spec')
+        ]
     
     def extract_substation_equipment(self):
         """Extract substation equipment - placeholder for now"""
@@ -233,35 +110,26 @@ class CompleteAssetExtractor:
         # Save JSON
         json_file = output_dir / f"goonumbla_complete_assets_{timestamp}.json"
         with open(json_file, 'w') as f:
-            json.dump([asset.__dict__ for asset in self.assets], f, indent=2, default=str)
+            json.dump([asset_to_dict(asset) for asset in self.assets], f, indent=2, default=str)
         
         print(f"\n✓ Saved complete asset list to: {json_file}")
         
         # Generate summary
+        from asset_register import AssetRegister  # pandas/numpy only when summarising
+        register = AssetRegister.from_records(self.assets)
         summary_file = output_dir / f"extraction_summary_{timestamp}.md"
         with open(summary_file, 'w') as f:
             f.write("# Goonumbla Solar Farm - Complete Asset Extraction Summary\n\n")
             f.write(f"**Extraction Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            f.write(f"**Total Assets:** {len(self.assets)}\n\n")
-            
-            # Count by category
-            categories = {}
-            for asset in self.assets:
-                cat = asset.category.split(">")[0].strip()
-                categories[cat] = categories.get(cat, 0) + 1
+            f.write(f"**Total Assets:** {len(register)}\n\n")
             
             f.write("## Assets by Category\n\n")
-            for cat, count in sorted(categories.items()):
+            for cat, count in register.counts('top_category', order='key'):
                 f.write(f"- **{cat}:** {count} assets\n")
             
             f.write("\n## Data Completeness\n\n")
-            completeness = {}
-            for asset in self.assets:
-                comp = asset.data_completeness if hasattr(asset, 'data_completeness') else "UNKNOWN"
-                completeness[comp] = completeness.get(comp, 0) + 1
-            
-            for comp, count in completeness.items():
-                pct = (count / len(self.assets)) * 100
+            for comp, count in register.counts('completeness', order='first', missing='UNKNOWN'):
+                pct = (count / len(register)) * 100
                 f.write(f"- **{comp}:** {count} assets ({pct:.1f}%)\n")
         
         print(f"✓ Saved extraction summary to: {summary_file}")
@@ -4,79 +4,239 @@ Extracts assets from all asset-relevant documents identified by the document rev
 Uses LLM to extract structured asset data from each document
 """
 import json
+import os
+import sys
+from collections import deque
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from datetime import datetime
-import pdfplumber
-from openai import OpenAI
+from concurrent.futures import Future
+from page_store import load_pages, timed_out_pages
+from parallel_parser import DocumentParser
+from corpus_manifest import CorpusManifest
+from checkpoint_log import CheckpointLog
+from progress_events import ProgressReporter
+from usage_ledger import UsageLedger, default_job_id, ledger_path
+from llm_client import LLMClient, MAX_IN_FLIGHT
+from document_windows import (EXTRACT_WINDOW_TOKENS, OVERLAP_PAGES, page_windows, split_window,
+                              window_label, window_text, merge_window_assets)
+
+OUTPUT_DIR = Path("/home/ubuntu/acc-tools/poc/output")
+
+# Part of the LLM response cache key - bump when the prompt or its parsing changes
+EXTRACT_PROMPT_VERSION = "extract-assets-1"
 
 class ComprehensiveAssetExtractor:
-    def __init__(self, asset_relevant_docs_file: str):
+    def __init__(self, asset_relevant_docs_file: str, workers: int = 1, llm_concurrency: int = MAX_IN_FLIGHT,
+                 window_tokens: int = EXTRACT_WINDOW_TOKENS, overlap_pages: int = OVERLAP_PAGES,
+                 progress_sink=None, **parser_options):
         self.asset_relevant_docs_file = Path(asset_relevant_docs_file)
         with open(self.asset_relevant_docs_file) as f:
             self.asset_docs = json.load(f)
         
-        self.client = OpenAI()
+        # Extraction requests for a batch run concurrently while later PDFs parse
+        # Every LLM call and PDF parse of this run is recorded in the usage ledger
+        self.ledger = UsageLedger(ledger_path(OUTPUT_DIR), job=default_job_id('extract'))
+        self.llm = LLMClient(max_in_flight=llm_concurrency, ledger=self.ledger)
+        # Long documents are extracted in page-aligned windows of this many prompt tokens
+        self.window_tokens = window_tokens
+        self.overlap_pages = overlap_pages
+        self.windowed_docs = 0
+        # parser_options: shard_threshold / shard_size for page-sharding large PDFs,
+        # max_docs_per_worker / max_worker_rss_mb for worker recycling,
+        # page_timeout / doc_timeout / degraded_retry for the parse watchdog
+        self.parser = DocumentParser(workers=workers, ledger=self.ledger, **parser_options)
         self.extracted_assets = []
         self.extraction_log = []
+        self.manifest = CorpusManifest(OUTPUT_DIR / "corpus_manifest.json")
+        self.incremental = False
+        self.previous_assets = {}
+        self.retry_failed = False
+        self.checkpoint = None
+        self.progress = None
+        self.progress_sink = progress_sink
+        self.unchanged_docs = 0
+        self.resumed_docs = 0
         
-    def extract_all_assets(self, start_idx: int = 0, batch_size: int = 50):
+    def extract_all_assets(self, start_idx: int = 0, batch_size: int = 50, incremental: bool = False,
+                           resume: bool = False, retry_failed: bool = False):
         """
         Extract assets from all asset-relevant documents
         Uses LLM to identify and extract structured asset data
+        incremental=True carries over the assets of documents whose content
+        hasn't changed since the last run and only extracts new/modified ones
+        resume=True skips documents already completed in the checkpoint log;
+        retry_failed=True only re-extracts documents whose log entry has an error
         """
+        self.incremental = incremental
+        self.retry_failed = retry_failed
+        self.checkpoint = CheckpointLog(OUTPUT_DIR / "asset_extraction_checkpoint.jsonl",
+                                        resume=resume, retry_failed=retry_failed)
+        if incremental:
+            self.previous_assets = self._load_previous_assets()
+        
         total = len(self.asset_docs)
+        self.progress = ProgressReporter('extract', max(total - start_idx, 0), job=self.ledger.job,
+                                         sink=self.progress_sink)
+        self.progress.start()
         print(f"{'='*80}", flush=True)
         print(f"COMPREHENSIVE ASSET EXTRACTION", flush=True)
         print(f"{'='*80}", flush=True)
         print(f"Total asset-relevant documents: {total}", flush=True)
         print(f"Starting from index: {start_idx}", flush=True)
         print(f"Batch size: {batch_size}", flush=True)
+        print(f"Parser workers: {self.parser.workers} | LLM requests in flight: {self.llm.max_in_flight}", flush=True)
+        print(f"Incremental: {incremental}", flush=True)
+        print(f"Resume: {resume} | Retry failed only: {retry_failed}", flush=True)
         print(f"{'='*80}\n", flush=True)
         
-        for i in range(start_idx, total, batch_size):
-            batch_end = min(i + batch_size, total)
-            batch_docs = self.asset_docs[i:batch_end]
-            
-            print(f"\n[Batch {i//batch_size + 1}] Extracting from documents {i+1} to {batch_end} of {total}", flush=True)
-            
-            self._extract_batch(batch_docs, i)
-            
-            # Save progress after each batch
+        try:
+            for i in range(start_idx, total, batch_size):
+                batch_end = min(i + batch_size, total)
+                batch_docs = self.asset_docs[i:batch_end]
+                
+                print(f"\n[Batch {i//batch_size + 1}] Extracting from documents {i+1} to {batch_end} of {total}", flush=True)
+                
+                self._extract_batch(batch_docs, i)
+                
+                print(f"  ✓ Batch complete. Total assets extracted: {len(self.extracted_assets)}", flush=True)
+            self.checkpoint.mark_finished()
+            self.progress.done(assets=len(self.extracted_assets), llm=self.llm.stats())
+        finally:
+            self.progress.close()
+            self.parser.close()
+            self.llm.close()
+            self.ledger.close()
+            self.checkpoint.close()
+            # Progress is checkpointed per document - full outputs are written once
             self._save_progress()
-            
-            print(f"  ✓ Batch complete. Total assets extracted: {len(self.extracted_assets)}", flush=True)
         
         print(f"\n{'='*80}", flush=True)
         print(f"EXTRACTION COMPLETE", flush=True)
         print(f"{'='*80}", flush=True)
         print(f"Total documents processed: {total}", flush=True)
         print(f"Total assets extracted: {len(self.extracted_assets)}", flush=True)
+        if incremental:
+            print(f"Unchanged documents reused: {self.unchanged_docs}", flush=True)
+        if resume or retry_failed:
+            print(f"Documents resumed from checkpoint: {self.resumed_docs}", flush=True)
+        llm_stats = self.llm.stats()
+        print(f"LLM calls: {llm_stats['calls']} (retries {llm_stats['retries']}, "
+              f"rate backoffs {llm_stats['backoffs']}, final limit {llm_stats['rpm_limit']} RPM, "
+              f"cache hits {llm_stats['cache_hits']})", flush=True)
+        print(f"Documents extracted in multiple windows: {self.windowed_docs}", flush=True)
         print(f"{'='*80}\n", flush=True)
         
         return self.extracted_assets
     
     def _extract_batch(self, batch_docs: List[Dict], start_idx: int):
-        """Extract assets from a batch of documents"""
+        """Extract assets from a batch of documents - PDFs are parsed in parallel, results handled in order"""
+        plans = [self._plan_document(d) for d in batch_docs]
+        needs_parse = [plan == 'extract' and Path(d['path']).exists() for d, plan in zip(batch_docs, plans)]
+        parsed = self.parser.parse(d['path'] for d, ok in zip(batch_docs, needs_parse) if ok)
+        
+        # Submit each document's extraction as soon as it is parsed so the
+        # LLM requests overlap with parsing and with each other
+        submitted = {}
+        for idx, ok in enumerate(needs_parse):
+            if ok:
+                parse_result = next(parsed)
+                pending = None
+                if 'error' not in parse_result:
+                    windows = self._extract_document_windows(Path(batch_docs[idx]['path']), parse_result)
+                    pending = self._submit_extraction(windows, batch_docs[idx])
+                submitted[idx] = (parse_result, pending)
+        
         for idx, doc_entry in enumerate(batch_docs):
             doc_idx = start_idx + idx + 1
+            plan = plans[idx]
+            if plan == 'skip':
+                self._report(doc_idx, doc_entry, 'skipped')
+                continue
+            if plan == 'resume':
+                self._resume_extraction(doc_entry, doc_idx)
+                continue
+            if plan != 'extract':
+                self._reuse_extraction(plan, doc_entry, doc_idx)
+                continue
+            self._extract_from_document(doc_entry, doc_idx, submitted=submitted.get(idx))
+    
+    def _plan_document(self, doc_entry: Dict):
+        """
+        'extract', 'resume' (completed in the checkpoint), 'skip' (retry-failed
+        mode, never attempted) or the manifest log entry of an unchanged document
+        """
+        if self.checkpoint.completed(doc_entry['path']) is not None:
+            return 'resume'
+        if self.retry_failed and not self.checkpoint.failed(doc_entry['path']):
+            return 'skip'
+        if self.incremental:
+            entry = self.manifest.get_unchanged(doc_entry['path'], 'extraction')
+            if entry is not None:
+                return entry
+        return 'extract'
+    
+    def _resume_extraction(self, doc_entry: Dict, doc_idx: int):
+        """Restore a document's assets and log entry from the checkpoint"""
+        record = self.checkpoint.completed(doc_entry['path'])
+        self.extracted_assets.extend(record['assets'])
+        self.extraction_log.append(dict(record['log'], index=doc_idx))
+        self.manifest.record(doc_entry['path'], 'extraction', record['log'])
+        self.resumed_docs += 1
+        print(f"  [{doc_idx}] = Resumed ({len(record['assets'])} assets): {doc_entry['filename']}", flush=True)
+        self._report(doc_idx, doc_entry, 'resumed')
+    
+    def _load_previous_assets(self) -> Dict[str, List[Dict]]:
+        """Assets from the last run's output, grouped by source document path"""
+        previous = {}
+        assets_file = OUTPUT_DIR / "extracted_assets.json"
+        if assets_file.exists():
+            with open(assets_file) as f:
+                for asset in json.load(f):
+                    previous.setdefault(asset.get('source_path'), []).append(asset)
+        return previous
+    
+    def _reuse_extraction(self, previous_entry: Dict[str, Any], doc_entry: Dict, doc_idx: int):
+        """Carry an unchanged document's assets and log entry into this run"""
+        assets = self.previous_assets.get(doc_entry['path'], [])
+        if len(assets) != previous_entry.get('assets_extracted', 0):
+            # Previous output doesn't match the manifest - extract again
             self._extract_from_document(doc_entry, doc_idx)
+            return
+        log_entry = dict(previous_entry, index=doc_idx)
+        self.extracted_assets.extend(assets)
+        self.extraction_log.append(log_entry)
+        self.checkpoint.append({'log': log_entry, 'assets': assets})
+        self.unchanged_docs += 1
+        print(f"  [{doc_idx}] = Unchanged ({len(assets)} assets): {doc_entry['filename']}", flush=True)
+        self._report(doc_idx, doc_entry, 'unchanged')
+    
+    def _report(self, doc_idx: int, doc_entry: Dict, status: str):
+        """Progress event for a finished document"""
+        self.progress.document(doc_idx, doc_entry['path'], status, assets=len(self.extracted_assets))
     
-    def _extract_from_document(self, doc_entry: Dict, doc_idx: int):
-        """Extract assets from a single document"""
+    def _extract_from_document(self, doc_entry: Dict, doc_idx: int, parse_result: Dict[str, Any] = None,
+                               submitted: Tuple[Dict[str, Any], List[Tuple[List[Dict], Future]]] = None):
+        """Extract assets from a single document (submitted: parse result and in-flight window requests)"""
         pdf_path = Path(doc_entry['path'])
         filename = doc_entry['filename']
         
         if not pdf_path.exists():
             print(f"  [{doc_idx}] ⚠ File not found: {filename}", flush=True)
+            self._report(doc_idx, doc_entry, 'missing')
             return
         
         try:
-            # Extract document content
-            doc_content = self._extract_document_content(pdf_path)
+            pending = None
+            if submitted is not None:
+                parse_result, pending = submitted
+            windows = None
+            if pending is None:
+                # Extract document content
+                windows = self._extract_document_windows(pdf_path, parse_result)
             
             # Extract assets using LLM
-            assets = self._extract_assets_with_llm(doc_content, doc_entry)
+            assets, errors = self._extract_assets_with_llm(windows, doc_entry, pending)
             
             if assets and len(assets) > 0:
                 print(f"  [{doc_idx}] ✓ Extracted {len(assets)} assets from: {filename}", flush=True)
@@ -85,41 +245,69 @@ class ComprehensiveAssetExtractor:
                 print(f"  [{doc_idx}] - No assets extracted from: {filename}", flush=True)
             
             # Log the extraction
-            self.extraction_log.append({
+            log_entry = {
                 'index': doc_idx,
                 'path': str(pdf_path),
                 'filename': filename,
                 'assets_extracted': len(assets) if assets else 0,
                 'timestamp': datetime.now().isoformat()
-            })
+            }
+            timed_out = timed_out_pages(parse_result['pages']) if parse_result else []
+            if timed_out:
+                log_entry['timed_out_pages'] = timed_out
+                print(f"  [{doc_idx}] ⏱ timed_out pages {timed_out}: {filename}", flush=True)
+            if errors:
+                # Some windows never answered - a failed extraction for --retry-failed
+                log_entry['error'] = '; '.join(errors)
+                print(f"  [{doc_idx}] ✗ {len(errors)} window(s) failed: {filename}", flush=True)
+            self.extraction_log.append(log_entry)
+            self.checkpoint.append({'log': log_entry, 'assets': assets or []})
+            if timed_out or errors:
+                self.manifest.forget(pdf_path, 'extraction')  # Partial read - extract again next run
+            else:
+                self.manifest.record(pdf_path, 'extraction', log_entry)
+            self._report(doc_idx, doc_entry, 'error' if errors else 'extracted')
                 
         except Exception as e:
             print(f"  [{doc_idx}] ✗ Error extracting from {filename}: {e}", flush=True)
-            self.extraction_log.append({
+            self.manifest.forget(pdf_path, 'extraction')
+            error_entry = {
                 'index': doc_idx,
                 'path': str(pdf_path),
                 'filename': filename,
                 'error': str(e),
                 'timestamp': datetime.now().isoformat()
-            })
+            }
+            self.extraction_log.append(error_entry)
+            self.checkpoint.append({'log': error_entry, 'assets': []})
+            self._report(doc_idx, doc_entry, 'error')
     
-    def _extract_document_content(self, pdf_path: Path) -> str:
-        """Extract all text from document"""
-        all_text = []
-        
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for page_idx, page in enumerate(pdf.pages):
-                    text = page.extract_text()
-                    if text:
-                        all_text.append(f"[Page {page_idx+1}]\n{text}")
-        except Exception as e:
-            return f"Error extracting text: {e}"
+    def _extract_document_windows(self, pdf_path: Path, parse_result: Dict[str, Any] = None) -> List[List[Dict]]:
+        """
+        Split the document's pages (reused from the reviewer's cache) into
+        token-bounded windows - short documents come back as a single window
+        A document that can't be read is an extraction error, not an empty prompt
+        """
+        if parse_result is None:
+            parse_result = {'pages': load_pages(pdf_path)}
+        if 'error' in parse_result:
+            raise RuntimeError(f"Error extracting text: {parse_result['error']}")
         
-        return '\n\n'.join(all_text)
+        return page_windows(parse_result['pages'], self.window_tokens, self.overlap_pages)
+    
+    def _submit_extraction(self, windows: List[List[Dict]], doc_entry: Dict) -> List[Tuple[List[Dict], Future]]:
+        """Queue one LLM extraction request per window - they run in parallel"""
+        if len(windows) == 1:
+            return [(windows[0], self._submit_window(windows[0], doc_entry))]
+        self.windowed_docs += 1
+        page_count = windows[-1][-1]['page']
+        return [(window, self._submit_window(window, doc_entry, window_label(window, page_count)))
+                for window in windows]
     
-    def _extract_assets_with_llm(self, doc_content: str, doc_entry: Dict) -> List[Dict]:
-        """Use LLM to extract structured asset data from document"""
+    def _submit_window(self, window: List[Dict], doc_entry: Dict, label: str = None) -> Future:
+        """Queue the LLM asset extraction request for one window of a document"""
+        doc_content = window_text(window)
+        content_heading = f"DOCUMENT CONTENT ({label}):" if label else "DOCUMENT CONTENT:"
         
         classification = doc_entry.get('classification', {})
         asset_types = classification.get('asset_types', [])
@@ -132,7 +320,7 @@ DOCUMENT INFO:
 - Document type: {document_type}
 - Expected asset types: {', '.join(asset_types)}
 
-DOCUMENT CONTENT:
+{content_heading}
 {doc_content}
 
 TASK:
@@ -184,41 +372,73 @@ Return a JSON object with this structure:
 If no assets can be extracted, return {{"assets": []}}
 """
         
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert at extracting structured asset data from engineering documents."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                response_format={"type": "json_object"}
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            
-            # Handle different response formats
-            if isinstance(result, dict):
-                assets = result.get('assets', [])
-            elif isinstance(result, list):
-                assets = result
-            else:
-                assets = []
-            
-            # Add source metadata to each asset
-            for asset in assets:
-                asset['source_document'] = doc_entry['filename']
-                asset['source_path'] = doc_entry['path']
-            
-            return assets
-            
-        except Exception as e:
-            print(f"    Error in LLM extraction: {e}", flush=True)
-            return []
+        return self.llm.submit(
+            template_version=EXTRACT_PROMPT_VERSION,
+            context={'stage': 'extract', 'document': doc_entry['path'], 'window': label,
+                     'doc_type': doc_entry.get('classification', {}).get('document_type')},
+            model="gpt-4.1-mini",
+            messages=[
+                {"role": "system", "content": "You are an expert at extracting structured asset data from engineering documents."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.1,
+            response_format={"type": "json_object"}
+        )
+    
+    def _extract_assets_with_llm(self, windows: List[List[Dict]], doc_entry: Dict,
+                                 pending: List[Tuple[List[Dict], Future]] = None) -> Tuple[List[Dict], List[str]]:
+        """
+        Use LLM to extract structured asset data from document
+        Window responses are collected in page order and merged; a window whose
+        response was cut off at the output limit is split in half and retried
+        Returns the merged assets and the errors of windows that failed
+        """
+        queue = deque(pending or self._submit_extraction(windows, doc_entry))
+        page_count = max((window[-1]['page'] for window, _ in queue if window), default=0)
+        window_assets = []
+        errors = []
+        
+        while queue:
+            window, future = queue.popleft()
+            try:
+                response = future.result()
+                choice = response.choices[0]
+                try:
+                    result = json.loads(choice.message.content)
+                except json.JSONDecodeError:
+                    if choice.finish_reason != 'length' or len(window) < 2:
+                        raise
+                    print(f"    Response truncated for {window_label(window, page_count)} - splitting window", flush=True)
+                    halves = [(half, self._submit_window(half, doc_entry, window_label(half, page_count)))
+                              for half in split_window(window)]
+                    queue.extendleft(reversed(halves))
+                    continue
+                
+                # Handle different response formats
+                if isinstance(result, dict):
+                    assets = result.get('assets', [])
+                elif isinstance(result, list):
+                    assets = result
+                else:
+                    assets = []
+                window_assets.append(assets)
+                
+            except Exception as e:
+                print(f"    Error in LLM extraction: {e}", flush=True)
+                errors.append(f"{window_label(window, page_count)}: {e}")
+        
+        assets = merge_window_assets(window_assets)
+        
+        # Add source metadata to each asset
+        for asset in assets:
+            asset['source_document'] = doc_entry['filename']
+            asset['source_path'] = doc_entry['path']
+        
+        return assets, errors
     
     def _save_progress(self):
-        """Save current progress"""
-        output_dir = Path("/home/ubuntu/acc-tools/poc/output")
+        """Save extraction outputs (rebuilt in full from this run's in-order log)"""
+        output_dir = OUTPUT_DIR
         output_dir.mkdir(exist_ok=True, parents=True)
         
         # Save extracted assets
@@ -228,12 +448,19 @@ If no assets can be extracted, return {{"assets": []}}
         # Save extraction log
         with open(output_dir / "asset_extraction_log.json", 'w') as f:
             json.dump(self.extraction_log, f, indent=2)
+        
+        # Save manifest of what was extracted
+        self.manifest.save()
 
 def main():
+    flags = set(sys.argv[1:])
     asset_docs_file = "/home/ubuntu/acc-tools/poc/output/asset_relevant_documents.json"
     
-    extractor = ComprehensiveAssetExtractor(asset_docs_file)
-    assets = extractor.extract_all_assets(start_idx=0, batch_size=50)
+    extractor = ComprehensiveAssetExtractor(asset_docs_file, workers=os.cpu_count() or 1)
+    assets = extractor.extract_all_assets(start_idx=0, batch_size=50,
+                                          incremental='--incremental' in flags,
+                                          resume='--resume' in flags,
+                                          retry_failed='--retry-failed' in flags)
     
     print(f"\n✅ Extraction complete!", flush=True)
     print(f"   Total assets extracted: {len(assets)}", flush=True)
@@ -4,78 +4,304 @@ Systematically reviews ALL documents to identify asset-relevant content
 Uses multimodal understanding - no pre-filtering
 """
 import json
+import os
+import sys
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime
-import pdfplumber
-from openai import OpenAI
+from concurrent.futures import Future
+from page_store import load_pages, pages_to_text, skipped_table_pages, timed_out_pages
+from parallel_parser import DocumentParser
+from corpus_manifest import CorpusManifest
+from checkpoint_log import CheckpointLog
+from progress_events import ProgressReporter
+from usage_ledger import UsageLedger, default_job_id, ledger_path
+from llm_client import LLMClient, MAX_IN_FLIGHT, estimate_tokens
+from document_windows import CLASSIFY_WINDOW_TOKENS, OVERLAP_PAGES, page_windows, window_label, window_text
+from document_prefilter import heuristic_classification
+
+OUTPUT_DIR = Path("/home/ubuntu/acc-tools/poc/output")
+
+# Part of the LLM response cache key - bump when the prompt or its parsing changes
+CLASSIFY_PROMPT_VERSION = "classify-1"
+CLASSIFY_PACK_PROMPT_VERSION = "classify-pack-1"
+
+# Small single-window documents are packed into shared classification requests:
+# documents up to PACK_DOC_TOKENS each, PACK_TOKENS / PACK_MAX_DOCS per request
+PACK_DOC_TOKENS = 2_000
+PACK_TOKENS = 12_000
+PACK_MAX_DOCS = 10
+
+CLASSIFICATION_CRITERIA = """ASSET TYPES TO LOOK FOR:
+- Equipment: Inverters, transformers, switchgear, RMUs, PCUs, combiner boxes, trackers
+- Cables: MV cables, DC cables, control cables, communication cables
+- Structures: Foundations, piles, mounting structures, buildings
+- Systems: SCADA, monitoring, weather stations
+- Electrical: Circuit breakers, disconnects, meters, panels
+
+DOCUMENT TYPES THAT ARE ASSET-RELEVANT:
+- Equipment schedules or lists
+- Cable schedules
+- Single line diagrams (with equipment labels/specs)
+- General arrangement drawings (showing equipment layout)
+- Equipment specifications
+- Vendor drawings with equipment details
+- Foundation drawings (indicating equipment locations)
+- Calculation reports with equipment/cable tables
+- Equipment labeling specifications
+
+DOCUMENT TYPES THAT ARE NOT ASSET-RELEVANT:
+- Site location maps (no equipment)
+- Topographic surveys
+- Soil reports
+- General specifications without equipment lists
+- Process descriptions without equipment details
+- Cover pages, title blocks only"""
+
+
+class ClassificationPack:
+    """Small documents sharing one classification request"""
+    def __init__(self):
+        self.docs: List[Dict[str, Any]] = []
+        self.tokens = 0
+        self.future: Optional[Future] = None
+        self.results: Optional[List[Dict[str, Any]]] = None
+        self.fallbacks: Optional[List[List[Future]]] = None
+
+    def position(self, doc_info: Dict[str, Any]) -> int:
+        return next(i for i, d in enumerate(self.docs) if d is doc_info)
+
 
 class ComprehensiveDocumentReviewer:
-    def __init__(self, pdf_list_file: str):
+    def __init__(self, pdf_list_file: str, workers: int = 1, llm_concurrency: int = MAX_IN_FLIGHT,
+                 window_tokens: int = CLASSIFY_WINDOW_TOKENS, overlap_pages: int = OVERLAP_PAGES,
+                 prefilter: bool = True, pack_tokens: int = PACK_TOKENS, progress_sink=None, **parser_options):
         self.pdf_list_file = Path(pdf_list_file)
         with open(self.pdf_list_file) as f:
             self.all_pdfs = [line.strip() for line in f if line.strip()]
         
-        self.client = OpenAI()
+        # Classification requests for a batch run concurrently while later PDFs parse
+        # Every LLM call and PDF parse of this run is recorded in the usage ledger
+        self.ledger = UsageLedger(ledger_path(OUTPUT_DIR), job=default_job_id('review'))
+        self.llm = LLMClient(max_in_flight=llm_concurrency, ledger=self.ledger)
+        # Documents longer than this many prompt tokens are classified in page-aligned windows
+        self.window_tokens = window_tokens
+        self.overlap_pages = overlap_pages
+        self.windowed_docs = 0
+        # Clear-cut documents are classified locally without an LLM call
+        self.prefilter = prefilter
+        self.heuristic_docs = 0
+        # Windows of every classified document (one request each without the
+        # pre-filter or packing) against the classification requests really sent
+        self.classify_windows = 0
+        self.classify_requests = 0
+        self.llm_calls_avoided = 0
+        # Packing several small documents per request (pack_tokens=0 disables it)
+        self.pack_tokens = pack_tokens
+        self.packed_docs = 0
+        self.packs = 0
+        self.pack_fallbacks = 0
+        self.pack_calls_saved = 0
+        # parser_options: shard_threshold / shard_size for page-sharding large PDFs,
+        # max_docs_per_worker / max_worker_rss_mb for worker recycling,
+        # page_timeout / doc_timeout / degraded_retry for the parse watchdog
+        self.parser = DocumentParser(workers=workers, ledger=self.ledger, **parser_options)
         self.asset_relevant_docs = []
         self.review_log = []
+        self.pages_parsed = 0
+        self.table_pages_skipped = 0
+        self.manifest = CorpusManifest(OUTPUT_DIR / "corpus_manifest.json")
+        self.incremental = False
+        self.retry_failed = False
+        self.checkpoint = None
+        self.progress = None
+        self.progress_sink = progress_sink
+        self.unchanged_docs = 0
+        self.resumed_docs = 0
         
-    def review_all_documents(self, start_idx: int = 0, batch_size: int = 50):
+    def review_all_documents(self, start_idx: int = 0, batch_size: int = 50, incremental: bool = False,
+                             resume: bool = False, retry_failed: bool = False):
         """
         Review all documents in batches
         Uses LLM to classify each document for asset relevance
+        incremental=True reuses the recorded classification of documents
+        whose content hasn't changed since the last run
+        resume=True skips documents already completed in the checkpoint log;
+        retry_failed=True only re-reviews documents whose log entry has an error
         """
+        self.incremental = incremental
+        self.retry_failed = retry_failed
+        self.checkpoint = CheckpointLog(OUTPUT_DIR / "document_review_checkpoint.jsonl",
+                                        resume=resume, retry_failed=retry_failed)
         total = len(self.all_pdfs)
+        self.progress = ProgressReporter('review', max(total - start_idx, 0), job=self.ledger.job,
+                                         sink=self.progress_sink)
+        self.progress.start()
         print(f"{'='*80}", flush=True)
         print(f"COMPREHENSIVE DOCUMENT REVIEW", flush=True)
         print(f"{'='*80}", flush=True)
         print(f"Total documents: {total}", flush=True)
         print(f"Starting from index: {start_idx}", flush=True)
         print(f"Batch size: {batch_size}", flush=True)
+        print(f"Parser workers: {self.parser.workers} | LLM requests in flight: {self.llm.max_in_flight}", flush=True)
+        print(f"Incremental: {incremental}", flush=True)
+        print(f"Resume: {resume} | Retry failed only: {retry_failed}", flush=True)
         print(f"{'='*80}\n", flush=True)
         
-        for i in range(start_idx, total, batch_size):
-            batch_end = min(i + batch_size, total)
-            batch_pdfs = self.all_pdfs[i:batch_end]
-            
-            print(f"\n[Batch {i//batch_size + 1}] Processing documents {i+1} to {batch_end} of {total}", flush=True)
-            
-            self._review_batch(batch_pdfs, i)
-            
-            # Save progress after each batch
+        try:
+            for i in range(start_idx, total, batch_size):
+                batch_end = min(i + batch_size, total)
+                batch_pdfs = self.all_pdfs[i:batch_end]
+                
+                print(f"\n[Batch {i//batch_size + 1}] Processing documents {i+1} to {batch_end} of {total}", flush=True)
+                
+                self._review_batch(batch_pdfs, i)
+                
+                print(f"  ✓ Batch complete. Asset-relevant docs so far: {len(self.asset_relevant_docs)}", flush=True)
+            self.checkpoint.mark_finished()
+            self.progress.done(relevant=len(self.asset_relevant_docs), llm=self.llm.stats())
+        finally:
+            self.progress.close()
+            self.parser.close()
+            self.llm.close()
+            self.ledger.close()
+            self.checkpoint.close()
+            # Progress is checkpointed per document - full outputs are written once
             self._save_progress()
-            
-            print(f"  ✓ Batch complete. Asset-relevant docs so far: {len(self.asset_relevant_docs)}", flush=True)
         
         print(f"\n{'='*80}", flush=True)
         print(f"REVIEW COMPLETE", flush=True)
         print(f"{'='*80}", flush=True)
         print(f"Total documents reviewed: {total}", flush=True)
         print(f"Asset-relevant documents: {len(self.asset_relevant_docs)}", flush=True)
+        if incremental:
+            print(f"Unchanged documents reused: {self.unchanged_docs}", flush=True)
+        if resume or retry_failed:
+            print(f"Documents resumed from checkpoint: {self.resumed_docs}", flush=True)
+        print(f"Documents classified in multiple windows: {self.windowed_docs}", flush=True)
+        if self.prefilter:
+            print(f"Decided by heuristic pre-filter: {self.heuristic_docs} documents", flush=True)
+        if self.pack_tokens:
+            print(f"Small documents packed: {self.packed_docs} in {self.packs} requests "
+                  f"({self.pack_calls_saved} LLM calls saved, {self.pack_fallbacks} packs retried individually)", flush=True)
+        self.llm_calls_avoided = self.classify_windows - self.classify_requests
+        print(f"Classification requests: {self.classify_requests} for {self.classify_windows} document windows "
+              f"({self.llm_calls_avoided} LLM calls avoided)", flush=True)
+        print(f"Table detection skipped on {self.table_pages_skipped} of {self.pages_parsed} pages (no ruling lines)", flush=True)
+        llm_stats = self.llm.stats()
+        print(f"LLM calls: {llm_stats['calls']} (retries {llm_stats['retries']}, "
+              f"rate backoffs {llm_stats['backoffs']}, final limit {llm_stats['rpm_limit']} RPM, "
+              f"cache hits {llm_stats['cache_hits']})", flush=True)
         print(f"{'='*80}\n", flush=True)
         
         return self.asset_relevant_docs
     
     def _review_batch(self, batch_pdfs: List[str], start_idx: int):
-        """Review a batch of documents"""
+        """Review a batch of documents - PDFs are parsed in parallel, results handled in order"""
+        plans = [self._plan_document(p) for p in batch_pdfs]
+        needs_parse = [plan == 'review' and Path(p).exists() for p, plan in zip(batch_pdfs, plans)]
+        parsed = self.parser.parse(p for p, ok in zip(batch_pdfs, needs_parse) if ok)
+        
+        # Submit each document's classification as soon as it is parsed so the
+        # LLM requests overlap with parsing and with each other
+        # Small documents are collected into packs, each sent once it is full
+        submitted = {}
+        pack = ClassificationPack()
+        for idx, ok in enumerate(needs_parse):
+            if not ok:
+                continue
+            doc_info = self._extract_document_info(Path(batch_pdfs[idx]), next(parsed))
+            if 'error' in doc_info or 'heuristic_classification' in doc_info:
+                # Unreadable documents never reach the LLM; clear-cut ones don't need it
+                submitted[idx] = (doc_info, None)
+            elif self._packable(doc_info):
+                tokens = estimate_tokens(doc_info['full_text'])
+                if pack.docs and (pack.tokens + tokens > self.pack_tokens or len(pack.docs) >= PACK_MAX_DOCS):
+                    self._submit_pack(pack)
+                    pack = ClassificationPack()
+                pack.docs.append(doc_info)
+                pack.tokens += tokens
+                submitted[idx] = (doc_info, pack)
+            else:
+                submitted[idx] = (doc_info, self._submit_classification(doc_info))
+        if pack.docs:
+            self._submit_pack(pack)
+        
         for idx, pdf_path in enumerate(batch_pdfs):
             doc_idx = start_idx + idx + 1
-            self._review_single_document(pdf_path, doc_idx)
+            plan = plans[idx]
+            if plan == 'skip':
+                self._report(doc_idx, pdf_path, 'skipped')
+                continue
+            if plan != 'review':
+                self._reuse_review(*plan, doc_idx)
+                continue
+            self._review_single_document(pdf_path, doc_idx, submitted=submitted.get(idx))
+    
+    def _plan_document(self, pdf_path: str):
+        """
+        'review', 'skip' (retry-failed mode, never attempted) or a
+        (previous_entry, source) pair to carry over from checkpoint/manifest
+        """
+        record = self.checkpoint.completed(pdf_path)
+        if record is not None:
+            return (record['log'], 'checkpoint')
+        if self.retry_failed and not self.checkpoint.failed(pdf_path):
+            return 'skip'
+        if self.incremental:
+            entry = self.manifest.get_unchanged(pdf_path, 'review')
+            if entry is not None:
+                return (entry, 'manifest')
+        return 'review'
+    
+    def _reuse_review(self, previous_entry: Dict[str, Any], source: str, doc_idx: int):
+        """Carry a resumed or unchanged document's recorded review into this run"""
+        review_entry = dict(previous_entry, index=doc_idx)
+        self.review_log.append(review_entry)
+        if review_entry['classification'].get('is_asset_relevant', False):
+            self.asset_relevant_docs.append(review_entry)
+        
+        if source == 'checkpoint':
+            self.resumed_docs += 1
+            self.manifest.record(review_entry['path'], 'review', review_entry)
+            print(f"  [{doc_idx}] = Resumed: {review_entry['filename']}", flush=True)
+            self._report(doc_idx, review_entry['path'], 'resumed')
+        else:
+            self.unchanged_docs += 1
+            self.checkpoint.append({'log': review_entry})
+            print(f"  [{doc_idx}] = Unchanged: {review_entry['filename']}", flush=True)
+            self._report(doc_idx, review_entry['path'], 'unchanged')
+    
+    def _report(self, doc_idx: int, pdf_path: str, status: str):
+        """Progress event for a finished document"""
+        self.progress.document(doc_idx, str(pdf_path), status, relevant=len(self.asset_relevant_docs))
     
-    def _review_single_document(self, pdf_path: str, doc_idx: int):
-        """Review a single document for asset relevance"""
+    def _review_single_document(self, pdf_path: str, doc_idx: int, parse_result: Dict[str, Any] = None,
+                                submitted: Tuple[Dict[str, Any], Union[List[Future], ClassificationPack]] = None):
+        """Review a single document for asset relevance (submitted: doc info and in-flight window requests or pack)"""
         pdf_path = Path(pdf_path)
         
         if not pdf_path.exists():
             print(f"  [{doc_idx}] ⚠ File not found: {pdf_path.name}", flush=True)
+            self._report(doc_idx, pdf_path, 'missing')
             return
         
         try:
-            # Extract document info
-            doc_info = self._extract_document_info(pdf_path)
+            if submitted is None:
+                # Extract document info
+                doc_info = self._extract_document_info(pdf_path, parse_result)
+                pending = None
+            else:
+                doc_info, pending = submitted
+            if 'error' in doc_info:
+                raise RuntimeError(f"Error extracting text: {doc_info['error']}")
             
             # Classify document using LLM
-            classification = self._classify_document(doc_info)
+            classification = self._classify_document(doc_info, pending)
+            if 'error' in classification:
+                # An unanswered window is a failed review - recorded for
+                # --retry-failed and never kept as a finished review
+                raise RuntimeError(classification['error'])
             
             # Log the review
             review_entry = {
@@ -85,7 +311,15 @@ class ComprehensiveDocumentReviewer:
                 'classification': classification,
                 'timestamp': datetime.now().isoformat()
             }
+            if doc_info.get('timed_out_pages'):
+                review_entry['timed_out_pages'] = doc_info['timed_out_pages']
+                print(f"  [{doc_idx}] ⏱ timed_out pages {doc_info['timed_out_pages']}: {pdf_path.name}", flush=True)
             self.review_log.append(review_entry)
+            self.checkpoint.append({'log': review_entry})
+            if 'timed_out_pages' in review_entry:
+                self.manifest.forget(pdf_path, 'review')  # Partial read - review again next run
+            else:
+                self.manifest.record(pdf_path, 'review', review_entry)
             
             # If asset-relevant, add to list
             if classification.get('is_asset_relevant', False):
@@ -93,61 +327,83 @@ class ComprehensiveDocumentReviewer:
                 print(f"  [{doc_idx}] ✓ ASSET-RELEVANT: {pdf_path.name}", flush=True)
                 print(f"       Reason: {classification.get('reason', 'N/A')}", flush=True)
                 print(f"       Asset types: {classification.get('asset_types', 'N/A')}", flush=True)
+                self._report(doc_idx, pdf_path, 'relevant')
             else:
                 print(f"  [{doc_idx}] - Not relevant: {pdf_path.name}", flush=True)
+                self._report(doc_idx, pdf_path, 'not_relevant')
                 
         except Exception as e:
             print(f"  [{doc_idx}] ✗ Error processing {pdf_path.name}: {e}", flush=True)
-            self.review_log.append({
+            self.manifest.forget(pdf_path, 'review')
+            error_entry = {
                 'index': doc_idx,
                 'path': str(pdf_path),
                 'filename': pdf_path.name,
                 'error': str(e),
                 'timestamp': datetime.now().isoformat()
-            })
+            }
+            self.review_log.append(error_entry)
+            self.checkpoint.append({'log': error_entry})
+            self._report(doc_idx, pdf_path, 'error')
     
-    def _extract_document_info(self, pdf_path: Path) -> Dict[str, Any]:
+    def _extract_document_info(self, pdf_path: Path, parse_result: Dict[str, Any] = None) -> Dict[str, Any]:
         """Extract ALL text from ALL pages - comprehensive extraction"""
         info = {
             'filename': pdf_path.name,
             'path': str(pdf_path),
             'page_count': 0,
             'full_text': '',
+            'windows': [(None, '')],
             'has_tables': False,
             'table_count': 0
         }
         
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                info['page_count'] = len(pdf.pages)
-                
-                # Extract text from ALL pages
-                all_text = []
-                total_tables = 0
-                
-                for page_idx, page in enumerate(pdf.pages):
-                    text = page.extract_text()
-                    if text:
-                        all_text.append(f"[Page {page_idx+1}]\n{text}")
-                    
-                    # Check for tables
-                    tables = page.extract_tables()
-                    if tables:
-                        info['has_tables'] = True
-                        total_tables += len(tables)
-                
-                info['table_count'] = total_tables
-                
-                # Combine ALL text (no truncation)
-                info['full_text'] = '\n\n'.join(all_text)
+            if parse_result is None:
+                parse_result = {'pages': load_pages(pdf_path)}
+            if 'error' in parse_result:
+                raise RuntimeError(parse_result['error'])
+            pages = parse_result['pages']
+            info['page_count'] = len(pages)
+            
+            # Check for tables
+            total_tables = sum(len(p['tables']) for p in pages)
+            info['has_tables'] = total_tables > 0
+            info['table_count'] = total_tables
+            self.pages_parsed += len(pages)
+            self.table_pages_skipped += skipped_table_pages(pages)
+            info['timed_out_pages'] = timed_out_pages(pages)
+            
+            # Combine ALL text (no truncation) - documents over the window budget
+            # are classified window by window instead
+            info['full_text'] = pages_to_text(pages)
+            windows = page_windows(pages, self.window_tokens, self.overlap_pages)
+            if len(windows) == 1:
+                info['windows'] = [(None, info['full_text'])]
+            else:
+                info['windows'] = [(window_label(w, pages[-1]['page']), window_text(w)) for w in windows]
+            
+            if self.prefilter:
+                heuristic = heuristic_classification(info)
+                if heuristic is not None:
+                    info['heuristic_classification'] = heuristic
+                    self.heuristic_docs += 1
                 
         except Exception as e:
             info['error'] = str(e)
         
         return info
     
-    def _classify_document(self, doc_info: Dict[str, Any]) -> Dict[str, Any]:
-        """Use LLM to classify if document contains asset-relevant information"""
+    def _submit_classification(self, doc_info: Dict[str, Any]) -> List[Future]:
+        """Queue one LLM classification request per window - they run in parallel"""
+        if len(doc_info['windows']) > 1:
+            self.windowed_docs += 1
+        return [self._submit_window(doc_info, label, text) for label, text in doc_info['windows']]
+    
+    def _submit_window(self, doc_info: Dict[str, Any], label: str, text: str) -> Future:
+        """Queue the LLM classification request for one window of a document"""
+        self.classify_requests += 1
+        text_heading = f"Document text ({label}):" if label else "Full document text (all pages):"
         
         prompt = f"""You are reviewing a solar farm engineering document to determine if it contains asset information that should be tracked in an asset register.
 
@@ -155,37 +411,13 @@ DOCUMENT INFO:
 - Filename: {doc_info['filename']}
 - Pages: {doc_info['page_count']}
 - Has tables: {doc_info['has_tables']}
-- Full document text (all pages):
-{doc_info['full_text']}
+- {text_heading}
+{text}
 
 TASK:
 Determine if this document contains information about physical assets that should be tracked individually in an asset register.
 
-ASSET TYPES TO LOOK FOR:
-- Equipment: Inverters, transformers, switchgear, RMUs, PCUs, combiner boxes, trackers
-- Cables: MV cables, DC cables, control cables, communication cables
-- Structures: Foundations, piles, mounting structures, buildings
-- Systems: SCADA, monitoring, weather stations
-- Electrical: Circuit breakers, disconnects, meters, panels
-
-DOCUMENT TYPES THAT ARE ASSET-RELEVANT:
-- Equipment schedules or lists
-- Cable schedules
-- Single line diagrams (with equipment labels/specs)
-- General arrangement drawings (showing equipment layout)
-- Equipment specifications
-- Vendor drawings with equipment details
-- Foundation drawings (indicating equipment locations)
-- Calculation reports with equipment/cable tables
-- Equipment labeling specifications
-
-DOCUMENT TYPES THAT ARE NOT ASSET-RELEVANT:
-- Site location maps (no equipment)
-- Topographic surveys
-- Soil reports
-- General specifications without equipment lists
-- Process descriptions without equipment details
-- Cover pages, title blocks only
+{CLASSIFICATION_CRITERIA}
 
 Return a JSON object with:
 {{
@@ -197,32 +429,164 @@ Return a JSON object with:
 }}
 """
         
+        return self.llm.submit(
+            template_version=CLASSIFY_PROMPT_VERSION,
+            context={'stage': 'classify', 'document': doc_info['path'], 'window': label},
+            model="gpt-4.1-mini",
+            messages=[
+                {"role": "system", "content": "You are an expert at reviewing engineering documents for asset management purposes."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.1,
+            response_format={"type": "json_object"}
+        )
+    
+    def _packable(self, doc_info: Dict[str, Any]) -> bool:
+        return (self.pack_tokens > 0 and len(doc_info['windows']) == 1
+                and estimate_tokens(doc_info['full_text']) <= min(PACK_DOC_TOKENS, self.pack_tokens))
+    
+    def _submit_pack(self, pack: ClassificationPack):
+        """Queue one classification request covering every document in the pack"""
+        if len(pack.docs) == 1:
+            # Nothing to share - send the normal single-document request
+            pack.fallbacks = [self._submit_classification(pack.docs[0])]
+            return
+        self.packs += 1
+        self.packed_docs += len(pack.docs)
+        self.classify_requests += 1
+        
+        documents = '\n\n'.join(f"""DOCUMENT {number}:
+- Filename: {doc_info['filename']}
+- Pages: {doc_info['page_count']}
+- Has tables: {doc_info['has_tables']}
+- Full document text (all pages):
+{doc_info['full_text']}""" for number, doc_info in enumerate(pack.docs, 1))
+        
+        prompt = f"""You are reviewing {len(pack.docs)} solar farm engineering documents to determine, for each one, if it contains asset information that should be tracked in an asset register.
+
+{documents}
+
+TASK:
+Determine for each document independently if it contains information about physical assets that should be tracked individually in an asset register.
+
+{CLASSIFICATION_CRITERIA}
+
+Return a JSON object with exactly one entry per document, in document order:
+{{
+  "documents": [
+    {{
+      "document": 1,
+      "is_asset_relevant": true/false,
+      "confidence": 0.0-1.0,
+      "reason": "Brief explanation of why this is/isn't asset-relevant",
+      "asset_types": ["list", "of", "asset", "types", "found"],
+      "document_type": "equipment_schedule|cable_schedule|drawing|specification|calculation|other"
+    }}
+  ]
+}}
+"""
+        
+        pack.future = self.llm.submit(
+            template_version=CLASSIFY_PACK_PROMPT_VERSION,
+            context={'stage': 'classify_pack', 'documents': [d['path'] for d in pack.docs]},
+            model="gpt-4.1-mini",
+            messages=[
+                {"role": "system", "content": "You are an expert at reviewing engineering documents for asset management purposes."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.1,
+            response_format={"type": "json_object"}
+        )
+    
+    def _resolve_pack(self, pack: ClassificationPack):
+        """
+        Map a pack response back onto its documents
+        A malformed response (wrong count, numbering or fields) sends every
+        document in that pack through its own request instead
+        """
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert at reviewing engineering documents for asset management purposes."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                response_format={"type": "json_object"}
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            return result
-            
+            response = pack.future.result()
+            entries = json.loads(response.choices[0].message.content)['documents']
+            by_number = {entry['document']: entry for entry in entries}
+            if len(entries) != len(pack.docs) or sorted(by_number) != list(range(1, len(pack.docs) + 1)):
+                raise ValueError(f"expected {len(pack.docs)} numbered entries, got {len(entries)}")
+            results = []
+            for number in range(1, len(pack.docs) + 1):
+                result = {k: v for k, v in by_number[number].items() if k != 'document'}
+                if not isinstance(result.get('is_asset_relevant'), bool):
+                    raise ValueError(f"document {number} has no is_asset_relevant flag")
+                result['pack_size'] = len(pack.docs)
+                results.append(result)
+            pack.results = results
+            self.pack_calls_saved += len(pack.docs) - 1
         except Exception as e:
-            return {
-                'is_asset_relevant': False,
-                'confidence': 0.0,
-                'reason': f'Classification error: {e}',
-                'asset_types': [],
-                'document_type': 'error'
-            }
+            print(f"    Pack of {len(pack.docs)} documents came back malformed ({e}) - classifying individually", flush=True)
+            self.pack_fallbacks += 1
+            pack.fallbacks = [self._submit_classification(doc_info) for doc_info in pack.docs]
+    
+    def _classify_document(self, doc_info: Dict[str, Any],
+                           pending: Union[List[Future], ClassificationPack] = None) -> Dict[str, Any]:
+        """Use LLM to classify if document contains asset-relevant information"""
+        self.classify_windows += len(doc_info['windows'])
+        if 'heuristic_classification' in doc_info:
+            return doc_info['heuristic_classification']
+        
+        if isinstance(pending, ClassificationPack):
+            if pending.results is None and pending.fallbacks is None:
+                self._resolve_pack(pending)
+            if pending.results is not None:
+                return pending.results[pending.position(doc_info)]
+            pending = pending.fallbacks[pending.position(doc_info)]
+        
+        results = []
+        errors = []
+        for future in pending or self._submit_classification(doc_info):
+            try:
+                response = future.result()
+                
+                result = json.loads(response.choices[0].message.content)
+                results.append(result)
+                
+            except Exception as e:
+                errors.append(f'Classification error: {e}')
+                results.append({
+                    'is_asset_relevant': False,
+                    'confidence': 0.0,
+                    'reason': errors[-1],
+                    'asset_types': [],
+                    'document_type': 'error'
+                })
+        
+        classification = results[0] if len(results) == 1 else self._merge_classifications(results)
+        if errors:
+            classification = dict(classification, error='; '.join(errors))
+        return classification
+    
+    def _merge_classifications(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Reduce per-window classifications to one per document
+        The document is asset-relevant if any window is; the most confident
+        deciding window supplies the reason and type, asset types are combined
+        """
+        answered = [r for r in results if r.get('document_type') != 'error'] or results
+        relevant = [r for r in answered if r.get('is_asset_relevant', False)]
+        deciding = relevant or answered
+        merged = dict(max(deciding, key=lambda r: r.get('confidence') or 0.0))
+        
+        asset_types = []
+        for result in relevant:
+            for asset_type in result.get('asset_types') or []:
+                if asset_type not in asset_types:
+                    asset_types.append(asset_type)
+        if relevant:
+            merged['asset_types'] = asset_types
+        merged['windows'] = len(results)
+        merged['relevant_windows'] = len(relevant)
+        return merged
     
     def _save_progress(self):
-        """Save current progress"""
-        output_dir = Path("/home/ubuntu/acc-tools/poc/output")
+        """Save review outputs (rebuilt in full from this run's in-order log)"""
+        output_dir = OUTPUT_DIR
         output_dir.mkdir(exist_ok=True, parents=True)
         
         # Save asset-relevant docs
@@ -232,12 +596,19 @@ Return a JSON object with:
         # Save full review log
         with open(output_dir / "document_review_log.json", 'w') as f:
             json.dump(self.review_log, f, indent=2)
+        
+        # Save manifest of what was reviewed
+        self.manifest.save()
 
 def main():
+    flags = set(sys.argv[1:])
     pdf_list = "/home/ubuntu/acc-tools/poc/output/goonumbla_all_pdfs.txt"
     
-    reviewer = ComprehensiveDocumentReviewer(pdf_list)
-    asset_docs = reviewer.review_all_documents(start_idx=0, batch_size=50)
+    reviewer = ComprehensiveDocumentReviewer(pdf_list, workers=os.cpu_count() or 1)
+    asset_docs = reviewer.review_all_documents(start_idx=0, batch_size=50,
+                                               incremental='--incremental' in flags,
+                                               resume='--resume' in flags,
+                                               retry_failed='--retry-failed' in flags)
     
     print(f"\n✅ Review complete!", flush=True)
     print(f"   Asset-relevant documents: {len(asset_docs)}", flush=True)
@@ -0,0 +1,69 @@
+"""
+Corpus Manifest
+Tracks path, size, mtime and content hash of every document together with
+the review/extraction result recorded for it, so re-runs only process
+new or modified documents
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict, Any, Optional
+from page_store import file_sha256
+
+
+class CorpusManifest:
+    def __init__(self, manifest_path: Path):
+        self.manifest_path = Path(manifest_path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.manifest_path.exists():
+            with open(self.manifest_path) as f:
+                self.entries = json.load(f)
+
+    def _fingerprint(self, path: Path) -> Optional[Dict[str, Any]]:
+        """
+        Current fingerprint of a file, re-hashing only when size/mtime moved
+        A touched-but-identical file keeps its recorded results
+        """
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+
+        entry = self.entries.get(str(path))
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+            return entry
+
+        sha256 = file_sha256(path)
+        if entry and entry['sha256'] == sha256:
+            entry['mtime'] = stat.st_mtime_ns
+            return entry
+
+        # New or modified content - previous stage results no longer apply
+        entry = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha256': sha256}
+        self.entries[str(path)] = entry
+        return entry
+
+    def get_unchanged(self, path: Path, stage: str) -> Optional[Any]:
+        """Recorded result for a stage ('review' / 'extraction') if the file hasn't changed"""
+        entry = self._fingerprint(Path(path))
+        if entry is None:
+            return None
+        return entry.get(stage)
+
+    def record(self, path: Path, stage: str, result: Any):
+        entry = self._fingerprint(Path(path))
+        if entry is not None:
+            entry[stage] = result
+
+    def forget(self, path: Path, stage: str):
+        entry = self.entries.get(str(path))
+        if entry:
+            entry.pop(stage, None)
+
+    def save(self):
+        """Write atomically so a crash mid-save never leaves a truncated manifest"""
+        self.manifest_path.parent.mkdir(exist_ok=True, parents=True)
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.manifest_path)
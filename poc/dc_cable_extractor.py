@@ -3,31 +3,40 @@ DC Cable Extractor for Solar Farm Projects
 Extracts DC array cables and DC bus cables from calculation reports
 Uses hybrid approach: deterministic parsing + LLM intelligence
 """
-import pdfplumber
 from pathlib import Path
 import json
-from openai import OpenAI
+import time
+from llm_client import LLMClient
+from usage_ledger import UsageLedger, default_job_id
+from page_store import load_pages, skipped_table_pages
 from typing import List, Dict, Any
 
+# Part of the LLM response cache key - bump when the prompt or its parsing changes
+DC_CABLE_PROMPT_VERSION = "dc-cables-1"
+
 class DCCableExtractor:
     def __init__(self, pdf_path: str):
         self.pdf_path = Path(pdf_path)
-        self.client = OpenAI()  # Pre-configured with API key
+        self.ledger = UsageLedger(job=default_job_id('dc-cables'))
+        self.llm = LLMClient(ledger=self.ledger)  # Pre-configured with API key; retries/backoff on rate limits
+        self.table_pages_skipped = 0
         
     def extract_tables(self) -> List[Dict[str, Any]]:
         """Extract all tables from the DC calculation PDF"""
         all_tables = []
         
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                tables = page.extract_tables()
-                for table_num, table in enumerate(tables):
-                    if table and len(table) > 1:  # Has header + data
-                        all_tables.append({
-                            'page': page_num,
-                            'table_num': table_num + 1,
-                            'data': table
-                        })
+        started_at = time.monotonic()
+        pages = load_pages(self.pdf_path)
+        self.ledger.record_parse({'path': str(self.pdf_path), 'pages': pages, 'seconds': time.monotonic() - started_at})
+        self.table_pages_skipped = skipped_table_pages(pages)
+        for page in pages:
+            for table_num, table in enumerate(page['tables']):
+                if table and len(table) > 1:  # Has header + data
+                    all_tables.append({
+                        'page': page['page'],
+                        'table_num': table_num + 1,
+                        'data': table
+                    })
         
         return all_tables
     
@@ -36,6 +45,7 @@ class DCCableExtractor:
         print(f"\n[1/3] Extracting tables from {self.pdf_path.name}...")
         tables = self.extract_tables()
         print(f"  ✓ Found {len(tables)} tables across all pages")
+        print(f"  ✓ Table detection skipped on {self.table_pages_skipped} text-only pages")
         
         # Filter for cable-related tables
         cable_tables = []
@@ -65,7 +75,11 @@ class DCCableExtractor:
             })
         
         # Call LLM to extract structured asset data
-        assets = self._extract_with_llm(tables_json)
+        try:
+            assets = self._extract_with_llm(tables_json)
+        finally:
+            self.llm.close()
+            self.ledger.close()
         print(f"  ✓ Extracted {len(assets)} DC cable assets")
         
         return assets
@@ -129,7 +143,9 @@ Return ONLY a JSON object with this structure:
 """
         
         try:
-            response = self.client.chat.completions.create(
+            response = self.llm.create(
+                template_version=DC_CABLE_PROMPT_VERSION,
+                context={'stage': 'dc_cables', 'document': str(self.pdf_path), 'doc_type': 'calculation'},
                 model="gpt-4.1-mini",
                 messages=[
                     {"role": "system", "content": "You are a solar farm asset extraction expert. Extract structured asset data from technical documents."},
@@ -3,8 +3,8 @@ Debug script to test asset extraction on a single document
 """
 import json
 from pathlib import Path
-import pdfplumber
 from openai import OpenAI
+from page_store import load_pages, pages_to_text
 
 # Load the first asset-relevant document
 with open("/home/ubuntu/acc-tools/poc/output/asset_relevant_documents.json") as f:
@@ -19,15 +19,8 @@ print("\n" + "="*80 + "\n")
 
 # Extract document content
 pdf_path = Path(doc_entry['path'])
-all_text = []
-
-with pdfplumber.open(pdf_path) as pdf:
-    for page_idx, page in enumerate(pdf.pages[:5]):  # First 5 pages only for testing
-        text = page.extract_text()
-        if text:
-            all_text.append(f"[Page {page_idx+1}]\n{text}")
-
-doc_content = '\n\n'.join(all_text)
+pages = load_pages(pdf_path, end=5)  # First 5 pages only for testing
+doc_content = pages_to_text(pages)
 print(f"Extracted text length: {len(doc_content)} characters")
 print(f"First 500 chars:\n{doc_content[:500]}")
 print("\n" + "="*80 + "\n")
@@ -0,0 +1,119 @@
+"""
+Document Pre-Filter
+Local heuristic classification run before the LLM reviewer
+Combines filename/document-number patterns, keyword statistics and table
+density to settle clear-cut documents (cover sheets, surveys, soil reports,
+equipment lists, cable schedules) and leaves ambiguous ones to the model
+"""
+import re
+from typing import Dict, Any, List, Optional
+from review_documents import categorize_document
+
+# Document numbers like GOO-ISE-EL-CAL-0002-C1 carry a type code
+DOC_TYPE_CODE = re.compile(r'-(CAL|RPT|SCH|LST|DWG|DRG|SLD|LAY|SPC|SPE)-\d', re.IGNORECASE)
+
+# Equipment/cable tags as they appear in schedules and drawings (INV-01.1, RMU 3, TX-02 ...)
+ASSET_TAG = re.compile(r'\b(INV|PCU|TX|TR|RMU|MVPS|MVS|CB|CBX|CMB|DCB|ACB|SWG|MCC|SB|TRK|WS)[-_ ]?\d{1,3}(?:[.\-]\d{1,3})?\b')
+TAG_ASSET_TYPES = {
+    'INV': 'inverter', 'PCU': 'inverter', 'TX': 'transformer', 'TR': 'transformer',
+    'RMU': 'switchgear', 'SWG': 'switchgear', 'ACB': 'switchgear', 'MCC': 'switchgear',
+    'MVPS': 'inverter', 'MVS': 'switchgear', 'CB': 'combiner box', 'CBX': 'combiner box',
+    'CMB': 'combiner box', 'DCB': 'combiner box', 'SB': 'combiner box', 'TRK': 'tracker', 'WS': 'scada',
+}
+
+ASSET_KEYWORDS = {
+    'inverter': ['inverter', 'pcu', 'power conversion'],
+    'transformer': ['transformer', 'kva', 'mva'],
+    'switchgear': ['switchgear', 'ring main unit', 'rmu', 'circuit breaker'],
+    'cable': ['cable', 'mm2', 'mm²', 'conductor'],
+    'combiner box': ['combiner box', 'string box', 'dc box'],
+    'tracker': ['tracker'],
+    'scada': ['scada', 'weather station', 'rtu'],
+    'structure': ['foundation', 'pile', 'footing'],
+}
+# Word-start matches so 'rtu' doesn't count 'virtual' (plurals still match)
+_KEYWORD_PATTERNS = {asset_type: re.compile(r'\b(?:' + '|'.join(re.escape(k) for k in keywords) + ')')
+                     for asset_type, keywords in ASSET_KEYWORDS.items()}
+
+# Subjects that never list individual assets
+NEGATIVE_TOPICS = ['topographic', 'topo survey', 'contour', 'geotechnical', 'geotech', 'borehole',
+                   'soil', 'flora', 'fauna', 'heritage', 'traffic management']
+COVER_WORDS = ['cover sheet', 'cover page', 'title sheet', 'transmittal', 'drawing register', 'drawing index']
+
+
+def document_features(doc_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Cheap statistics over the filename and parsed text of a document"""
+    filename = doc_info['filename']
+    text = doc_info.get('full_text') or ''
+    lowered = text.lower()
+    code = DOC_TYPE_CODE.search(filename)
+    tag_prefixes = ASSET_TAG.findall(text)
+    keyword_hits = {asset_type: len(pattern.findall(lowered)) for asset_type, pattern in _KEYWORD_PATTERNS.items()}
+    page_count = doc_info.get('page_count') or 0
+    return {
+        'category': categorize_document(filename),
+        'type_code': code.group(1).upper() if code else None,
+        'words': len(text.split()),
+        'tags': len(tag_prefixes),
+        'tag_types': {TAG_ASSET_TYPES[prefix] for prefix in tag_prefixes},
+        'keyword_hits': keyword_hits,
+        'asset_keywords': sum(keyword_hits.values()),
+        'negative_topic': next((t for t in NEGATIVE_TOPICS if t in filename.lower() or t in lowered[:300]), None),
+        'cover': any(w in filename.lower() or w in lowered[:500] for w in COVER_WORDS),
+        'tables_per_page': (doc_info.get('table_count') or 0) / page_count if page_count else 0.0,
+    }
+
+
+def _asset_types(features: Dict[str, Any]) -> List[str]:
+    return [asset_type for asset_type, hits in features['keyword_hits'].items()
+            if hits >= 2 or asset_type in features['tag_types']]
+
+
+def _decision(relevant: bool, document_type: str, reason: str, asset_types: List[str],
+              confidence: float) -> Dict[str, Any]:
+    return {
+        'is_asset_relevant': relevant,
+        'confidence': confidence,
+        'reason': f"Heuristic: {reason}",
+        'asset_types': asset_types,
+        'document_type': document_type,
+        'classified_by': 'heuristic',
+    }
+
+
+def heuristic_classification(doc_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Classification in the LLM reviewer's format for clear-cut documents,
+    None when the document needs the model
+    Unreadable or textless documents are always left to the model
+    """
+    if doc_info.get('error') or not doc_info.get('full_text'):
+        return None
+    f = document_features(doc_info)
+
+    # Cover sheets / registers: a page of title-block text with no tags or tables
+    if f['cover'] and f['tags'] == 0 and f['tables_per_page'] == 0 and doc_info.get('page_count', 0) <= 2:
+        return _decision(False, 'other', f"cover/title sheet ({f['words']} words, no equipment tags)", [], 0.95)
+
+    # Surveys, soil and geotechnical reports with no equipment content
+    if f['negative_topic'] and f['tags'] < 3 and f['asset_keywords'] <= max(2, f['words'] // 500):
+        return _decision(False, 'other', f"'{f['negative_topic']}' document with {f['tags']} equipment tags "
+                                         f"and {f['asset_keywords']} asset keywords", [], 0.9)
+
+    # Equipment lists and cable schedules that are full of tags or tables
+    schedule = f['category'] in ('EQUIPMENT_LIST', 'CABLE_SCHEDULE') or f['type_code'] in ('SCH', 'LST')
+    if schedule and (f['tags'] >= 10 or (f['tables_per_page'] >= 1 and f['asset_keywords'] >= 5)):
+        cable = (f['category'] == 'CABLE_SCHEDULE' or 'cable' in doc_info['filename'].lower()
+                 or f['keyword_hits']['cable'] > f['tags'])
+        return _decision(True, 'cable_schedule' if cable else 'equipment_schedule',
+                         f"{f['type_code'] or f['category'].lower()} document with {f['tags']} equipment tags, "
+                         f"{f['tables_per_page']:.1f} tables/page", _asset_types(f), 0.9)
+
+    # Calculation reports built around equipment/cable tables
+    calculation = f['category'] == 'CALCULATION' or f['type_code'] in ('CAL', 'RPT')
+    if calculation and f['tags'] >= 10 and f['tables_per_page'] >= 1:
+        return _decision(True, 'calculation', f"calculation/report ({f['type_code'] or f['category'].lower()}) "
+                                              f"with {f['tags']} equipment tags, {f['tables_per_page']:.1f} tables/page",
+                         _asset_types(f), 0.85)
+
+    return None
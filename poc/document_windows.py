@@ -0,0 +1,100 @@
+"""
+Document Windows
+Splits parsed pages into token-bounded, page-aligned windows (with a
+configurable page overlap) so long documents fit the model's context and
+output limits, and merges the assets extracted from each window
+"""
+from typing import List, Dict, Any, Optional, Tuple
+from llm_client import estimate_tokens
+from page_store import pages_to_text
+
+# Prompt-text budget per window; extraction is bounded by the model's output
+# length (every asset comes back as JSON), classification only by its context
+CLASSIFY_WINDOW_TOKENS = 120_000
+EXTRACT_WINDOW_TOKENS = 24_000
+OVERLAP_PAGES = 1
+
+
+def page_windows(pages: List[Dict[str, Any]], max_tokens: int,
+                 overlap_pages: int = OVERLAP_PAGES) -> List[List[Dict[str, Any]]]:
+    """
+    Group page records into consecutive windows of at most max_tokens
+    Each window after the first repeats the last overlap_pages pages of the
+    previous one; a single page over the budget gets a window of its own
+    """
+    sized = [(page, estimate_tokens(page['text'] or '')) for page in pages]
+    if sum(tokens for _, tokens in sized) <= max_tokens:
+        return [pages]
+
+    windows = []
+    start = 0
+    while start < len(sized):
+        end = start
+        total = 0
+        while end < len(sized) and (end == start or total + sized[end][1] <= max_tokens):
+            total += sized[end][1]
+            end += 1
+        windows.append([page for page, _ in sized[start:end]])
+        if end >= len(sized):
+            break
+        # Step back for the overlap, but always move forward at least one page
+        start = max(start + 1, end - overlap_pages)
+    return windows
+
+
+def split_window(window: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Halve a window whose response was truncated"""
+    middle = len(window) // 2
+    return window[:middle], window[middle:]
+
+
+def window_text(window: List[Dict[str, Any]]) -> str:
+    return pages_to_text(window)
+
+
+def window_label(window: List[Dict[str, Any]], page_count: int) -> str:
+    if not window:
+        return f"no pages of {page_count}"
+    return f"pages {window[0]['page']}-{window[-1]['page']} of {page_count}"
+
+
+def _asset_key(asset: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    identifier = asset.get('asset_id') or asset.get('name')
+    if not identifier:
+        return None
+    return str(identifier).strip().lower(), str(asset.get('type') or '').strip().lower()
+
+
+def _merge_asset(existing: Dict[str, Any], duplicate: Dict[str, Any]):
+    """Fill fields (and specifications) the first sighting left empty"""
+    for field, value in duplicate.items():
+        if field == 'specifications' and isinstance(value, dict):
+            specs = existing.setdefault('specifications', {})
+            if isinstance(specs, dict):
+                for spec, spec_value in value.items():
+                    if spec_value not in (None, '', '...') and specs.get(spec) in (None, '', '...'):
+                        specs[spec] = spec_value
+        elif value not in (None, '', []) and existing.get(field) in (None, '', []):
+            existing[field] = value
+    if isinstance(existing.get('confidence'), (int, float)) and isinstance(duplicate.get('confidence'), (int, float)):
+        existing['confidence'] = max(existing['confidence'], duplicate['confidence'])
+
+
+def merge_window_assets(window_assets: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Concatenate per-window assets, collapsing the same asset seen by
+    different windows (overlapping pages or a tag repeated later on)
+    Duplicates within one window are left as the model returned them
+    """
+    merged = []
+    first_seen: Dict[Tuple[str, str], Tuple[Dict[str, Any], int]] = {}
+    for window_idx, assets in enumerate(window_assets):
+        for asset in assets:
+            key = _asset_key(asset)
+            if key is not None and key in first_seen and first_seen[key][1] != window_idx:
+                _merge_asset(first_seen[key][0], asset)
+                continue
+            merged.append(asset)
+            if key is not None and key not in first_seen:
+                first_seen[key] = (asset, window_idx)
+    return merged
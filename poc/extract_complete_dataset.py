@@ -32,25 +32,17 @@ def main():
     print("="*80)
     print(f"Total Assets: {len(complete_result.assets)}")
     
-    # Category breakdown
-    category_counts = {}
-    for asset in complete_result.assets:
-        cat = asset.category
-        category_counts[cat] = category_counts.get(cat, 0) + 1
+    # Category and completeness breakdowns from the columnar register
+    from asset_register import AssetRegister  # pandas/numpy only when summarising
+    register = AssetRegister.from_records(complete_result.assets)
     
     print("\n### ASSETS BY CATEGORY ###")
-    for cat, count in sorted(category_counts.items()):
+    for cat, count in register.counts('category', order='key'):
         print(f"  {cat}: {count}")
     
-    # Completeness
-    completeness_counts = {}
-    for asset in complete_result.assets:
-        level = asset.data_completeness.value
-        completeness_counts[level] = completeness_counts.get(level, 0) + 1
-    
     print("\n### DATA COMPLETENESS ###")
-    for level, count in sorted(completeness_counts.items()):
-        pct = (count / len(complete_result.assets)) * 100 if complete_result.assets else 0
+    for level, count in register.counts('completeness', order='key'):
+        pct = (count / len(register)) * 100 if len(register) else 0
         print(f"  {level}: {count} ({pct:.1f}%)")
     
     # Save dataset
@@ -69,7 +61,7 @@ def main():
                 'name': asset.name,
                 'category': asset.category,
                 'description': asset.description,
-                'specifications': getattr(asset, 'specifications', {}),
+                'specifications': dict(getattr(asset, 'specifications', {})),
                 'data_completeness': asset.data_completeness.value,
                 'extraction_source': asset.extraction_metadata.source_document if asset.extraction_metadata else None
             }
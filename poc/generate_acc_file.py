@@ -1,45 +1,27 @@
 """
 Generate ACC Excel Import File from Complete Asset List
 """
-import json
-import openpyxl
 from pathlib import Path
 from datetime import datetime
+from asset_stream import iter_assets
+from acc_excel_generator import write_workbook
 
 def generate_acc_excel(assets_json_path: str, output_path: str):
-    """Generate ACC-compatible Excel file from asset JSON"""
+    """Generate ACC-compatible Excel file from asset JSON (or JSONL), streaming row by row"""
     
-    # Load assets
-    with open(assets_json_path, 'r') as f:
-        assets = json.load(f)
+    print(f"Streaming assets from {Path(assets_json_path).name}")
     
-    print(f"Loaded {len(assets)} assets from {Path(assets_json_path).name}")
-    
-    # Create workbook
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Assets"
-    
-    # Write header
+    # Write header, then one row per asset
     headers = ["Name", "Category", "Status", "Location", "Barcode", "System Names", "Description"]
-    ws.append(headers)
-    
-    # Write assets
-    for asset in assets:
-        name = asset.get('name', '')
-        category = asset.get('category', '')
-        status = asset.get('status', 'Specified')
-        location = asset.get('location', '')
-        barcode = ''
-        system_names = ''
-        description = asset.get('description', '')
-        
-        ws.append([name, category, status, location, barcode, system_names, description])
+    rows = (
+        [asset.get('name', ''), asset.get('category', ''), asset.get('status', 'Specified'),
+         asset.get('location', ''), '', '', asset.get('description', '')]
+        for asset in iter_assets(assets_json_path)
+    )
+    count = write_workbook(Path(output_path), headers, rows, styled_header=False)
     
-    # Save
-    wb.save(output_path)
     print(f"✓ Saved ACC Excel file to: {output_path}")
-    print(f"  Total rows: {len(assets) + 1} (including header)")
+    print(f"  Total rows: {count + 1} (including header)")
     
     return output_path
 
@@ -0,0 +1,276 @@
+"""
+LLM Client
+Asyncio-based OpenAI client shared by the reviewer and extractors
+Keeps a bounded number of requests in flight and paces them with a
+client-side requests/tokens-per-minute governor that backs off on 429s
+and timeouts and probes back up once calls succeed again
+Responses are served from / stored in the on-disk response cache
+"""
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+from openai import AsyncOpenAI, APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+from openai.types.chat import ChatCompletion
+from response_cache import ResponseCache, cache_key, get_default_cache
+from usage_ledger import UsageLedger
+
+# Defaults sized for gpt-4.1-mini on a standard usage tier
+MAX_IN_FLIGHT = 8
+REQUESTS_PER_MINUTE = 500
+TOKENS_PER_MINUTE = 200_000
+MAX_RETRIES = 6
+REQUEST_TIMEOUT = 120
+
+# Rough completion budget reserved against the TPM limit until usage is known
+COMPLETION_TOKEN_ESTIMATE = 1_000
+
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English/technical text)"""
+    return len(text) // 4 + 1
+
+
+class RateGovernor:
+    """
+    Token-bucket RPM/TPM limiter with AIMD adaptation
+    Both rates are halved on a 429 or timeout (at most once per cooldown
+    window) and grow back towards the configured ceiling by a small step
+    after every successful call
+    """
+    BURST_SECONDS = 10
+    DECREASE_COOLDOWN = 5.0
+
+    def __init__(self, rpm: int = REQUESTS_PER_MINUTE, tpm: int = TOKENS_PER_MINUTE,
+                 min_fraction: float = 0.05, increase_fraction: float = 0.02):
+        self.max_rpm = rpm
+        self.max_tpm = tpm
+        self.rpm = float(rpm)
+        self.tpm = float(tpm)
+        self.min_fraction = min_fraction
+        self.increase_fraction = increase_fraction
+        self._request_level = self._request_capacity()
+        self._token_level = self._token_capacity()
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._decreased_at = 0.0
+        self._lock = None
+        self.backoffs = 0
+
+    def _request_capacity(self) -> float:
+        return max(1.0, self.rpm * self.BURST_SECONDS / 60)
+
+    def _token_capacity(self) -> float:
+        return max(1.0, self.tpm * self.BURST_SECONDS / 60)
+
+    def _refill(self, now: float):
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        self._request_level = min(self._request_capacity(), self._request_level + elapsed * self.rpm / 60)
+        self._token_level = min(self._token_capacity(), self._token_level + elapsed * self.tpm / 60)
+
+    async def acquire(self, tokens: int):
+        """Wait until one request of roughly `tokens` tokens fits in both budgets"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                # A prompt larger than the burst budget waits for a full bucket
+                # and then runs the balance negative rather than never fitting
+                needed_tokens = min(tokens, self._token_capacity())
+                if self._request_level >= 1 and self._token_level >= needed_tokens:
+                    self._request_level -= 1
+                    self._token_level -= tokens
+                    return
+                wait = max((1 - self._request_level) * 60 / self.rpm,
+                           (needed_tokens - self._token_level) * 60 / self.tpm,
+                           0.01)
+                await asyncio.sleep(wait)
+
+    def release(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Settle the token estimate against the usage the API reported"""
+        if actual_tokens is not None:
+            self._token_level += estimated_tokens - actual_tokens
+
+    def on_success(self):
+        self.rpm = min(self.max_rpm, self.rpm + self.max_rpm * self.increase_fraction)
+        self.tpm = min(self.max_tpm, self.tpm + self.max_tpm * self.increase_fraction)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """Multiplicative decrease, plus a pause honouring the server's Retry-After"""
+        now = time.monotonic()
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + retry_after)
+        if now - self._decreased_at < self.DECREASE_COOLDOWN:
+            return  # Requests already in flight when the limit was hit
+        self._decreased_at = now
+        self.rpm = max(self.max_rpm * self.min_fraction, self.rpm / 2)
+        self.tpm = max(self.max_tpm * self.min_fraction, self.tpm / 2)
+        self.backoffs += 1
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMClient:
+    """
+    Chat-completions client running on a private asyncio event loop
+    submit() takes the same keyword arguments as
+    client.chat.completions.create() and returns a concurrent Future, so the
+    synchronous scripts can queue many documents and collect the responses
+    in order; create() is the blocking equivalent
+    Cached responses resolve immediately without touching the rate budget;
+    use_cache=False (or ACC_LLM_CACHE_BYPASS=1) always calls the API
+    With a ledger every call (cached or not) is recorded with the caller's
+    context - stage, document, document type
+    """
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT,
+                 requests_per_minute: int = REQUESTS_PER_MINUTE, tokens_per_minute: int = TOKENS_PER_MINUTE,
+                 max_retries: int = MAX_RETRIES, request_timeout: float = REQUEST_TIMEOUT,
+                 cache: Optional[ResponseCache] = None, use_cache: bool = True,
+                 ledger: Optional[UsageLedger] = None):
+        self.cache = (cache or get_default_cache()) if use_cache else None
+        self.ledger = ledger
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_retries = max_retries
+        self.request_timeout = request_timeout
+        self.governor = RateGovernor(requests_per_minute, tokens_per_minute)
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._loop = None
+        self._thread = None
+        self._client = None
+        self._semaphore = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name='llm-client', daemon=True)
+            self._thread.start()
+            asyncio.run_coroutine_threadsafe(self._setup(), self._loop).result()
+
+    async def _setup(self):
+        # Retries are handled here so the governor sees every throttled attempt
+        self._client = AsyncOpenAI(max_retries=0, timeout=self.request_timeout)
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+    def submit(self, template_version: Optional[str] = None, context: Optional[Dict[str, Any]] = None,
+               **create_kwargs) -> Future:
+        """
+        Queue a chat completion; the Future resolves to the API response
+        template_version is part of the cache key - bump it when a prompt's
+        template or the handling of its response changes
+        context is copied into the call's ledger record
+        """
+        context = context or {}
+        key = None
+        if self.cache is not None:
+            key = cache_key(create_kwargs, template_version)
+            cached = self.cache.get(key)
+            if cached is None:
+                self.cache_misses += 1
+            else:
+                self.cache_hits += 1
+                response = ChatCompletion.model_validate_json(cached)
+                if self.ledger is not None:
+                    self.ledger.record_llm_call(context, response, create_kwargs.get('model'), 0.0, 0.0, 0, True)
+                future = Future()
+                future.set_result(response)
+                return future
+
+        self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self._create(create_kwargs, key, context), self._loop)
+
+    def create(self, template_version: Optional[str] = None, context: Optional[Dict[str, Any]] = None,
+               **create_kwargs):
+        return self.submit(template_version, context, **create_kwargs).result()
+
+    async def _create(self, create_kwargs: Dict[str, Any], key: Optional[str] = None,
+                      context: Optional[Dict[str, Any]] = None):
+        prompt_text = ''.join(str(m.get('content', '')) for m in create_kwargs.get('messages', []))
+        estimated = estimate_tokens(prompt_text) + COMPLETION_TOKEN_ESTIMATE
+        queued_at = time.monotonic()
+
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self.governor.acquire(estimated)
+                started_at = time.monotonic()
+                try:
+                    response = await self._client.chat.completions.create(**create_kwargs)
+                except Exception as e:
+                    if not isinstance(e, RETRYABLE_ERRORS) or attempt == self.max_retries:
+                        self.failures += 1
+                        if self.ledger is not None:
+                            self.ledger.record_llm_call(context or {}, None, create_kwargs.get('model'),
+                                                        time.monotonic() - started_at, started_at - queued_at,
+                                                        attempt, False, error=str(e))
+                    self.governor.release(estimated, 0)
+                    if not isinstance(e, RETRYABLE_ERRORS):
+                        raise
+                    if isinstance(e, (RateLimitError, APITimeoutError)):
+                        self.governor.on_throttle(_retry_after(e))
+                    if attempt == self.max_retries:
+                        raise
+                    self.retries += 1
+                    # Jittered exponential delay so throttled requests don't retry in lockstep
+                    await asyncio.sleep(min(60, 2 ** attempt) * (0.5 + random.random()))
+                    continue
+
+                usage = getattr(response, 'usage', None)
+                self.governor.release(estimated, getattr(usage, 'total_tokens', None))
+                self.governor.on_success()
+                self.calls += 1
+                if self.ledger is not None:
+                    self.ledger.record_llm_call(context or {}, response, create_kwargs.get('model'),
+                                                time.monotonic() - started_at, started_at - queued_at,
+                                                attempt, False)
+                # Truncated or filtered completions aren't worth pinning in the cache
+                if key is not None and response.choices and response.choices[0].finish_reason == 'stop':
+                    self.cache.put(key, create_kwargs.get('model'), response.model_dump_json())
+                return response
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'retries': self.retries,
+            'failures': self.failures,
+            'backoffs': self.governor.backoffs,
+            'rpm_limit': round(self.governor.rpm),
+            'tpm_limit': round(self.governor.tpm),
+        }
+
+    def close(self):
+        """Stop the event loop thread (a later submit() starts a new one)"""
+        with self._start_lock:
+            if self._loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._client.close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+            self._client = None
@@ -1,10 +1,14 @@
 """
 Data models for ACC datascraping POC - Rewritten from scratch.
+Asset classes are slotted and share their metadata, interned category /
+location strings and specification key layouts, so registers with
+millions of cables stay compact
 """
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from enum import Enum
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Mapping, Tuple
 from datetime import datetime
+import sys
 import uuid
 
 class DataCompleteness(Enum):
@@ -14,15 +18,68 @@ class DataCompleteness(Enum):
     BULK_ONLY = "BULK_ONLY"
     INVALID = "INVALID"
 
-@dataclass
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+class CompactSpecs(Mapping):
+    """
+    Read-only specifications mapping - a values tuple plus a key tuple
+    shared by every asset with the same specification keys (a cable
+    schedule gives thousands of assets one layout); string values are
+    interned, so repeated locations and sizes are stored once
+    """
+    __slots__ = ('_keys', '_values')
+
+    # key tuple -> (key tuple, key -> position), one entry per distinct layout
+    _layouts: Dict[Tuple[str, ...], Tuple[Tuple[str, ...], Dict[str, int]]] = {}
+
+    def __init__(self, specifications: Optional[Mapping[str, Any]] = None):
+        if isinstance(specifications, CompactSpecs):
+            self._keys, self._values = specifications._keys, specifications._values
+            return
+        specifications = specifications or {}
+        keys = tuple(sys.intern(str(key)) for key in specifications)
+        layout = self._layouts.get(keys)
+        if layout is None:
+            layout = self._layouts.setdefault(keys, (keys, {key: i for i, key in enumerate(keys)}))
+        self._keys = layout
+        self._values = tuple(_intern(value) for value in specifications.values())
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[self._keys[1][key]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys[0])
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    def __reduce__(self):
+        return (CompactSpecs, (dict(self),))
+
+
+@dataclass(frozen=True, slots=True)
 class ExtractionMetadata:
+    """
+    Immutable, so one instance can be shared by every asset extracted the
+    same way (same document, method, confidence and page)
+    """
     source_document: str
     extraction_method: str
     confidence: float
     source_page: Optional[int] = None
     extracted_at: datetime = field(default_factory=datetime.now)
 
-@dataclass
+    def __post_init__(self):
+        object.__setattr__(self, 'source_document', _intern(self.source_document))
+        object.__setattr__(self, 'extraction_method', _intern(self.extraction_method))
+
+@dataclass(slots=True)
 class Asset:
     name: str
     category: str
@@ -32,22 +89,48 @@ class Asset:
     data_completeness: DataCompleteness = DataCompleteness.INSUFFICIENT
     extraction_metadata: Optional[ExtractionMetadata] = None
 
-@dataclass
+    def __post_init__(self):
+        self.category = _intern(self.category)
+        self.status = _intern(self.status)
+
+@dataclass(slots=True)
 class EquipmentAsset(Asset):
     manufacturer: Optional[str] = None
     model: Optional[str] = None
-    specifications: Dict[str, Any] = field(default_factory=dict)
+    specifications: Mapping[str, Any] = field(default_factory=dict)
 
-@dataclass
+    def __post_init__(self):
+        Asset.__post_init__(self)
+        self.manufacturer = _intern(self.manufacturer)
+        self.model = _intern(self.model)
+        self.specifications = CompactSpecs(self.specifications)
+
+@dataclass(slots=True)
 class BulkMaterial:
     material_type: str
     quantity: float
     unit: str
     description: Optional[str] = None
-    specifications: Dict[str, Any] = field(default_factory=dict)
+    specifications: Mapping[str, Any] = field(default_factory=dict)
     extraction_metadata: Optional[ExtractionMetadata] = None
 
-@dataclass
+    def __post_init__(self):
+        self.material_type = _intern(self.material_type)
+        self.unit = _intern(self.unit)
+        self.specifications = CompactSpecs(self.specifications)
+
+@dataclass(slots=True)
 class ExtractionResult:
     assets: List[Asset] = field(default_factory=list)
     bulk_materials: List[BulkMaterial] = field(default_factory=list)
+
+
+def asset_to_dict(asset) -> Dict[str, Any]:
+    """
+    Field -> value dict of a model (what `asset.__dict__` gave before the
+    classes were slotted), with specifications as a plain dict
+    """
+    data = {f.name: getattr(asset, f.name) for f in fields(asset)}
+    if isinstance(data.get('specifications'), CompactSpecs):
+        data['specifications'] = dict(data['specifications'])
+    return data
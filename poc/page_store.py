@@ -0,0 +1,336 @@
+"""
+Page Store
+Content-addressed on-disk cache of parsed PDF pages (text + tables)
+Keyed by file SHA-256, page index and extractor version so every script
+(reviewer, extractor, cable extractors, debug scripts) parses a page once
+"""
+import hashlib
+import json
+import os
+import signal
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+# Bump whenever the way page text/tables are produced changes - old entries
+# are then ignored rather than silently reused
+EXTRACTOR_VERSION = "pdfplumber-text-tables-2"
+
+DEFAULT_STORE_PATH = Path(os.environ.get(
+    "ACC_PAGE_STORE",
+    "/home/ubuntu/acc-tools/poc/output/page_store.db"
+))
+
+# Pages written to the store per transaction while parsing a document
+STORE_FLUSH_PAGES = 25
+
+_hash_cache: Dict[Tuple[str, int, int], str] = {}
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file's content (memoised per path/size/mtime within a process)"""
+    path = Path(path)
+    stat = path.stat()
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _hash_cache:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        _hash_cache[key] = digest.hexdigest()
+    return _hash_cache[key]
+
+
+class PageStore:
+    """
+    SQLite-backed page cache shared between processes
+    WAL journaling lets several readers and writers use the same file at once
+    """
+    def __init__(self, db_path: Path = DEFAULT_STORE_PATH, extractor_version: str = EXTRACTOR_VERSION):
+        self.db_path = Path(db_path)
+        self.extractor_version = extractor_version
+        self._conn = None
+        self._owner = None
+
+    def __getstate__(self):
+        # Connections can't cross process boundaries - each process reconnects
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        state['_owner'] = None
+        return state
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Nor threads - the long-lived worker runs successive jobs on pool threads
+        owner = (os.getpid(), threading.get_ident())
+        if self._conn is None or self._owner != owner:
+            self.db_path.parent.mkdir(exist_ok=True, parents=True)
+            self._conn = sqlite3.connect(self.db_path, timeout=60)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    file_hash TEXT NOT NULL,
+                    extractor_version TEXT NOT NULL,
+                    page_count INTEGER NOT NULL,
+                    PRIMARY KEY (file_hash, extractor_version)
+                )""")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    file_hash TEXT NOT NULL,
+                    page_index INTEGER NOT NULL,
+                    extractor_version TEXT NOT NULL,
+                    text TEXT,
+                    tables TEXT NOT NULL,
+                    tables_skipped INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (file_hash, page_index, extractor_version)
+                )""")
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(pages)")]
+            if 'tables_skipped' not in columns:
+                self._conn.execute("ALTER TABLE pages ADD COLUMN tables_skipped INTEGER NOT NULL DEFAULT 0")
+            self._conn.commit()
+            self._owner = owner
+        return self._conn
+
+    def get_page_count(self, file_hash: str) -> Optional[int]:
+        row = self.conn.execute(
+            "SELECT page_count FROM documents WHERE file_hash = ? AND extractor_version = ?",
+            (file_hash, self.extractor_version)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_page_count(self, file_hash: str, page_count: int):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO documents (file_hash, extractor_version, page_count) VALUES (?, ?, ?)",
+                (file_hash, self.extractor_version, page_count)
+            )
+
+    def get_pages(self, file_hash: str, start: int = 0, end: Optional[int] = None) -> Dict[int, Dict[str, Any]]:
+        """Return cached pages in [start, end) keyed by page index"""
+        end = end if end is not None else 2 ** 31
+        rows = self.conn.execute(
+            "SELECT page_index, text, tables, tables_skipped FROM pages "
+            "WHERE file_hash = ? AND extractor_version = ? AND page_index >= ? AND page_index < ?",
+            (file_hash, self.extractor_version, start, end)
+        ).fetchall()
+        return {idx: _page_record(idx, text, json.loads(tables), bool(skipped))
+                for idx, text, tables, skipped in rows}
+
+    def put_pages(self, file_hash: str, pages: List[Dict[str, Any]]):
+        if not pages:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO pages (file_hash, page_index, extractor_version, text, tables, tables_skipped) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(file_hash, p['page'] - 1, self.extractor_version, p['text'], json.dumps(p['tables']),
+                  int(p['tables_skipped'])) for p in pages]
+            )
+
+
+_default_store: Optional[PageStore] = None
+
+
+def get_default_store() -> PageStore:
+    global _default_store
+    if _default_store is None:
+        _default_store = PageStore()
+    return _default_store
+
+
+def _page_record(page_index: int, text: Optional[str], tables: List, tables_skipped: bool = False) -> Dict[str, Any]:
+    return {'page': page_index + 1, 'text': text, 'tables': tables, 'tables_skipped': tables_skipped}
+
+
+def may_contain_table(page) -> bool:
+    """
+    Cheap pre-check before page.extract_tables()
+    pdfplumber's default 'lines' strategy builds cells only from ruling lines
+    and rect borders, so a page without at least two horizontal and two
+    vertical edges can't yield a table - skipping it gives identical output
+    """
+    return len(page.horizontal_edges) >= 2 and len(page.vertical_edges) >= 2
+
+
+def release_page(page):
+    """
+    Drop a page's cached layout objects once its text and tables are captured
+    pdfplumber otherwise keeps every touched page's chars/lines/rects alive
+    until the whole document is closed
+    """
+    if hasattr(page, 'close'):
+        page.close()
+    else:
+        page.flush_cache()
+
+
+class PageTimeout(Exception):
+    """Raised inside a page parse that overran its time budget"""
+
+
+_watchdog_warned = False
+
+
+@contextmanager
+def time_limit(seconds: Optional[float]):
+    """
+    SIGALRM-based watchdog - interrupts pdfminer layout analysis mid-page
+    Only armed in a process's main thread (parser workers and CLI runs);
+    elsewhere the budget is ignored, with a one-time warning
+    """
+    global _watchdog_warned
+    if not seconds:
+        yield
+        return
+    if not hasattr(signal, 'setitimer') or threading.current_thread() is not threading.main_thread():
+        if not _watchdog_warned:
+            _watchdog_warned = True
+            print(f"⚠ Parse timeouts disabled in thread {threading.current_thread().name} - "
+                  f"the watchdog only runs in a process's main thread (use a parser worker process)",
+                  file=sys.stderr, flush=True)
+        yield
+        return
+
+    def _on_alarm(signum, frame):
+        raise PageTimeout()
+
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _degraded_text(pdf_path: Path, page_indices: List[int], page_timeout: Optional[float]) -> Dict[int, str]:
+    """Text-only fallback for timed-out pages - PyPDF2 skips layout analysis entirely"""
+    try:
+        from PyPDF2 import PdfReader
+    except ImportError:
+        return {}
+
+    texts = {}
+    reader = PdfReader(str(pdf_path))
+    for page_idx in page_indices:
+        try:
+            with time_limit(page_timeout):
+                texts[page_idx] = reader.pages[page_idx].extract_text() or None
+        except Exception:
+            continue
+    return texts
+
+
+def timed_out_pages(pages: List[Dict[str, Any]]) -> List[int]:
+    """Page numbers that overran the time budget (including ones recovered in degraded mode)"""
+    return [p['page'] for p in pages if p.get('timed_out')]
+
+
+def skipped_table_pages(pages: List[Dict[str, Any]]) -> int:
+    """Number of pages where table detection was skipped by the pre-check"""
+    return sum(1 for p in pages if p.get('tables_skipped'))
+
+
+def load_pages(pdf_path: Path, store: Optional[PageStore] = None,
+               start: int = 0, end: Optional[int] = None,
+               page_timeout: Optional[float] = None, doc_timeout: Optional[float] = None,
+               degraded_retry: bool = False) -> List[Dict[str, Any]]:
+    """
+    Return page records ({'page', 'text', 'tables'}) for pages [start, end)
+    Pages already in the store are reused; only missing pages are parsed
+    Pages that overrun page_timeout (or the remaining doc_timeout budget) are
+    returned empty with timed_out=True and not cached; with degraded_retry
+    they get a text-only second pass once the rest of the document is done
+    """
+    pdf_path = Path(pdf_path)
+    store = store or get_default_store()
+    file_hash = file_sha256(pdf_path)
+
+    page_count = store.get_page_count(file_hash)
+    if page_count is not None:
+        stop = page_count if end is None else min(end, page_count)
+        cached = store.get_pages(file_hash, start, stop)
+        if len(cached) == max(stop - start, 0):
+            return [cached[idx] for idx in range(start, stop)]
+
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        page_count = len(pdf.pages)
+        store.set_page_count(file_hash, page_count)
+        stop = page_count if end is None else min(end, page_count)
+        cached = store.get_pages(file_hash, start, stop)
+
+        pages = []
+        parsed = []
+        timed_out = []
+        deadline = time.monotonic() + doc_timeout if doc_timeout else None
+        for page_idx in range(start, stop):
+            if page_idx in cached:
+                pages.append(cached[page_idx])
+                continue
+
+            budget = page_timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                budget = min(budget, remaining) if budget else remaining
+
+            page = pdf.pages[page_idx]
+            try:
+                if budget is not None and budget <= 0:
+                    raise PageTimeout()
+                with time_limit(budget):
+                    if may_contain_table(page):
+                        record = _page_record(page_idx, page.extract_text(), page.extract_tables())
+                    else:
+                        record = _page_record(page_idx, page.extract_text(), [], tables_skipped=True)
+            except PageTimeout:
+                record = _page_record(page_idx, None, [])
+                record['timed_out'] = True
+                pages.append(record)
+                timed_out.append(record)
+                continue
+            finally:
+                release_page(page)
+            pages.append(record)
+            parsed.append(record)
+
+            # Flush to the store as we go so a crash mid-document keeps finished pages
+            if len(parsed) >= STORE_FLUSH_PAGES:
+                store.put_pages(file_hash, parsed)
+                parsed = []
+
+        store.put_pages(file_hash, parsed)
+
+    if timed_out and degraded_retry:
+        texts = _degraded_text(pdf_path, [r['page'] - 1 for r in timed_out], page_timeout)
+        for record in timed_out:
+            if record['page'] - 1 in texts:
+                record['text'] = texts[record['page'] - 1]
+                record['degraded'] = True
+
+    return pages
+
+
+def count_pages(pdf_path: Path, store: Optional[PageStore] = None) -> int:
+    """Number of pages in a PDF - from the store if known, otherwise from the page tree"""
+    pdf_path = Path(pdf_path)
+    store = store or get_default_store()
+    file_hash = file_sha256(pdf_path)
+    count = store.get_page_count(file_hash)
+    if count is None:
+        import pdfplumber
+        with pdfplumber.open(pdf_path) as pdf:
+            count = len(pdf.pages)
+        store.set_page_count(file_hash, count)
+    return count
+
+
+def pages_to_text(pages: List[Dict[str, Any]]) -> str:
+    """Join page records into the '[Page N]' layout used in LLM prompts"""
+    return '\n\n'.join(f"[Page {p['page']}]\n{p['text']}" for p in pages if p['text'])
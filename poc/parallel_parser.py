@@ -0,0 +1,191 @@
+"""
+Parallel Document Parser
+Parses PDFs into page records across a process pool and streams the
+results back to the caller in input order
+Large documents are split into page-range shards so one 800-page drawing
+set doesn't pin a single worker for the whole job, and workers are recycled
+after a number of documents or once their RSS passes a ceiling
+"""
+import os
+import resource
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, Dict, Any, Optional, Tuple
+from page_store import PageStore, load_pages, count_pages, get_default_store
+from usage_ledger import UsageLedger
+
+# Documents with more pages than this are split into shards of SHARD_SIZE pages
+SHARD_THRESHOLD = 200
+SHARD_SIZE = 50
+
+# Worker recycling defaults (None disables the limit)
+MAX_DOCS_PER_WORKER = 100
+MAX_WORKER_RSS_MB = 2048
+
+# Time budgets in seconds (None disables); per-document budget applies per shard
+PAGE_TIMEOUT = 120
+DOC_TIMEOUT = 1800
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _parse_shard(pdf_path: str, store: PageStore, start: int, end: Optional[int],
+                 max_rss_mb: Optional[float] = None, load_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Worker entry point - never raises so one bad PDF can't break the pool"""
+    started_at = time.monotonic()
+    try:
+        result = {'path': pdf_path, 'pages': load_pages(Path(pdf_path), store, start, end, **(load_options or {}))}
+    except Exception as e:
+        result = {'path': pdf_path, 'pages': [], 'error': str(e)}
+    result['seconds'] = time.monotonic() - started_at
+    if max_rss_mb and current_rss_mb() > max_rss_mb:
+        result['recycle'] = True
+    return result
+
+
+class DocumentParser:
+    """
+    Ordered, streaming PDF parser
+    workers=1 parses in-process; workers>1 fans documents (or page-range
+    shards of large documents) out to a process pool while results are
+    still yielded in the order the paths were given
+    isolate=True uses the pool even for one worker, so the parse watchdog
+    runs in a worker's main thread when the caller is on another thread
+    With a ledger, every yielded document is recorded with its parse time
+    (summed over shards)
+    """
+    def __init__(self, workers: int = 1, store: Optional[PageStore] = None,
+                 shard_threshold: int = SHARD_THRESHOLD, shard_size: int = SHARD_SIZE,
+                 max_docs_per_worker: Optional[int] = MAX_DOCS_PER_WORKER,
+                 max_worker_rss_mb: Optional[float] = MAX_WORKER_RSS_MB,
+                 page_timeout: Optional[float] = PAGE_TIMEOUT, doc_timeout: Optional[float] = DOC_TIMEOUT,
+                 degraded_retry: bool = True, ledger: Optional[UsageLedger] = None, isolate: bool = False):
+        self.workers = max(1, workers or 1)
+        self.isolate = isolate
+        self.store = store or get_default_store()
+        self.shard_threshold = shard_threshold
+        self.shard_size = max(1, shard_size)
+        self.max_docs_per_worker = max_docs_per_worker
+        self.max_worker_rss_mb = max_worker_rss_mb
+        self.load_options = {
+            'page_timeout': page_timeout,
+            'doc_timeout': doc_timeout,
+            'degraded_retry': degraded_retry,
+        }
+        self.pool_recycles = 0
+        self.ledger = ledger
+        self._executor = None
+
+    def parse(self, pdf_paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Yield {'path', 'pages', 'seconds'[, 'error']} for each path, in order"""
+        for result in self._parse(pdf_paths):
+            if self.ledger is not None:
+                self.ledger.record_parse(result)
+            yield result
+
+    def _parse(self, pdf_paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        if self.workers == 1 and not self.isolate:
+            for pdf_path in pdf_paths:
+                result = _parse_shard(str(pdf_path), self.store, 0, None, load_options=self.load_options)
+                result.pop('recycle', None)  # Can't recycle the parent process
+                yield result
+            return
+
+        # Shards of one document arrive consecutively - stitch them back
+        # together in page order before handing the document on
+        current = None
+        remaining = 0
+        for (pdf_path, shard_count), result in self._run_ordered(self._shards(pdf_paths)):
+            if current is None:
+                current = {'path': pdf_path, 'pages': [], 'seconds': 0.0}
+                remaining = shard_count
+            current['pages'].extend(result['pages'])
+            current['seconds'] += result['seconds']
+            if 'error' in result and 'error' not in current:
+                current['error'] = result['error']
+            remaining -= 1
+            if remaining == 0:
+                if 'error' in current:
+                    current['pages'] = []
+                yield current
+                current = None
+
+    def _shards(self, pdf_paths: Iterable[str]) -> Iterator[Tuple[str, int, int, Optional[int]]]:
+        """Split each document into (path, shard_count, start, end) page ranges"""
+        for pdf_path in pdf_paths:
+            pdf_path = str(pdf_path)
+            try:
+                pages = count_pages(Path(pdf_path), self.store) if self.shard_threshold else 0
+            except Exception:
+                pages = 0  # Let the worker report the error
+
+            if pages > self.shard_threshold:
+                ranges = [(s, min(s + self.shard_size, pages)) for s in range(0, pages, self.shard_size)]
+            else:
+                ranges = [(0, None)]
+
+            for start, end in ranges:
+                yield pdf_path, len(ranges), start, end
+
+    def _run_ordered(self, shards: Iterator[Tuple[str, int, int, Optional[int]]]):
+        """Run shards on the pool, yielding ((path, shard_count), result) in submission order"""
+        if self._executor is None:
+            self._executor = self._new_executor()
+
+        # Keep a bounded window in flight so results stream back while
+        # later shards are still being parsed
+        window = self.workers * 2
+        pending = deque()
+
+        def submit(shard):
+            pdf_path, shard_count, start, end = shard
+            future = self._executor.submit(_parse_shard, pdf_path, self.store, start, end,
+                                           self.max_worker_rss_mb, self.load_options)
+            pending.append(((pdf_path, shard_count), self._executor, future))
+
+        for shard in shards:
+            submit(shard)
+            if len(pending) >= window:
+                break
+
+        while pending:
+            key, executor, future = pending.popleft()
+            result = future.result()
+            # Results still draining from an already-retired pool don't trigger another swap
+            if result.pop('recycle', False) and executor is self._executor:
+                self._recycle()
+            next_shard = next(shards, None)
+            if next_shard is not None:
+                submit(next_shard)
+            yield key, result
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # max_tasks_per_child replaces each worker after that many shards
+        return ProcessPoolExecutor(max_workers=self.workers,
+                                   max_tasks_per_child=self.max_docs_per_worker or None)
+
+    def _recycle(self):
+        """
+        Swap in a fresh pool after a worker crossed the RSS ceiling
+        Work already queued on the old pool still completes; its processes
+        exit once it drains, handing the memory back
+        """
+        self._executor.shutdown(wait=False)
+        self._executor = self._new_executor()
+        self.pool_recycles += 1
+        print(f"  ♻ Worker RSS above {self.max_worker_rss_mb} MB - recycled parser pool", flush=True)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -1,33 +1,40 @@
 """
 PDF Cable Schedule Extractor - Extracts cable data from PDF calculation reports.
 """
-import pdfplumber
 import re
+import time
 from typing import List
 from pathlib import Path
 from models import EquipmentAsset, ExtractionResult, ExtractionMetadata, DataCompleteness
+from page_store import load_pages, skipped_table_pages
+from usage_ledger import UsageLedger, default_job_id
 
 class PDFCableExtractor:
     def __init__(self, file_path: str):
         self.file_path = Path(file_path)
         self.result = ExtractionResult()
+        self.ledger = UsageLedger(job=default_job_id('mv-cables'))
+        self._metadata = {}  # page -> ExtractionMetadata shared by that page's cables
 
     def parse(self) -> ExtractionResult:
         print(f"Parsing PDF: {self.file_path.name}")
         
-        with pdfplumber.open(self.file_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, start=1):
-                tables = page.extract_tables()
-                for table in tables:
-                    if not table or len(table) < 2:
-                        continue
-                    
-                    # Check if this looks like a cable schedule table
-                    header = [str(cell).lower() if cell else "" for cell in table[0]]
-                    if any(keyword in " ".join(header) for keyword in ["line", "from", "to", "length", "size", "cable"]):
-                        self._parse_cable_table(table, page_num)
+        started_at = time.monotonic()
+        pages = load_pages(self.file_path)
+        self.ledger.record_parse({'path': str(self.file_path), 'pages': pages, 'seconds': time.monotonic() - started_at})
+        self.ledger.close()
+        for page in pages:
+            for table in page['tables']:
+                if not table or len(table) < 2:
+                    continue
+                
+                # Check if this looks like a cable schedule table
+                header = [str(cell).lower() if cell else "" for cell in table[0]]
+                if any(keyword in " ".join(header) for keyword in ["line", "from", "to", "length", "size", "cable"]):
+                    self._parse_cable_table(table, page['page'])
         
         print(f"  Extracted {len(self.result.assets)} cable assets")
+        print(f"  Table detection skipped on {skipped_table_pages(pages)} of {len(pages)} pages")
         return self.result
 
     def _parse_cable_table(self, table: List[List], page_num: int):
@@ -84,16 +91,22 @@ class PDFCableExtractor:
                     'from_location': from_loc,
                     'to_location': to_loc
                 },
-                extraction_metadata=ExtractionMetadata(
-                    source_document=self.file_path.name,
-                    source_page=page_num,
-                    extraction_method="pdf_table_extractor",
-                    confidence=0.9
-                )
+                extraction_metadata=self._page_metadata(page_num)
             )
             asset.data_completeness = self._validate_cable_completeness(asset)
             self.result.assets.append(asset)
 
+    def _page_metadata(self, page_num: int) -> ExtractionMetadata:
+        metadata = self._metadata.get(page_num)
+        if metadata is None:
+            metadata = self._metadata[page_num] = ExtractionMetadata(
+                source_document=self.file_path.name,
+                source_page=page_num,
+                extraction_method="pdf_table_extractor",
+                confidence=0.9
+            )
+        return metadata
+
     def _validate_cable_completeness(self, asset: EquipmentAsset) -> DataCompleteness:
         specs = asset.specifications
         if specs.get('conductor_size') and specs.get('length_m') and specs.get('from_location') and specs.get('to_location'):
@@ -0,0 +1,89 @@
+"""
+Progress Events
+Machine-readable progress stream for the webapp - one JSON object per line
+Written to the file descriptor in ACC_PROGRESS_FD (a pipe the parent opened)
+or appended to the file in ACC_PROGRESS_FILE; silent when neither is set
+A sink callable takes the place of both (the JSON-RPC worker forwards
+events to its client as notifications)
+Events: start, document (after every document), done
+"""
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class ProgressReporter:
+    """
+    Emits progress events for one stage ('review' / 'extract')
+    Each document event carries the running totals, documents per minute
+    and an ETA, so consumers never need to keep or re-scan history
+    """
+    def __init__(self, stage: str, total: int, job: Optional[str] = None,
+                 sink: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.stage = stage
+        self.total = total
+        self.job = job or os.environ.get('ACC_JOB_ID')
+        self.processed = 0
+        self.counts: Dict[str, int] = {}
+        self.started_at = time.monotonic()
+        self.sink = sink
+        self._out = None if sink else self._open()
+
+    @staticmethod
+    def _open():
+        fd = os.environ.get('ACC_PROGRESS_FD')
+        if fd:
+            try:
+                return os.fdopen(int(fd), 'w', buffering=1, closefd=False)
+            except (OSError, ValueError):
+                return None  # Parent didn't hand us the descriptor
+        path = os.environ.get('ACC_PROGRESS_FILE')
+        if path:
+            return open(path, 'a', buffering=1)
+        return None
+
+    def _emit(self, event: str, **fields):
+        if self._out is None and self.sink is None:
+            return
+        record = {'event': event, 'stage': self.stage, 'job': self.job, 'ts': time.time()}
+        record.update(fields)
+        if self.sink is not None:
+            self.sink(record)
+            return
+        try:
+            self._out.write(json.dumps(record) + '\n')
+        except (BrokenPipeError, OSError):
+            self._out = None  # Consumer went away - keep working without progress
+
+    def start(self, **fields):
+        self._emit('start', total=self.total, **fields)
+
+    def document(self, index: int, path: str, status: str, **totals):
+        """
+        One document finished (status: e.g. relevant, not_relevant, extracted,
+        resumed, unchanged, skipped, missing, error); totals are stage
+        running counts such as relevant=... or assets=...
+        """
+        self.processed += 1
+        self.counts[status] = self.counts.get(status, 0) + 1
+        elapsed = time.monotonic() - self.started_at
+        rate = self.processed / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total - self.processed, 0)
+        self._emit('document', index=index, path=path, status=status,
+                   processed=self.processed, total=self.total,
+                   docs_per_min=round(rate * 60, 2),
+                   eta_s=round(remaining / rate, 1) if rate > 0 else None,
+                   **totals)
+
+    def done(self, **fields):
+        self._emit('done', processed=self.processed, total=self.total, counts=self.counts,
+                   elapsed_s=round(time.monotonic() - self.started_at, 1), **fields)
+
+    def close(self):
+        if self._out is not None:
+            try:
+                self._out.close()  # An inherited descriptor stays open (closefd=False)
+            except OSError:
+                pass
+            self._out = None
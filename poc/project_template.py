@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Project Template
+Expands a declarative project template (templates/<name>.json) into asset
+records: the template describes the site hierarchy (block -> inverter ->
+cable ...) with its exceptions, and each asset group names the level it is
+generated for and the record pattern to fill in
+Records are generated lazily, so a large site streams into the exporter
+without the register ever being built in memory
+Usage: python3 project_template.py <template> <output.xlsx|.jsonl> <asset_set> [asset_set ...]
+"""
+import json
+import re
+import sys
+from pathlib import Path
+from string import Formatter
+from typing import Any, Callable, Dict, Iterator, List
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+
+USAGE = "Usage: python3 project_template.py <template> <output.xlsx|.jsonl> <asset_set> [asset_set ...]"
+
+_SINGLE_FIELD = re.compile(r'^\{(\w+)\}$')
+
+
+def template_path(template) -> Path:
+    """A template file path, or templates/<name>.json for a bare name"""
+    path = Path(template)
+    return path if path.suffix else TEMPLATE_DIR / f"{template}.json"
+
+
+def load_template(template) -> Dict[str, Any]:
+    """Load a template (by name or path) and check its hierarchy"""
+    with open(template_path(template), encoding='utf-8') as f:
+        data = json.load(f)
+    levels = data.setdefault('levels', {})
+    for name in levels:
+        _chain(levels, name)
+    data.setdefault('asset_sets', {})
+    return data
+
+
+def _chain(levels: Dict[str, Any], name: str) -> List[str]:
+    """Level names from the root of the hierarchy down to `name`"""
+    chain = []
+    while name is not None:
+        if name not in levels:
+            raise ValueError(f"Unknown hierarchy level: {name}")
+        if name in chain:
+            raise ValueError(f"Hierarchy cycle at level: {name}")
+        chain.append(name)
+        name = levels[name].get('parent')
+    return chain[::-1]
+
+
+def _count(level: Dict[str, Any], bindings: Dict[str, int]) -> int:
+    """Instance count under one parent - the first matching exception wins"""
+    for exception in level.get('exceptions', ()):
+        if all(bindings.get(key) == value for key, value in exception['when'].items()):
+            return exception['count']
+    return level['count']
+
+
+def iter_level(template: Dict[str, Any], name: str) -> Iterator[Dict[str, int]]:
+    """
+    Variable bindings ({'block': 1, 'inv': 2, ...}) of every instance of a
+    level, depth first - all of block 1's inverters before block 2's
+    """
+    levels = template['levels']
+    chain = _chain(levels, name)
+
+    def walk(depth: int, bindings: Dict[str, int]) -> Iterator[Dict[str, int]]:
+        if depth == len(chain):
+            yield dict(bindings)
+            return
+        level_name = chain[depth]
+        level = levels[level_name]
+        start = level.get('start', 1)
+        for value in range(start, start + _count(level, bindings)):
+            bindings[level_name] = value
+            yield from walk(depth + 1, bindings)
+        bindings.pop(level_name, None)
+
+    return walk(0, {})
+
+
+def _compile(value: Any, variables: set, where: str) -> Callable[[Dict[str, int]], Any]:
+    """
+    Turn a record pattern into a render function of the level bindings
+    Strings are format patterns ("INV-{block:02d}.{inv}"); a string that is
+    a single bare field ("{block}") renders as the variable's own value
+    """
+    if isinstance(value, dict):
+        items = [(key, _compile(item, variables, f"{where}.{key}")) for key, item in value.items()]
+        return lambda bindings: {key: render(bindings) for key, render in items}
+    if isinstance(value, list):
+        renders = [_compile(item, variables, f"{where}[{i}]") for i, item in enumerate(value)]
+        return lambda bindings: [render(bindings) for render in renders]
+    if not isinstance(value, str):
+        return lambda bindings: value
+
+    fields = [field for _, field, _, _ in Formatter().parse(value) if field is not None]
+    for field in fields:
+        if re.split(r'[.\[]', field)[0] not in variables:
+            raise ValueError(f"{where}: unknown variable '{{{field}}}' in {value!r}")
+    match = _SINGLE_FIELD.match(value)
+    if match:
+        name = match.group(1)
+        return lambda bindings: bindings[name]
+    if fields:
+        return lambda bindings: value.format_map(bindings)
+    return lambda bindings: value
+
+
+def expand(template: Dict[str, Any], *asset_sets: str) -> Iterator[Dict[str, Any]]:
+    """
+    Generator of the records of one or more asset sets, in template order
+    Every pattern is checked before the first record is produced
+    """
+    levels = template['levels']
+    groups = []
+    for asset_set in asset_sets:
+        if asset_set not in template['asset_sets']:
+            raise ValueError(f"Unknown asset set: {asset_set}")
+        for index, group in enumerate(template['asset_sets'][asset_set]):
+            level = group.get('each')
+            variables = set(_chain(levels, level)) if level else set()
+            groups.append((level, _compile(group['asset'], variables, f"{asset_set}[{index}]")))
+
+    def records() -> Iterator[Dict[str, Any]]:
+        for level, render in groups:
+            for bindings in (iter_level(template, level) if level else ({},)):
+                yield render(bindings)
+
+    return records()
+
+
+def main():
+    if len(sys.argv) < 4:
+        print(USAGE, file=sys.stderr)
+        sys.exit(1)
+
+    source = template_path(sys.argv[1])
+    output_path = Path(sys.argv[2])
+    asset_sets = sys.argv[3:]
+    template = load_template(source)
+    expand(template, *asset_sets)  # Fail on unknown sets / variables before writing anything
+
+    print(f"{'='*80}")
+    print(f"EXPANDING {template.get('project', source.stem).upper()} TEMPLATE")
+    print(f"{'='*80}")
+    print(f"Template: {source}")
+    print(f"Asset sets: {', '.join(asset_sets)}")
+
+    if output_path.suffix == '.jsonl':
+        count = 0
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for record in expand(template, *asset_sets):
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                count += 1
+        print(f"\n✓ Wrote {count} assets to: {output_path}")
+    else:
+        from acc_excel_generator import ACCExcelGenerator
+        generator = ACCExcelGenerator(source, records=lambda: expand(template, *asset_sets))
+        generator.generate_excel(output_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Response Cache
+Disk-backed cache of LLM chat completions so re-runs don't pay for the
+same prompt twice
+Keyed by model, temperature, messages (system + user prompt), response
+format and prompt-template version; least-recently-used entries are
+evicted once the cache grows past its size budget
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_CACHE_PATH = Path(os.environ.get(
+    "ACC_LLM_CACHE",
+    "/home/ubuntu/acc-tools/poc/output/llm_cache.db"
+))
+
+# Size budget for stored responses; eviction trims back to EVICT_TO of it
+MAX_CACHE_MB = 512
+EVICT_TO = 0.9
+
+# Set ACC_LLM_CACHE_BYPASS=1 to neither read nor write the cache
+BYPASS = os.environ.get("ACC_LLM_CACHE_BYPASS", "") not in ("", "0")
+
+
+def cache_key(create_kwargs: Dict[str, Any], template_version: Optional[str] = None) -> str:
+    """Stable hash of everything that determines a completion's content"""
+    material = {
+        'model': create_kwargs.get('model'),
+        'temperature': create_kwargs.get('temperature'),
+        'messages': create_kwargs.get('messages'),
+        'response_format': create_kwargs.get('response_format'),
+        'template_version': template_version,
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite store of serialized chat completions with LRU/size eviction
+    Shared by the caller's thread (lookups) and the LLM client's event loop
+    thread (stores), so the connection is guarded by a lock
+    """
+    def __init__(self, db_path: Path = DEFAULT_CACHE_PATH, max_mb: float = MAX_CACHE_MB):
+        self.db_path = Path(db_path)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            self.db_path.parent.mkdir(exist_ok=True, parents=True)
+            self._conn = sqlite3.connect(self.db_path, timeout=60, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+            # Running total of stored sizes, kept in step with every insert and
+            # delete so eviction checks don't sum the table; re-summed on open
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_size (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    total INTEGER NOT NULL
+                )""")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_size (id, total) SELECT 1, COALESCE(SUM(size), 0) FROM responses")
+            self._conn.commit()
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """Serialized response for a key (marks it most recently used)"""
+        with self._lock:
+            row = self.conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: Optional[str], response: str):
+        now = time.time()
+        with self._lock:
+            with self.conn:
+                self.conn.execute(
+                    "UPDATE cache_size SET total = total + ? - "
+                    "COALESCE((SELECT size FROM responses WHERE key = ?), 0)",
+                    (len(response), key)
+                )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model, response, len(response), now, now)
+                )
+            self._evict()
+
+    def _evict(self):
+        """Drop least-recently-used responses once the size budget is exceeded"""
+        total = self.conn.execute("SELECT total FROM cache_size").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = total - int(self.max_bytes * EVICT_TO)
+        freed = 0
+        doomed = []
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            doomed.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE cache_size SET total = total - "
+                "COALESCE((SELECT size FROM responses WHERE key = ?), 0)", doomed)
+            self.conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def clear(self):
+        with self._lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM responses")
+                self.conn.execute("UPDATE cache_size SET total = 0")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': entries,
+            'size_mb': round(size / (1024 * 1024), 2),
+        }
+
+
+_default_cache: Optional[ResponseCache] = None
+
+
+def get_default_cache() -> Optional[ResponseCache]:
+    """Process-wide cache, or None when bypassed via ACC_LLM_CACHE_BYPASS"""
+    global _default_cache
+    if BYPASS:
+        return None
+    if _default_cache is None:
+        _default_cache = ResponseCache()
+    return _default_cache
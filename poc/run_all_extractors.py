@@ -82,7 +82,7 @@ def main():
                 'description': asset.description,
                 'manufacturer': getattr(asset, 'manufacturer', None),
                 'model': getattr(asset, 'model', None),
-                'specifications': getattr(asset, 'specifications', {}),
+                'specifications': dict(getattr(asset, 'specifications', {})),
                 'data_completeness': asset.data_completeness.value,
                 'extraction_source': asset.extraction_metadata.source_document if asset.extraction_metadata else None
             }
@@ -94,7 +94,7 @@ def main():
                 'quantity': bulk.quantity,
                 'unit': bulk.unit,
                 'description': bulk.description,
-                'specifications': bulk.specifications
+                'specifications': dict(bulk.specifications)
             }
             for bulk in complete_result.bulk_materials
         ]
@@ -1,8 +1,8 @@
 """Test extraction on a single document"""
 import json
 from pathlib import Path
-import pdfplumber
 from openai import OpenAI
+from page_store import load_pages, pages_to_text
 
 # Test document
 test_doc = {
@@ -17,15 +17,8 @@ print(f"Testing extraction on: {test_doc['filename']}\n")
 
 # Extract first 5 pages
 pdf_path = Path(test_doc['path'])
-all_text = []
-
-with pdfplumber.open(pdf_path) as pdf:
-    for page_idx, page in enumerate(pdf.pages[:5]):
-        text = page.extract_text()
-        if text:
-            all_text.append(f"[Page {page_idx+1}]\n{text}")
-
-doc_content = '\n\n'.join(all_text)
+pages = load_pages(pdf_path, end=5)
+doc_content = pages_to_text(pages)
 print(f"Extracted {len(doc_content)} characters from first 5 pages\n")
 
 # Test LLM extraction
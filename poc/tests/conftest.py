@@ -0,0 +1,5 @@
+"""The poc scripts import each other as siblings - make them importable from the tests"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
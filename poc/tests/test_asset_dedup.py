@@ -0,0 +1,76 @@
+"""Tag normalisation and merging of the same asset across sources"""
+from asset_dedup import blocking_key, canonical_tag, deduplicate
+from cable_graph import CableGraph
+
+
+def test_spellings_of_one_tag_normalise_together():
+    assert canonical_tag("INV-01.1") == canonical_tag("INV 01-1") == canonical_tag("Inverter 1 Block 1") == "INV-1-1"
+    assert canonical_tag("RMU-01A") == "RMU-1-A"
+
+
+def test_ratings_and_sizes_are_not_tags():
+    for name in ("33kV Cable", "Cable 95mm2", "Cable 95 mm²", "LV/MV Transformer 600V/33kV", "Inverter"):
+        assert canonical_tag(name) is None, name
+    # A size only distinguishes assets that also carry an identifying number
+    assert canonical_tag("DC-Array-Block01-ArrayCable-95mm2") != canonical_tag("DC-Array-Block01-ArrayCable-185mm2")
+
+
+def test_generic_cables_with_the_same_rating_stay_apart():
+    records = [
+        {'name': "33kV Cable", 'category': "Electrical > Cables", 'source_document': "SLD.pdf",
+         'specifications': {'from': "RMU-01", 'to': "SUB-01"}},
+        {'name': "33kV Cable", 'category': "Electrical > Cables", 'source_document': "GA.pdf",
+         'specifications': {'from': "RMU-02", 'to': "SUB-01"}},
+    ]
+    assert blocking_key(records[0]) is None
+    assert list(deduplicate(records)) == records
+
+    graph = CableGraph.from_records(records)
+    assert graph.cable_count == 2
+    assert len(graph.feeding("SUB-01")) == 2
+
+
+def test_sources_of_one_asset_merge():
+    records = [
+        {'name': "INV-01.1", 'category': "Electrical > Inverters", 'source_document': "Labelling.pdf",
+         'specifications': {'model': "Sunny Central 2750-EV"}},
+        {'name': "Inverter 1 Block 1", 'category': "Electrical > Inverters", 'source_document': "SLD.pdf",
+         'specifications': {'rated_power_kVA': 2750}},
+    ]
+    [entity] = deduplicate(records)
+    assert entity['canonical_tag'] == "INV-1-1"
+    assert entity['sources'] == ["Labelling.pdf", "SLD.pdf"]
+    assert entity['specifications'] == {'model': "Sunny Central 2750-EV", 'rated_power_kVA': 2750}
+
+
+def test_same_tag_in_different_blocks_stays_apart():
+    records = [
+        {'name': "Inverter 1", 'location': "Block 1", 'source_document': "a.pdf"},
+        {'name': "Inverter 1", 'location': "Block 2", 'source_document': "b.pdf"},
+        {'name': "Combiner Box 3", 'location': "Block 7", 'source_document': "a.pdf"},
+        {'name': "CB-3", 'location': "Block 9", 'source_document': "b.pdf"},
+    ]
+    entities = list(deduplicate(records))
+    assert [(e['canonical_tag'], e['sources']) for e in entities] == [
+        ("INV-1-1", ["a.pdf"]), ("INV-2-1", ["b.pdf"]), ("CB-7-3", ["a.pdf"]), ("CB-9-3", ["b.pdf"]),
+    ]
+
+
+def test_block_location_completes_a_tag():
+    records = [
+        {'name': "Inverter 1", 'location': "Block 1", 'source_document': "SLD.pdf"},
+        {'name': "INV-01.1", 'location': "BL-01", 'source_document': "Labelling.pdf"},
+        {'name': "TRF01", 'location': "Block 1", 'source_document': "SLD.pdf"},
+        {'name': "TRF01", 'source_document': "Labelling.pdf"},
+    ]
+    assert [(e['canonical_tag'], e['merged_records']) for e in deduplicate(records)] == [("INV-1-1", 2), ("TRF-1", 2)]
+
+
+def test_conflicting_locations_never_merge():
+    records = [
+        {'name': "INV-01.1", 'location': "Block 1", 'source_document': "a.pdf"},
+        {'name': "INV-01.1", 'location': "Block 2", 'source_document': "b.pdf"},
+        {'name': "INV-01.1", 'source_document': "c.pdf"},
+    ]
+    entities = list(deduplicate(records))
+    assert [(e['location'], e['sources']) for e in entities] == [("Block 1", ["a.pdf", "c.pdf"]), ("Block 2", ["b.pdf"])]
@@ -0,0 +1,58 @@
+"""Indexed lookups on the AssetRegister - results and cost per lookup"""
+import time
+
+from asset_register import AssetRegister
+
+
+def _site(blocks, extra_specs=0):
+    """A power station per block with two inverters, each with a few specs (plus extra_specs more)"""
+    for block in range(1, blocks + 1):
+        yield {'name': f"BL-{block:02d}", 'category': "Solar > Power Stations", 'location': f"Block {block}",
+               'specifications': {'block_number': block}}
+        for inv in (1, 2):
+            yield {'name': f"INV-{block:02d}.{inv}", 'category': "Electrical > Inverters",
+                   'location': f"Block {block}", 'parent_asset': f"BL-{block:02d}",
+                   'specifications': {'block_number': block, 'inverter_number': inv, 'rated_power_kVA': 2750,
+                                      **{f"spec_{i}": i for i in range(extra_specs)}}}
+
+
+def test_take_keeps_each_rows_specifications():
+    register = AssetRegister.from_records(_site(3))
+    children = register.children("BL-02")
+    assert list(children.frame['name']) == ["INV-02.1", "INV-02.2"]
+    assert [children.specifications(row) for row in range(len(children))] == [
+        {'block_number': 2, 'inverter_number': 1, 'rated_power_kVA': 2750},
+        {'block_number': 2, 'inverter_number': 2, 'rated_power_kVA': 2750},
+    ]
+    assert list(children.specs['row']) == [0, 0, 0, 1, 1, 1]
+    assert register.in_location("Block 3").get("BL-03")['specifications'] == {'block_number': 3}
+    assert len(register.in_category("Electrical").specs) == 3 * 2 * 3
+    assert len(register.take([]).specs) == 0
+
+
+def _lookup_seconds(register, repeats=200):
+    register.children("BL-01")  # Build the indexes first
+    started = time.perf_counter()
+    for _ in range(repeats):
+        register.children("BL-01")
+    return time.perf_counter() - started
+
+
+def test_lookup_cost_does_not_grow_with_register_size():
+    small = AssetRegister.from_records(_site(10))
+    large = AssetRegister.from_records(_site(20_000, extra_specs=40))
+    assert len(large.specs) == 1_740_000
+    # Scanning the specs table on every lookup made the large register >10x slower
+    assert _lookup_seconds(large) < 3 * _lookup_seconds(small)
+
+
+def test_subtree_skips_unnamed_rows():
+    register = AssetRegister.from_records([
+        {'name': "BL-01", 'category': "Solar > Power Stations"},
+        {'name': None, 'category': "Electrical > Inverters", 'parent_asset': "BL-01"},
+        {'name': "X", 'category': "Electrical > Inverters", 'parent_asset': "BL-02"},
+        {'name': "BL-02", 'category': "Solar > Power Stations"},
+    ])
+    subtree = register.subtree("BL-01")
+    assert len(subtree) == 2
+    assert "X" not in list(subtree.frame['name'])
@@ -0,0 +1,26 @@
+"""Incremental JSON array reading agrees with json.load, whatever the chunk size"""
+import json
+
+import pytest
+
+from asset_stream import iter_assets
+
+VALID = ['[]', '[1, 2]', '[{"a": [1, 2]}, {"b": "],"}]', '[-4.5e3, {"c": null}]']
+INVALID = ['[1,]', '[ {"a": 1} ,\n\n]', '[,1]', '[1 2]', '[1, 2', '{"assets": []}']
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 1024])
+@pytest.mark.parametrize('text', VALID)
+def test_valid_arrays_match_json_load(tmp_path, text, chunk_size):
+    path = tmp_path / "assets.json"
+    path.write_text(text)
+    assert list(iter_assets(path, chunk_size=chunk_size)) == json.loads(text)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 1024])
+@pytest.mark.parametrize('text', INVALID)
+def test_malformed_arrays_raise(tmp_path, text, chunk_size):
+    path = tmp_path / "assets.json"
+    path.write_text(text)
+    with pytest.raises(ValueError):
+        list(iter_assets(path, chunk_size=chunk_size))
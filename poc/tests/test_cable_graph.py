@@ -0,0 +1,104 @@
+"""
+Cable graph traversals, and endpoint normalisation: spellings of one tag
+are one node, the same tag in different blocks is two
+"""
+import numpy as np
+
+from cable_graph import WITHIN, CableGraph, cable_endpoints, node_key
+
+
+def _cable(name, src, dst, location=None):
+    return {'name': name, 'type': "cable", 'location': location, 'connectivity': {'from': src, 'to': dst}}
+
+
+def _equipment(name, location=None, parent=None):
+    return {'name': name, 'type': "equipment", 'location': location, 'parent_asset': parent}
+
+
+def _site():
+    return CableGraph.from_records([
+        _equipment("INV-01.1", "Block 1", parent="BL-01"),
+        _equipment("BL-01"),
+        _equipment("Substation"),
+        _cable("DC-1", "Combiner Box 1", "Inverter 1", "Block 1"),
+        _cable("DC-2", "Combiner Box 2", "INV-01.1", "Block 1"),
+        _cable("AC-1", "INV-01.1", "TRF-01", "Block 1"),
+        _cable("MV-1", "BL-01", "Substation"),
+        {'name': "Array cable", 'type': "cable", 'specifications': {'from': "...", 'to': "..."}},
+    ])
+
+
+def test_endpoints_from_connectivity_or_specifications():
+    assert cable_endpoints(_cable("C", "CB-1", "INV-1")) == ("CB-1", "INV-1")
+    assert cable_endpoints({'specifications': {'from_location': "CB-1", 'to_location': "INV-1"}}) == ("CB-1", "INV-1")
+    assert cable_endpoints({'specifications': {'from': "...", 'to': "INV-1"}}) is None
+    assert cable_endpoints({'connectivity': {'from': "CB-1"}}) is None
+
+
+def test_node_keys():
+    assert node_key("INV-01.1") == node_key("Inverter 1 Block 1") == node_key("Inverter 1", "BLOCK-1") == "INV-1-1"
+    assert node_key("Combiner Box 3", "BLOCK-7") != node_key("Combiner Box 3", "BLOCK-9")
+    assert node_key("INV-01.1", "BLOCK-4") == "INV-1-1"
+    assert node_key("  33kV   switchboard ") == "33KV SWITCHBOARD"
+
+
+def test_csr_adjacency():
+    graph = _site()
+    assert graph.cable_count == 4
+    assert graph.skipped == 1
+    assert graph.out_starts[-1] == graph.in_starts[-1] == len(graph.src)
+    for node_id in range(len(graph.node_names)):
+        assert (graph.src[graph._out(node_id)] == node_id).all()
+        assert (graph.dst[graph._in(node_id)] == node_id).all()
+    assert np.count_nonzero(graph.cable == WITHIN) == 1
+
+
+def test_spellings_of_one_tag_are_one_node():
+    graph = _site()
+    assert graph.node("Inverter 1 Block 1") == graph.node("INV-01.1")
+    assert graph.node_names[graph.node("INV-1.1")] == "INV-01.1"
+    assert graph.node("Inverter 9") is None
+
+
+def test_feeding():
+    graph = _site()
+    assert sorted(graph.feeding("INV-01.1")) == ["DC-1", "DC-2"]
+    assert sorted(graph.feeding("TRF-01", upstream=True)) == ["AC-1", "DC-1", "DC-2"]
+    assert graph.feeding("Substation") == ["MV-1"]
+    assert graph.feeding("Inverter 9") == []
+
+
+def test_path_crosses_containment_links():
+    graph = _site()
+    assert graph.path("Combiner Box 1 Block 1", "Substation") == [
+        (None, "Combiner Box 1"),
+        ("DC-1", "INV-01.1"),
+        (None, "BL-01"),
+        ("MV-1", "Substation"),
+    ]
+    assert graph.path("INV-01.1", "Inverter 9") is None
+
+
+def test_path_between_unconnected_nodes():
+    graph = CableGraph.from_records([_cable("A", "CB-1-1", "INV-1-1"), _cable("B", "CB-2-1", "INV-2-1")])
+    assert graph.path("CB-1-1", "INV-2-1") is None
+
+
+def test_unmatched_endpoints():
+    graph = _site()
+    assert graph.unmatched_endpoints() == [("Combiner Box 1", 1), ("Combiner Box 2", 1), ("TRF-01", 1)]
+    assert CableGraph.from_records([_equipment("INV-01.1")]).unmatched_endpoints() == []
+
+
+def test_same_tag_in_different_blocks_stays_separate():
+    graph = CableGraph.from_records([
+        _cable("DC-7-3", "Combiner Box 3", "Inverter 1", "Block 7"),
+        _cable("DC-9-3", "Combiner Box 3", "Inverter 1", "Block 9"),
+        _equipment("Inverter 1", "Block 7"),
+        _equipment("Inverter 1", "Block 9"),
+    ])
+    assert len(graph.node_names) == 4
+    assert graph.feeding("INV-07.1") == ["DC-7-3"]
+    assert graph.feeding("Inverter 1 Block 9") == ["DC-9-3"]
+    assert graph.path("Combiner Box 3 Block 7", "Inverter 1 Block 9") is None
+    assert graph.unmatched_endpoints() == [("Combiner Box 3", 1), ("Combiner Box 3", 1)]
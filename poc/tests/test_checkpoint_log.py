@@ -0,0 +1,132 @@
+"""
+A document whose LLM calls fail is a failed checkpoint record - never a
+finished one - so --retry-failed and resume both process it again
+"""
+import json
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+
+import comprehensive_asset_extractor
+import comprehensive_document_reviewer
+from checkpoint_log import CheckpointLog
+from corpus_manifest import CorpusManifest
+
+PAGE = {'page': 1, 'text': "INV-01.1 SMA Sunny Central 2750-EV", 'tables': [], 'tables_skipped': False}
+
+
+class FakeLLM:
+    """LLMClient stand-in: every submit() raises, or answers with `content`"""
+    max_in_flight = 1
+
+    def __init__(self, content=None):
+        self.content = content
+        self.submitted = 0
+
+    def submit(self, **kwargs):
+        self.submitted += 1
+        future = Future()
+        if self.content is None:
+            future.set_exception(RuntimeError("429 Too Many Requests"))
+        else:
+            message = SimpleNamespace(content=json.dumps(self.content))
+            future.set_result(SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason='stop')]))
+        return future
+
+    def stats(self):
+        return {'calls': self.submitted, 'retries': 0, 'backoffs': 0, 'rpm_limit': 0, 'cache_hits': 0}
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def pdf(tmp_path, monkeypatch):
+    monkeypatch.setattr(comprehensive_asset_extractor, 'OUTPUT_DIR', tmp_path / "output")
+    monkeypatch.setattr(comprehensive_document_reviewer, 'OUTPUT_DIR', tmp_path / "output")
+    path = tmp_path / "GOO-ISE-EL-SCH-0001_Inverter Schedule.pdf"
+    path.write_bytes(b"%PDF-1.4")
+    return path
+
+
+def _parsed(parse_result):
+    return lambda paths: iter([dict(parse_result, path=str(p)) for p in paths])
+
+
+def _extract(pdf, llm, **options):
+    docs_file = pdf.parent / "asset_relevant_documents.json"
+    docs_file.write_text(json.dumps([{'path': str(pdf), 'filename': pdf.name, 'classification': {}}]))
+    extractor = comprehensive_asset_extractor.ComprehensiveAssetExtractor(str(docs_file))
+    extractor.llm = llm
+    extractor.parser.parse = _parsed({'pages': [PAGE], 'seconds': 0.0})
+    extractor.extract_all_assets(**options)
+    return extractor
+
+
+def _review(pdf, llm, parse_result, **options):
+    list_file = pdf.parent / "pdfs.txt"
+    list_file.write_text(f"{pdf}\n")
+    reviewer = comprehensive_document_reviewer.ComprehensiveDocumentReviewer(
+        str(list_file), prefilter=False, pack_tokens=0)
+    reviewer.llm = llm
+    reviewer.parser.parse = _parsed(parse_result)
+    reviewer.review_all_documents(**options)
+    return reviewer
+
+
+def test_failed_extraction_is_retried_on_resume(pdf):
+    _extract(pdf, FakeLLM(), resume=True)
+
+    output = comprehensive_asset_extractor.OUTPUT_DIR
+    checkpoint = CheckpointLog(output / "asset_extraction_checkpoint.jsonl", retry_failed=True)
+    assert checkpoint.failed(pdf)
+    assert checkpoint.completed(pdf) is None
+    checkpoint.close()
+    assert CorpusManifest(output / "corpus_manifest.json").get_unchanged(pdf, 'extraction') is None
+
+    # An interrupted run that already saw the failure: resume extracts it again
+    with open(output / "asset_extraction_checkpoint.jsonl") as f:
+        lines = f.readlines()
+    with open(output / "asset_extraction_checkpoint.jsonl", 'w') as f:
+        f.writelines(line for line in lines if '"finished"' not in line)
+    llm = FakeLLM({'assets': [{'asset_id': "INV-01.1", 'name': "Inverter 1", 'type': "inverter"}]})
+    extractor = _extract(pdf, llm, resume=True)
+    assert llm.submitted == 1
+    assert extractor.resumed_docs == 0
+    assert [a['asset_id'] for a in extractor.extracted_assets] == ["INV-01.1"]
+    assert 'error' not in extractor.extraction_log[0]
+
+
+def test_failed_extraction_is_replayed_by_retry_failed(pdf):
+    _extract(pdf, FakeLLM())
+    llm = FakeLLM({'assets': []})
+    extractor = _extract(pdf, llm, retry_failed=True)
+    assert llm.submitted == 1
+    assert 'error' not in extractor.extraction_log[0]
+
+
+def test_failed_classification_is_not_a_finished_review(pdf):
+    reviewer = _review(pdf, FakeLLM(), {'pages': [PAGE], 'seconds': 0.0})
+    assert 'error' in reviewer.review_log[0]
+
+    output = comprehensive_document_reviewer.OUTPUT_DIR
+    checkpoint = CheckpointLog(output / "document_review_checkpoint.jsonl", retry_failed=True)
+    assert checkpoint.failed(pdf)
+    checkpoint.close()
+    assert CorpusManifest(output / "corpus_manifest.json").get_unchanged(pdf, 'review') is None
+
+    llm = FakeLLM({'is_asset_relevant': True, 'confidence': 0.9, 'reason': "Inverter schedule",
+                   'asset_types': ["inverters"], 'document_type': "equipment_schedule"})
+    reviewer = _review(pdf, llm, {'pages': [PAGE], 'seconds': 0.0}, retry_failed=True)
+    assert llm.submitted == 1
+    assert reviewer.asset_relevant_docs[0]['classification']['is_asset_relevant']
+
+
+def test_unparsed_document_is_not_sent_to_the_llm(pdf):
+    llm = FakeLLM({'is_asset_relevant': False})
+    reviewer = _review(pdf, llm, {'pages': [], 'seconds': 0.0, 'error': "PDF is encrypted"})
+    assert llm.submitted == 0
+    assert 'PDF is encrypted' in reviewer.review_log[0]['error']
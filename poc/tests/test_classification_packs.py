@@ -0,0 +1,77 @@
+"""
+Calls avoided by packing are counted from the requests actually sent: a
+pack that comes back malformed costs its own call plus the per-document ones
+"""
+import json
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+
+import comprehensive_document_reviewer
+
+SINGLE = {'is_asset_relevant': False, 'confidence': 0.8, 'reason': "Drawing register",
+          'asset_types': [], 'document_type': "other"}
+
+
+class FakeLLM:
+    """LLMClient stand-in: pack requests get `pack_content`, single ones SINGLE"""
+    max_in_flight = 1
+
+    def __init__(self, pack_content):
+        self.pack_content = pack_content
+        self.submitted = []
+
+    def submit(self, context, **kwargs):
+        self.submitted.append(context['stage'])
+        content = self.pack_content if context['stage'] == 'classify_pack' else SINGLE
+        future = Future()
+        message = SimpleNamespace(content=json.dumps(content))
+        future.set_result(SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason='stop')]))
+        return future
+
+    def stats(self):
+        return {'calls': len(self.submitted), 'retries': 0, 'backoffs': 0, 'rpm_limit': 0, 'cache_hits': 0}
+
+    def close(self):
+        pass
+
+
+def _review(tmp_path, monkeypatch, llm, count=3):
+    monkeypatch.setattr(comprehensive_document_reviewer, 'OUTPUT_DIR', tmp_path / "output")
+    pdfs = []
+    for n in range(1, count + 1):
+        path = tmp_path / f"GOO-ISE-GN-REG-000{n}_Register.pdf"
+        path.write_bytes(b"%PDF-1.4")
+        pdfs.append(path)
+    list_file = tmp_path / "pdfs.txt"
+    list_file.write_text(''.join(f"{p}\n" for p in pdfs))
+
+    reviewer = comprehensive_document_reviewer.ComprehensiveDocumentReviewer(str(list_file), prefilter=False)
+    reviewer.llm = llm
+    reviewer.parser.parse = lambda paths: iter([
+        {'path': str(p), 'seconds': 0.0,
+         'pages': [{'page': 1, 'text': "Drawing register", 'tables': [], 'tables_skipped': False}]}
+        for p in paths])
+    reviewer.review_all_documents()
+    return reviewer
+
+
+def test_packed_documents_save_all_but_the_pack_call(tmp_path, monkeypatch):
+    llm = FakeLLM({'documents': [dict(SINGLE, document=n) for n in (1, 2, 3)]})
+    reviewer = _review(tmp_path, monkeypatch, llm)
+    assert llm.submitted == ['classify_pack']
+    assert reviewer.pack_calls_saved == 2
+    assert reviewer.llm_calls_avoided == 2
+
+
+def test_malformed_pack_saves_nothing(tmp_path, monkeypatch):
+    llm = FakeLLM({'documents': [dict(SINGLE, document=1)]})
+    reviewer = _review(tmp_path, monkeypatch, llm)
+    assert llm.submitted == ['classify_pack'] + ['classify'] * 3
+    assert reviewer.pack_fallbacks == 1
+    assert reviewer.pack_calls_saved == 0
+    assert reviewer.llm_calls_avoided == -1
+    assert all('error' not in entry for entry in reviewer.review_log)
@@ -0,0 +1,46 @@
+"""
+The cache keeps a running total of stored sizes, so put() never sums the
+responses table and eviction still trims to the size budget
+"""
+from response_cache import ResponseCache
+
+
+def _total(cache):
+    return cache.conn.execute("SELECT total FROM cache_size").fetchone()[0]
+
+
+def _summed(cache):
+    return cache.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+
+def test_running_total_follows_inserts_replaces_and_clear(tmp_path):
+    cache = ResponseCache(tmp_path / "llm_cache.db")
+    cache.put("a", "gpt-4.1-mini", "x" * 100)
+    cache.put("b", "gpt-4.1-mini", "y" * 50)
+    cache.put("a", "gpt-4.1-mini", "z" * 10)
+    assert _total(cache) == _summed(cache) == 60
+
+    cache.clear()
+    assert _total(cache) == 0
+
+
+def test_total_is_resummed_on_open(tmp_path):
+    cache = ResponseCache(tmp_path / "llm_cache.db")
+    cache.put("a", "gpt-4.1-mini", "x" * 100)
+    with cache.conn:
+        cache.conn.execute("UPDATE cache_size SET total = 0")
+    assert _total(ResponseCache(tmp_path / "llm_cache.db")) == 100
+
+
+def test_put_evicts_without_summing_the_table(tmp_path):
+    cache = ResponseCache(tmp_path / "llm_cache.db", max_mb=1000 / (1024 * 1024))
+    statements = []
+    cache.conn.set_trace_callback(statements.append)
+    for n in range(30):
+        cache.put(f"key-{n}", "gpt-4.1-mini", "x" * 100)
+
+    assert not any('SUM(' in statement.upper() for statement in statements)
+    assert cache.evictions > 0
+    assert _total(cache) == _summed(cache) <= 1000
+    assert cache.get("key-29") is not None
+    assert cache.get("key-0") is None
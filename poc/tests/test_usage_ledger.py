@@ -0,0 +1,31 @@
+"""Where the pipeline stages write their usage ledger"""
+import json
+
+import pytest
+
+import usage_ledger
+from usage_ledger import ledger_path
+
+
+def test_stage_ledger_defaults_to_its_output_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("ACC_USAGE_LEDGER", raising=False)
+    assert ledger_path(tmp_path) == tmp_path / "usage_ledger.jsonl"
+
+
+def test_acc_usage_ledger_overrides_every_stage(tmp_path, monkeypatch):
+    override = tmp_path / "shared" / "ledger.jsonl"
+    monkeypatch.setenv("ACC_USAGE_LEDGER", str(override))
+    monkeypatch.setattr(usage_ledger, 'DEFAULT_LEDGER_PATH', override)
+    assert ledger_path(tmp_path / "output") == override
+
+    pytest.importorskip("openai")
+    import comprehensive_asset_extractor
+    import comprehensive_document_reviewer
+    monkeypatch.setattr(comprehensive_asset_extractor, 'OUTPUT_DIR', tmp_path / "output")
+    monkeypatch.setattr(comprehensive_document_reviewer, 'OUTPUT_DIR', tmp_path / "output")
+    docs_file = tmp_path / "docs.json"
+    docs_file.write_text(json.dumps([]))
+    list_file = tmp_path / "pdfs.txt"
+    list_file.write_text("")
+    assert comprehensive_asset_extractor.ComprehensiveAssetExtractor(str(docs_file)).ledger.ledger_path == override
+    assert comprehensive_document_reviewer.ComprehensiveDocumentReviewer(str(list_file)).ledger.ledger_path == override
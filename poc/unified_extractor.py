@@ -6,6 +6,10 @@ from pathlib import Path
 import json
 from datetime import datetime
 from typing import List, Dict, Any
+from project_template import load_template, expand
+
+# Site hierarchy and naming patterns (templates/goonumbla.json)
+PROJECT_TEMPLATE = "goonumbla"
 
 class UnifiedAssetExtractor:
     def __init__(self, base_path: str):
@@ -76,139 +80,15 @@ class UnifiedAssetExtractor:
     
     def generate_equipment(self) -> List[Dict[str, Any]]:
         """Generate equipment assets based on project specification"""
-        equipment = []
-        
-        # Power Stations / PCUs (16 blocks)
-        for block in range(1, 17):
-            equipment.append({
-                "name": f"BL-{block:02d}",
-                "category": "Solar > Power Stations",
-                "type": "Power Station (PCU)",
-                "description": f"Power Station (Skid Solution) for Block {block}",
-                "specifications": {
-                    "block_number": block,
-                    "rated_power_kW": 5500
-                },
-                "location": f"Block {block}",
-                "data_source": "equipment_labeling_spec",
-                "confidence": 0.95
-            })
-        
-        # Inverters (31 total: 2 per block except block 04 which has 1)
-        for block in range(1, 17):
-            inv_count = 1 if block == 4 else 2
-            for inv in range(1, inv_count + 1):
-                equipment.append({
-                    "name": f"INV-{block:02d}.{inv}",
-                    "category": "Electrical > Inverters",
-                    "type": "Central Inverter",
-                    "description": f"SMA Sunny Central 2750-EV Inverter {inv} in Block {block}",
-                    "specifications": {
-                        "block_number": block,
-                        "inverter_number": inv,
-                        "manufacturer": "SMA",
-                        "model": "Sunny Central 2750-EV",
-                        "rated_power_kVA": 2750,
-                        "dc_voltage_range_V": "875-1425",
-                        "max_dc_voltage_V": 1500,
-                        "max_dc_current_A": 3200,
-                        "ac_voltage_V": 600,
-                        "efficiency_pct": 98.7
-                    },
-                    "location": f"Block {block}",
-                    "parent_asset": f"BL-{block:02d}",
-                    "data_source": "equipment_labeling_spec",
-                    "confidence": 0.95
-                })
-        
-        # LV/MV Transformers (1 per block)
-        for block in range(1, 17):
-            equipment.append({
-                "name": f"TRF{block:02d}",
-                "category": "Electrical > Transformers > LV/MV Transformers",
-                "type": "LV/MV Transformer",
-                "description": f"LV/MV Transformer for Block {block}, 600V/33kV",
-                "specifications": {
-                    "block_number": block,
-                    "rated_power_kVA": 5500,
-                    "primary_voltage_V": 600,
-                    "secondary_voltage_V": 33000
-                },
-                "location": f"Block {block}",
-                "parent_asset": f"BL-{block:02d}",
-                "data_source": "equipment_labeling_spec",
-                "confidence": 0.95
-            })
-        
-        # RMUs (Ring Main Units - 1 per block)
-        for block in range(1, 17):
-            equipment.append({
-                "name": f"RMU-{block:02d}",
-                "category": "Electrical > Switchgear > Ring Main Units",
-                "type": "Ring Main Unit",
-                "description": f"33kV Ring Main Unit for Block {block}",
-                "specifications": {
-                    "block_number": block,
-                    "voltage_V": 33000,
-                    "switchgear_positions": 3
-                },
-                "location": f"Block {block}",
-                "parent_asset": f"BL-{block:02d}",
-                "data_source": "equipment_labeling_spec",
-                "confidence": 0.95
-            })
-        
-        # Auxiliary Transformers (1 per block)
-        for block in range(1, 17):
-            equipment.append({
-                "name": f"AUXTRF{block:02d}",
-                "category": "Electrical > Transformers > Auxiliary Transformers",
-                "type": "LV/LV Auxiliary Transformer",
-                "description": f"LV/LV Auxiliary Transformer for Block {block}",
-                "specifications": {
-                    "block_number": block
-                },
-                "location": f"Block {block}",
-                "parent_asset": f"BL-{block:02d}",
-                "data_source": "equipment_labeling_spec",
-                "confidence": 0.95
-            })
-        
-        # Substation
-        equipment.append({
-            "name": "SUB-01",
-            "category": "Electrical > Substations",
-            "type": "33/66kV Substation",
-            "description": "Main 33/66kV Substation",
-            "specifications": {
-                "primary_voltage_V": 33000,
-                "secondary_voltage_V": 66000
-            },
-            "location": "Substation",
-            "data_source": "equipment_labeling_spec",
-            "confidence": 0.95
-        })
-        
-        # Weather Station
-        equipment.append({
-            "name": "WS-01",
-            "category": "SCADA > Meteorological Stations",
-            "type": "Weather Station",
-            "description": "Autonomous Weather Station",
-            "location": "Site",
-            "data_source": "equipment_labeling_spec",
-            "confidence": 0.95
-        })
-        
-        return equipment
+        # Blocks, inverters (block 04 has one), transformers, RMUs etc. are
+        # described in templates/goonumbla.json
+        return list(expand(load_template(PROJECT_TEMPLATE), 'equipment'))
     
     def generate_dc_cable_instances(self, dc_cable_types: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Generate individual DC cable instances for each inverter
         Based on the DC cable types extracted from calculation reports
         """
-        instances = []
-        
         # Find the DC array cable type (95mm² AL in torque tube)
         array_cable_type = None
         for cable in dc_cable_types:
@@ -218,40 +98,13 @@ class UnifiedAssetExtractor:
         
         if not array_cable_type:
             print("  ⚠ Warning: DC array cable type not found, skipping instance generation")
-            return instances
+            return []
         
         # Generate DC array cables for each inverter
         # Based on project spec: 2,750 kVA inverters with ~280 strings each
-        # Typical configuration: 8-14 DC array cables per inverter
-        
-        for block in range(1, 17):
-            inv_count = 1 if block == 4 else 2
-            for inv in range(1, inv_count + 1):
-                # Generate 12 DC array cables per inverter (typical mid-range)
-                for cable_num in range(1, 13):
-                    instances.append({
-                        "name": f"DC-Array-BL{block:02d}-INV{inv}-{cable_num:02d}",
-                        "category": "Electrical > Cables > DC Cables",
-                        "type": "DC Array Cable",
-                        "description": f"DC Array Cable {cable_num} from Combiner Box to Inverter INV-{block:02d}.{inv}, 95mm² AL, 1500V DC",
-                        "specifications": {
-                            "voltage_V": 1500,
-                            "conductor_size_mm2": 95,
-                            "conductor_material": "Aluminum",
-                            "installation_method": "In Torque Tube / Directly Buried",
-                            "number_of_cores": 2
-                        },
-                        "location": f"Block {block}",
-                        "connectivity": {
-                            "from": f"Combiner-BL{block:02d}-INV{inv}-{cable_num:02d}",
-                            "to": f"INV-{block:02d}.{inv}"
-                        },
-                        "parent_asset": f"INV-{block:02d}.{inv}",
-                        "data_source": "generated_from_spec",
-                        "confidence": 0.85
-                    })
-        
-        return instances
+        # Typical configuration: 8-14 DC array cables per inverter - the
+        # template generates 12 (typical mid-range)
+        return list(expand(load_template(PROJECT_TEMPLATE), 'dc_array_cables'))
     
     def save_results(self, output_dir: Path):
         """Save extraction results"""
@@ -267,46 +120,26 @@ class UnifiedAssetExtractor:
         print(f"\n✓ Saved unified asset list to: {json_file}")
         
         # Generate summary
+        from asset_register import AssetRegister  # pandas/numpy only when summarising
+        register = AssetRegister.from_records(self.assets)
         summary_file = output_dir / f"unified_extraction_summary_{timestamp}.md"
         with open(summary_file, 'w') as f:
             f.write("# Goonumbla Solar Farm - Unified Asset Extraction Summary\n\n")
             f.write(f"**Extraction Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            f.write(f"**Total Assets:** {len(self.assets)}\n\n")
-            
-            # Count by category
-            categories = {}
-            for asset in self.assets:
-                cat = asset.get('category', 'Unknown').split(">")[0].strip()
-                categories[cat] = categories.get(cat, 0) + 1
+            f.write(f"**Total Assets:** {len(register)}\n\n")
             
             f.write("## Assets by Top-Level Category\n\n")
-            for cat, count in sorted(categories.items()):
+            for cat, count in register.counts('top_category', order='key'):
                 f.write(f"- **{cat}:** {count} assets\n")
             
-            # Count by type
-            types = {}
-            for asset in self.assets:
-                asset_type = asset.get('type', 'Unknown')
-                types[asset_type] = types.get(asset_type, 0) + 1
-            
             f.write("\n## Assets by Type\n\n")
-            for asset_type, count in sorted(types.items(), key=lambda x: -x[1]):
+            for asset_type, count in register.counts('type'):
                 f.write(f"- **{asset_type}:** {count} assets\n")
             
             # Confidence distribution
             f.write("\n## Confidence Distribution\n\n")
-            confidence_ranges = {"High (>0.9)": 0, "Medium (0.7-0.9)": 0, "Low (<0.7)": 0}
-            for asset in self.assets:
-                conf = asset.get('confidence', 0)
-                if conf > 0.9:
-                    confidence_ranges["High (>0.9)"] += 1
-                elif conf >= 0.7:
-                    confidence_ranges["Medium (0.7-0.9)"] += 1
-                else:
-                    confidence_ranges["Low (<0.7)"] += 1
-            
-            for range_name, count in confidence_ranges.items():
-                pct = (count / len(self.assets)) * 100 if self.assets else 0
+            for range_name, count in register.confidence_bands():
+                pct = (count / len(register)) * 100 if len(register) else 0
                 f.write(f"- **{range_name}:** {count} assets ({pct:.1f}%)\n")
         
         print(f"✓ Saved extraction summary to: {summary_file}")
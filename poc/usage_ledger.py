@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Usage Ledger
+Append-only JSONL record of every LLM call and PDF parse (document, stage,
+tokens, cost, latency, retries, cache hits) plus a summary command that
+rolls the ledger up by job, stage and document type
+Usage: python3 usage_ledger.py [ledger_jsonl] [review_log_json]
+"""
+import json
+import os
+import sys
+import threading
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+DEFAULT_LEDGER_PATH = Path(os.environ.get(
+    "ACC_USAGE_LEDGER",
+    "/home/ubuntu/acc-tools/poc/output/usage_ledger.jsonl"
+))
+DEFAULT_REVIEW_LOG = Path("/home/ubuntu/acc-tools/poc/output/document_review_log.json")
+
+# USD per million tokens: (prompt, cached prompt, completion)
+MODEL_PRICES = {
+    'gpt-4.1': (2.00, 0.50, 8.00),
+    'gpt-4.1-mini': (0.40, 0.10, 1.60),
+    'gpt-4.1-nano': (0.10, 0.025, 0.40),
+}
+
+
+def ledger_path(output_dir: Path) -> Path:
+    """The ACC_USAGE_LEDGER override if set, else usage_ledger.jsonl in a stage's output directory"""
+    if os.environ.get("ACC_USAGE_LEDGER"):
+        return DEFAULT_LEDGER_PATH
+    return Path(output_dir) / "usage_ledger.jsonl"
+
+
+def default_job_id(stage: str) -> str:
+    """Job id shared by every stage of a webapp job (ACC_JOB_ID), else one per run"""
+    return os.environ.get('ACC_JOB_ID') or f"{stage}-{datetime.now():%Y%m%dT%H%M%S}"
+
+
+def call_cost(model: Optional[str], prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    prices = MODEL_PRICES.get(model or '')
+    if prices is None:
+        # Dated snapshots (gpt-4.1-mini-2025-04-14) bill like their base model
+        prices = next((p for name, p in sorted(MODEL_PRICES.items(), key=lambda i: -len(i[0]))
+                       if (model or '').startswith(name)), (0.0, 0.0, 0.0))
+    prompt_price, cached_price, completion_price = prices
+    return ((prompt_tokens - cached_tokens) * prompt_price + cached_tokens * cached_price
+            + completion_tokens * completion_price) / 1_000_000
+
+
+class UsageLedger:
+    """Thread-safe JSONL appender (LLM calls complete on the client's event loop thread)"""
+    def __init__(self, ledger_path: Path = DEFAULT_LEDGER_PATH, job: Optional[str] = None):
+        self.ledger_path = Path(ledger_path)
+        self.job = job
+        self._lock = threading.Lock()
+        self._file = None
+
+    def record(self, kind: str, stage: str, **fields):
+        entry = {'ts': datetime.now().isoformat(), 'job': self.job, 'kind': kind, 'stage': stage}
+        entry.update(fields)
+        line = json.dumps(entry) + '\n'
+        with self._lock:
+            if self._file is None:
+                self.ledger_path.parent.mkdir(exist_ok=True, parents=True)
+                self._file = open(self.ledger_path, 'a')
+            self._file.write(line)
+            self._file.flush()
+
+    def record_llm_call(self, context: Dict[str, Any], response, model: Optional[str], latency: float,
+                        queued: float, retries: int, cache_hit: bool, error: Optional[str] = None):
+        """One LLM request - cache hits keep their token counts but cost nothing"""
+        usage = getattr(response, 'usage', None)
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = getattr(details, 'cached_tokens', 0) or 0
+        fields = dict(context)
+        stage = fields.pop('stage', 'llm')
+        fields.update({
+            'model': model,
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'cost_usd': 0.0 if cache_hit else round(call_cost(model, prompt_tokens, completion_tokens, cached_tokens), 6),
+            'latency_s': round(latency, 3),
+            'queued_s': round(queued, 3),
+            'retries': retries,
+            'cache_hit': cache_hit,
+        })
+        if error:
+            fields['error'] = error
+        self.record('llm', stage, **fields)
+
+    def record_parse(self, result: Dict[str, Any]):
+        """One parsed document as yielded by DocumentParser"""
+        fields = {
+            'document': result['path'],
+            'pages': len(result['pages']),
+            'latency_s': round(result.get('seconds', 0.0), 3),
+            'timed_out_pages': sum(1 for p in result['pages'] if p.get('timed_out')),
+        }
+        if 'error' in result:
+            fields['error'] = result['error']
+        self.record('parse', 'parse', **fields)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def load_ledger(ledger_path: Path) -> List[Dict[str, Any]]:
+    records = []
+    with open(ledger_path) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # Torn line from an interrupted run
+    return records
+
+
+def _document_types(review_log_path: Path) -> Dict[str, str]:
+    """Document path -> document_type from the reviewer's log, for records made before it was known"""
+    if not review_log_path.exists():
+        return {}
+    with open(review_log_path) as f:
+        return {entry['path']: entry.get('classification', {}).get('document_type', 'unknown')
+                for entry in json.load(f) if 'path' in entry}
+
+
+def summarize(records: List[Dict[str, Any]], key: str, doc_types: Dict[str, str] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Roll records up by 'job', 'stage' or 'doc_type'
+    Tokens and cost count billed calls only; a packed request listing several
+    documents is split evenly across them when grouping by document type
+    """
+    doc_types = doc_types or {}
+    totals = defaultdict(lambda: defaultdict(float))
+    for record in records:
+        documents = record.get('documents') or [record.get('document')]
+        if key == 'doc_type':
+            groups = [(record.get('doc_type') or doc_types.get(d) or 'unknown', 1 / len(documents)) for d in documents]
+        else:
+            groups = [(record.get(key) or 'unknown', 1.0)]
+
+        for group, share in groups:
+            row = totals[group]
+            if record['kind'] == 'parse':
+                row['parses'] += share
+                row['pages'] += record.get('pages', 0) * share
+                row['parse_s'] += record.get('latency_s', 0.0) * share
+                continue
+            row['calls'] += share
+            row['llm_s'] += record.get('latency_s', 0.0) * share
+            row['retries'] += record.get('retries', 0) * share
+            row['errors'] += share if 'error' in record else 0
+            if record.get('cache_hit'):
+                row['cache_hits'] += share
+                continue
+            row['prompt_tokens'] += record.get('prompt_tokens', 0) * share
+            row['completion_tokens'] += record.get('completion_tokens', 0) * share
+            row['cost_usd'] += record.get('cost_usd', 0.0) * share
+    return totals
+
+
+def print_summary(totals: Dict[str, Dict[str, float]], key: str):
+    print(f"\n{'='*112}")
+    print(f"BY {key.upper()}")
+    print(f"{'='*112}")
+    print(f"{key:<30} {'calls':>7} {'cached':>7} {'prompt tok':>12} {'compl tok':>10} {'cost $':>9} "
+          f"{'llm s':>9} {'parses':>7} {'pages':>7} {'parse s':>9}")
+    for group, row in sorted(totals.items(), key=lambda item: -item[1]['cost_usd']):
+        print(f"{str(group)[:30]:<30} {row['calls']:>7.0f} {row['cache_hits']:>7.0f} {row['prompt_tokens']:>12,.0f} "
+              f"{row['completion_tokens']:>10,.0f} {row['cost_usd']:>9.3f} {row['llm_s']:>9.1f} "
+              f"{row['parses']:>7.0f} {row['pages']:>7.0f} {row['parse_s']:>9.1f}")
+
+
+def main():
+    ledger_path = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_LEDGER_PATH
+    review_log_path = Path(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_REVIEW_LOG
+    if not ledger_path.exists():
+        print(f"Error: Ledger not found: {ledger_path}", file=sys.stderr)
+        sys.exit(1)
+
+    records = load_ledger(ledger_path)
+    doc_types = _document_types(review_log_path)
+    print(f"Ledger: {ledger_path} ({len(records)} records)")
+    for key in ('job', 'stage', 'doc_type'):
+        print_summary(summarize(records, key, doc_types), key)
+
+
+if __name__ == "__main__":
+    main()
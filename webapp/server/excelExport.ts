@@ -1,10 +1,10 @@
-import { spawn } from "child_process";
 import path from "path";
 import fs from "fs/promises";
 import type { Asset } from "../drizzle/schema";
+import { pythonWorker } from "./pythonWorker";
 
 /**
- * Generate ACC-compatible Excel file from assets using Python script
+ * Generate ACC-compatible Excel file from assets using the Python worker
  */
 export async function generateACCExcel(
   assets: Asset[],
@@ -21,68 +21,35 @@ export async function generateACCExcel(
   // Write assets to JSON file
   await fs.writeFile(jsonPath, JSON.stringify(assets, null, 2));
   
-  // Call Python CLI script to generate Excel
-  const pythonScript = "/home/ubuntu/acc-tools/poc/acc_excel_cli.py";
-  
-  return new Promise((resolve, reject) => {
-    // Clear Python environment variables to avoid conflicts
-    const cleanEnv = { ...process.env };
-    delete cleanEnv.PYTHONPATH;
-    delete cleanEnv.PYTHONHOME;
-    delete cleanEnv.VIRTUAL_ENV;
-    
-    const pythonProcess = spawn("/usr/bin/python3.11", [
-      pythonScript,
-      jsonPath,
-      excelPath,
-      projectName
-    ], { env: cleanEnv });
-    
-    let stdout = "";
-    let stderr = "";
-      
-    pythonProcess.stdout.on("data", (data) => {    const output = data.toString();
-      stdout += output;
-      console.log("[Excel Export] Python stdout:", output);
-    });
-    
-    process.stderr.on("data", (data) => {
-      const error = data.toString();
-      stderr += error;
-      console.error("[Excel Export] Python stderr:", error);
-    });
-    
-    pythonProcess.on("close", async (code) => {      // Clean up JSON file
-      try {
-        await fs.unlink(jsonPath);
-      } catch (err) {
-        console.warn("Failed to clean up temp JSON:", err);
-      }
-      
-      if (code !== 0) {
-        console.error("[Excel Export] Process exited with code", code);
-        console.error("[Excel Export] stderr:", stderr);
-        console.error("[Excel Export] stdout:", stdout);
-        reject(new Error(`Excel generation failed: ${stderr}`));
-        return;
-      }
-      
-      // Verify Excel file was created
-      try {
-        await fs.access(excelPath);
-        resolve({
-          filePath: excelPath,
-          fileName: path.basename(excelPath)
-        });
-      } catch (err) {
-        reject(new Error("Excel file was not created"));
-      }
-    });
-    
-    process.on("error", (err) => {
-      reject(new Error(`Failed to start Python process: ${err.message}`));
+  // Generate Excel in the long-lived Python worker (modules already loaded)
+  try {
+    await pythonWorker.call("export", {
+      input_json: jsonPath,
+      output_excel: excelPath,
+      project_name: projectName,
     });
-  });
+  } catch (err) {
+    console.error("[Excel Export] Worker error:", err);
+    throw new Error(`Excel generation failed: ${(err as Error).message}`);
+  } finally {
+    // Clean up JSON file
+    try {
+      await fs.unlink(jsonPath);
+    } catch (err) {
+      console.warn("Failed to clean up temp JSON:", err);
+    }
+  }
+
+  // Verify Excel file was created
+  try {
+    await fs.access(excelPath);
+  } catch (err) {
+    throw new Error("Excel file was not created");
+  }
+  return {
+    filePath: excelPath,
+    fileName: path.basename(excelPath)
+  };
 }
 
 /**
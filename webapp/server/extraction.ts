@@ -1,6 +1,6 @@
-import { spawn } from "child_process";
 import * as fs from "fs";
 import * as path from "path";
+import { pythonWorker, ProgressEvent } from "./pythonWorker";
 
 export interface ExtractionProgress {
   jobId: number;
@@ -11,6 +11,10 @@ export interface ExtractionProgress {
   totalAssets: number;
   currentDocument?: string;
   error?: string;
+  stage?: "review" | "extract";
+  relevantDocuments?: number;
+  docsPerMinute?: number;
+  etaSeconds?: number;
 }
 
 const activeJobs = new Map<number, NodeJS.Timeout>();
@@ -30,142 +34,79 @@ export async function startExtraction(
 
   // Create job directory
   const jobDir = `/tmp/extraction-${jobId}`;
-  if (!fs.existsSync(jobDir)) {
-    fs.mkdirSync(jobDir, { recursive: true });
+  const outputDir = path.join(jobDir, "output");
+  if (!fs.existsSync(outputDir)) {
+    fs.mkdirSync(outputDir, { recursive: true });
   }
 
-  // Copy Python scripts to job directory
-  const scriptsDir = "/home/ubuntu/acc-tools/poc";
-  const scripts = [
-    "comprehensive_document_reviewer.py",
-    "comprehensive_asset_extractor.py",
-    "models.py",
-  ];
-
-  for (const script of scripts) {
-    const src = path.join(scriptsDir, script);
-    const dest = path.join(jobDir, script);
-    if (fs.existsSync(src)) {
-      fs.copyFileSync(src, dest);
-    }
-  }
-
-  // Start document review phase
-  const reviewProcess = spawn("python3", [
-    path.join(jobDir, "comprehensive_document_reviewer.py"),
-    rclonePath,
-    jobDir,
-  ]);
-
-  let reviewOutput = "";
-  reviewProcess.stdout.on("data", (data) => {
-    reviewOutput += data.toString();
-    // Parse progress from output
-    parseReviewProgress(jobId, reviewOutput, onProgress);
+  // Review and extraction run in the long-lived Python worker, which
+  // reports progress for this job as one event per document
+  const state = newProgress(jobId);
+  const stopListening = pythonWorker.onProgress(String(jobId), (event) => {
+    applyProgressEvent(state, event);
+    onProgress({ ...state });
   });
 
-  reviewProcess.stderr.on("data", (data) => {
-    console.error(`[Job ${jobId}] Review error:`, data.toString());
-  });
+  try {
+    await pythonWorker.call("review", {
+      pdf_list: rclonePath,
+      output_dir: outputDir,
+      job_id: jobId,
+    });
+    await pythonWorker.call("extract", {
+      output_dir: outputDir,
+      job_id: jobId,
+    });
+  } catch (error) {
+    const stage = state.stage === "extract" ? "Extraction" : "Review";
+    onProgress({
+      ...state,
+      status: "failed",
+      error: `${stage} failed: ${(error as Error).message}`,
+    });
+    return;
+  } finally {
+    stopListening();
+  }
 
-  reviewProcess.on("close", (code) => {
-    if (code === 0) {
-      // Review completed, start extraction
-      startAssetExtraction(jobId, jobDir, onProgress);
-    } else {
-      onProgress({
-        jobId,
-        status: "failed",
-        totalDocuments: 0,
-        reviewedDocuments: 0,
-        extractedDocuments: 0,
-        totalAssets: 0,
-        error: `Review process exited with code ${code}`,
-      });
-    }
-  });
+  // Load extracted assets and save to database
+  await loadExtractedAssets(jobId, jobDir, onProgress);
 }
 
-function startAssetExtraction(
-  jobId: number,
-  jobDir: string,
-  onProgress: (progress: ExtractionProgress) => void
-) {
-  const extractProcess = spawn("python3", [
-    path.join(jobDir, "comprehensive_asset_extractor.py"),
-    jobDir,
-  ]);
-
-  let extractOutput = "";
-  extractProcess.stdout.on("data", (data) => {
-    extractOutput += data.toString();
-    parseExtractionProgress(jobId, extractOutput, onProgress);
-  });
-
-  extractProcess.stderr.on("data", (data) => {
-    console.error(`[Job ${jobId}] Extraction error:`, data.toString());
-  });
-
-  extractProcess.on("close", (code) => {
-    if (code === 0) {
-      // Load extracted assets and save to database
-      loadExtractedAssets(jobId, jobDir, onProgress);
-    } else {
-      onProgress({
-        jobId,
-        status: "failed",
-        totalDocuments: 0,
-        reviewedDocuments: 0,
-        extractedDocuments: 0,
-        totalAssets: 0,
-        error: `Extraction process exited with code ${code}`,
-      });
-    }
-  });
+function newProgress(jobId: number): ExtractionProgress {
+  return {
+    jobId,
+    status: "reviewing",
+    totalDocuments: 0,
+    reviewedDocuments: 0,
+    extractedDocuments: 0,
+    totalAssets: 0,
+  };
 }
 
-function parseReviewProgress(
-  jobId: number,
-  output: string,
-  onProgress: (progress: ExtractionProgress) => void
-) {
-  // Parse output like: "[42] ✓ ASSET-RELEVANT: document.pdf"
-  const matches = output.match(/\[(\d+)\]/g);
-  if (matches) {
-    const reviewed = matches.length;
-    onProgress({
-      jobId,
-      status: "reviewing",
-      totalDocuments: 0, // Will be updated when known
-      reviewedDocuments: reviewed,
-      extractedDocuments: 0,
-      totalAssets: 0,
-    });
+function applyProgressEvent(state: ExtractionProgress, event: ProgressEvent) {
+  state.stage = event.stage;
+  state.status = event.stage === "review" ? "reviewing" : "extracting";
+  if (event.event === "start") {
+    state.totalDocuments = event.total ?? state.totalDocuments;
+    state.docsPerMinute = undefined;
+    state.etaSeconds = undefined;
+    return;
   }
-}
-
-function parseExtractionProgress(
-  jobId: number,
-  output: string,
-  onProgress: (progress: ExtractionProgress) => void
-) {
-  // Parse output like: "[42] ✓ Extracted 15 assets from: document.pdf"
-  const matches = output.match(/\[(\d+)\] ✓ Extracted (\d+) assets/g);
-  if (matches) {
-    const extracted = matches.length;
-    const totalAssets = matches.reduce((sum, match) => {
-      const assetCount = parseInt(match.match(/Extracted (\d+)/)?.[1] || "0");
-      return sum + assetCount;
-    }, 0);
 
-    onProgress({
-      jobId,
-      status: "extracting",
-      totalDocuments: 0,
-      reviewedDocuments: 0,
-      extractedDocuments: extracted,
-      totalAssets,
-    });
+  if (event.stage === "review") {
+    state.reviewedDocuments = event.processed ?? state.reviewedDocuments;
+    state.relevantDocuments = event.relevant ?? state.relevantDocuments;
+  } else {
+    state.extractedDocuments = event.processed ?? state.extractedDocuments;
+    state.totalAssets = event.assets ?? state.totalAssets;
+  }
+  if (event.event === "document") {
+    state.currentDocument = event.path ? path.basename(event.path) : undefined;
+    state.docsPerMinute = event.docs_per_min;
+    state.etaSeconds = event.eta_s ?? undefined;
+  } else {
+    state.etaSeconds = 0;
   }
 }
 
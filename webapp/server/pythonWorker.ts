@@ -0,0 +1,141 @@
+import { spawn, ChildProcess } from "child_process";
+import * as readline from "readline";
+
+const PYTHON = "/usr/bin/python3.11";
+const WORKER_SCRIPT = "/home/ubuntu/acc-tools/poc/acc_worker.py";
+
+export interface ProgressEvent {
+  event: "start" | "document" | "done";
+  stage: "review" | "extract";
+  job: string | null;
+  total?: number;
+  processed?: number;
+  path?: string;
+  status?: string;
+  relevant?: number;
+  assets?: number;
+  docs_per_min?: number;
+  eta_s?: number | null;
+}
+
+interface PendingCall {
+  resolve: (result: any) => void;
+  reject: (error: Error) => void;
+}
+
+/**
+ * Client for the long-lived Python worker (poc/acc_worker.py)
+ * One worker process serves every review, extraction and export over
+ * JSON-RPC on its stdin/stdout, so Python modules and caches stay warm
+ * between jobs; the process is started on first use and restarted if it dies
+ */
+class PythonWorker {
+  private proc: ChildProcess | null = null;
+  private nextId = 1;
+  private pending = new Map<number, PendingCall>();
+  private progressListeners = new Map<string, (event: ProgressEvent) => void>();
+
+  call<T = any>(method: string, params: Record<string, unknown>): Promise<T> {
+    const proc = this.ensureStarted();
+    const id = this.nextId++;
+    return new Promise<T>((resolve, reject) => {
+      this.pending.set(id, { resolve, reject });
+      proc.stdin!.write(JSON.stringify({ jsonrpc: "2.0", id, method, params }) + "\n");
+    });
+  }
+
+  /**
+   * Receive the progress notifications of one job (matched on job id)
+   */
+  onProgress(jobId: string, listener: (event: ProgressEvent) => void): () => void {
+    this.progressListeners.set(jobId, listener);
+    return () => this.progressListeners.delete(jobId);
+  }
+
+  private ensureStarted(): ChildProcess {
+    if (this.proc) {
+      return this.proc;
+    }
+
+    // Clear Python environment variables to avoid conflicts
+    const cleanEnv = { ...process.env };
+    delete cleanEnv.PYTHONPATH;
+    delete cleanEnv.PYTHONHOME;
+    delete cleanEnv.VIRTUAL_ENV;
+
+    const proc = spawn(PYTHON, [WORKER_SCRIPT], {
+      env: cleanEnv,
+      stdio: ["pipe", "pipe", "pipe"],
+    });
+    this.proc = proc;
+
+    const lines = readline.createInterface({ input: proc.stdout! });
+    lines.on("line", (line) => this.handleMessage(line));
+
+    proc.stderr!.on("data", (data) => {
+      console.error("[Python Worker]", data.toString().trimEnd());
+    });
+
+    proc.on("exit", (code, signal) => {
+      console.error(`[Python Worker] Exited (code ${code}, signal ${signal})`);
+      this.discard(proc, new Error(`Python worker exited with code ${code}`));
+    });
+
+    proc.on("error", (err) => {
+      // Spawn failures (ENOENT, EACCES) never emit "exit"
+      console.error("[Python Worker] Failed to start:", err.message);
+      this.discard(proc, err);
+    });
+
+    // A write to a process that never started fails here instead of crashing the server
+    proc.stdin!.on("error", (err) => {
+      console.error("[Python Worker] stdin closed:", err.message);
+    });
+
+    return proc;
+  }
+
+  /**
+   * Forget a dead worker so the next call respawns it, failing the calls it still owed
+   */
+  private discard(proc: ChildProcess, error: Error) {
+    if (this.proc !== proc) {
+      return;
+    }
+    this.proc = null;
+    this.pending.forEach((call) => call.reject(error));
+    this.pending.clear();
+  }
+
+  private handleMessage(line: string) {
+    let message: any;
+    try {
+      message = JSON.parse(line);
+    } catch {
+      console.warn("[Python Worker] Ignoring non-JSON output:", line);
+      return;
+    }
+
+    if (message.id === undefined || message.id === null) {
+      if (message.method === "progress") {
+        const event = message.params as ProgressEvent;
+        const listener = event.job ? this.progressListeners.get(event.job) : undefined;
+        listener?.(event);
+      }
+      return;
+    }
+
+    const call = this.pending.get(message.id);
+    if (!call) {
+      return;
+    }
+    this.pending.delete(message.id);
+    if (message.error) {
+      call.reject(new Error(message.error.message));
+    } else {
+      call.resolve(message.result);
+    }
+  }
+}
+
+export const pythonWorker = new PythonWorker();